@@ -1,10 +1,13 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, request, jsonify, session
 from flask_cors import CORS
-import hashlib
-import sqlite3
-from datetime import datetime
+import json
 import os
-from database import init_db, get_db
+import threading
+from database import init_db
+import services
+from services import (ServiceError, require_user, exercise_session_id, exercise_render_options, exercise_inference,
+                      start_model_warm_up)
+from exercise_stream import ExerciseStream
 
 # Add Flask-Session for better session management
 try:
@@ -12,501 +15,323 @@ try:
 except ImportError:
     Session = None
 
+# WebSocket support for streaming exercise analysis
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+# The route logic lives in services.py, shared with the async FastAPI server
+# in main.py; the handlers here only parse Flask requests into it.
 app = Flask(__name__)
 app.secret_key = 'healthcare_secret_key'
-CORS(app, supports_credentials=True)
+CORS(app, supports_credentials=True, expose_headers=['X-Next-Cursor'])
 
 # Initialize database
 init_db()
 
+if __name__ != '__main__':
+    start_model_warm_up()
+
+@app.errorhandler(ServiceError)
+def service_error(e):
+    return jsonify({'error': e.message}), e.status, e.headers
+
+def list_response(name):
+    """Keyset-paginated JSON array response for one of the list endpoints.
+
+    With ?limit=N, returns up to N rows and, when more remain, an
+    X-Next-Cursor header to pass back as ?after=. Without a limit the rest of
+    the result (after ?after=, if given) is streamed, read in keyset chunks.
+    """
+    listing, params, limit = services.open_listing(name, session, request.args.get('limit'),
+                                                   request.args.get('after'))
+    if limit is None:
+        return Response(services.stream_list(listing, params, app.json.dumps), mimetype='application/json')
+
+    rows, next_cursor = services.list_page(listing, params, limit)
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 @app.route('/api/register', methods=['POST'])
 def register():
-    data = request.json
-    email = data.get('email')
-    password = data.get('password')
-    role = data.get('role', 'patient')
-    name = data.get('name')
-    phone = data.get('phone')
-    
-    if not all([email, password, name]):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    
-    try:
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO users (email, password, role, name, phone)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (email, hashed_password, role, name, phone))
-        conn.commit()
-        conn.close()
-        return jsonify({'message': 'User registered successfully'}), 201
-    except sqlite3.IntegrityError:
-        return jsonify({'error': 'Email already exists'}), 400
+    return jsonify(services.register(request.json)), 201
 
 @app.route('/api/login', methods=['POST'])
 def login():
-    data = request.json
-    email = data.get('email')
-    password = data.get('password')
-    
-    if not all([email, password]):
-        return jsonify({'error': 'Missing email or password'}), 400
-    
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT id, email, role, name FROM users 
-        WHERE email = ? AND password = ?
-    ''', (email, hashed_password))
-    user = cursor.fetchone()
-    conn.close()
-    
-    if user:
-        session['user_id'] = user[0]
-        session['role'] = user[2]
-        return jsonify({
-            'user': {
-                'id': user[0],
-                'email': user[1],
-                'role': user[2],
-                'name': user[3]
-            }
-        }), 200
-    else:
-        return jsonify({'error': 'Invalid credentials'}), 401
+    return jsonify(services.login(session, request.json)), 200
 
 @app.route('/api/logout', methods=['POST'])
 def logout():
-    session.clear()
-    return jsonify({'message': 'Logged out successfully'}), 200
+    return jsonify(services.logout(session)), 200
 
 # Patient routes
 @app.route('/api/patient/records', methods=['GET', 'POST'])
 def patient_records():
-    if 'user_id' not in session or session['role'] != 'patient':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     if request.method == 'GET':
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT r.*, u.name as doctor_name 
-            FROM medical_records r
-            LEFT JOIN users u ON r.doctor_id = u.id
-            WHERE r.patient_id = ?
-            ORDER BY r.created_at DESC
-        ''', (session['user_id'],))
-        records = cursor.fetchall()
-        conn.close()
-        
-        return jsonify([{
-            'id': r[0],
-            'record_type': r[3],
-            'title': r[4],
-            'description': r[5],
-            'file_path': r[6],
-            'ai_analysis': r[7],
-            'status': r[8],
-            'doctor_name': r[10] or 'Pending Review',
-            'created_at': r[9]
-        } for r in records])
-    
-    elif request.method == 'POST':
-        record_type = request.form.get('record_type')
-        title = request.form.get('title')
-        description = request.form.get('description')
-        
-        file_path = None
-        if 'file' in request.files:
-            file = request.files['file']
-            if file.filename != '':
-                # Create uploads directory if it doesn't exist
-                upload_dir = 'uploads'
-                if not os.path.exists(upload_dir):
-                    os.makedirs(upload_dir)
-                
-                # Save file with unique name
-                filename = f"{session['user_id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-                file_path = os.path.join(upload_dir, filename)
-                file.save(file_path)
-        
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Enhanced AI analysis based on file type
-        ai_analysis = f"AI Analysis: Based on the {record_type}"
-        if file_path:
-            if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
-                ai_analysis += " with uploaded image, visual analysis suggests normal patterns. "
-            elif file_path.lower().endswith('.pdf'):
-                ai_analysis += " with uploaded document, text analysis indicates standard results. "
-        ai_analysis += "Preliminary findings suggest routine monitoring. Professional review recommended."
-        
-        cursor.execute('''
-            INSERT INTO medical_records (patient_id, record_type, title, description, file_path, ai_analysis)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], record_type, title, description, file_path, ai_analysis))
-        conn.commit()
-        conn.close()
-        
-        return jsonify({'message': 'Record uploaded successfully', 'ai_analysis': ai_analysis}), 201
+        return list_response('patient_records')
+
+    file = request.files.get('file')
+    upload = (file.filename, file.stream) if file else None
+    return jsonify(services.create_record(session, request.form, upload)), 201
 
 @app.route('/api/patient/appointments', methods=['GET', 'POST'])
 def patient_appointments():
-    if 'user_id' not in session or session['role'] != 'patient':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     if request.method == 'GET':
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT a.*, u.name as doctor_name 
-            FROM appointments a
-            JOIN users u ON a.doctor_id = u.id
-            WHERE a.patient_id = ?
-            ORDER BY a.appointment_date DESC
-        ''', (session['user_id'],))
-        appointments = cursor.fetchall()
-        conn.close()
-        
-        return jsonify([{
-            'id': a[0],
-            'doctor_name': a[7],
-            'appointment_date': a[3],
-            'status': a[4],
-            'notes': a[5]
-        } for a in appointments])
-    
-    elif request.method == 'POST':
-        data = request.json
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO appointments (patient_id, doctor_id, appointment_date)
-            VALUES (?, ?, ?)
-        ''', (session['user_id'], data.get('doctor_id'), data.get('appointment_date')))
-        conn.commit()
-        conn.close()
-        
-        return jsonify({'message': 'Appointment scheduled successfully'}), 201
+        return jsonify(services.patient_appointments(session))
+    return jsonify(services.create_appointment(session, request.json)), 201
 
 # Doctor routes
 @app.route('/api/doctor/patients', methods=['GET'])
 def doctor_patients():
-    if 'user_id' not in session or session['role'] != 'doctor':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT DISTINCT u.id, u.name, u.email, u.phone
-        FROM users u
-        JOIN medical_records r ON u.id = r.patient_id
-        WHERE u.role = 'patient'
-    ''')
-    patients = cursor.fetchall()
-    conn.close()
-    
-    return jsonify([{
-        'id': p[0],
-        'name': p[1],
-        'email': p[2],
-        'phone': p[3]
-    } for p in patients])
+    return list_response('doctor_patients')
 
 @app.route('/api/doctor/records', methods=['GET'])
 def doctor_records():
-    if 'user_id' not in session or session['role'] != 'doctor':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT r.*, u.name as patient_name 
-        FROM medical_records r
-        JOIN users u ON r.patient_id = u.id
-        WHERE r.status = 'pending' OR r.doctor_id = ?
-        ORDER BY r.created_at DESC
-    ''', (session['user_id'],))
-    records = cursor.fetchall()
-    conn.close()
-    
-    return jsonify([{
-        'id': r[0],
-        'patient_name': r[10],
-        'record_type': r[3],
-        'title': r[4],
-        'description': r[5],
-        'ai_analysis': r[7],
-        'status': r[8],
-        'created_at': r[9]
-    } for r in records])
+    return list_response('doctor_records')
 
 @app.route('/api/doctor/verify-record', methods=['POST'])
 def verify_record():
-    if 'user_id' not in session or session['role'] != 'doctor':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE medical_records 
-        SET doctor_id = ?, status = 'verified'
-        WHERE id = ?
-    ''', (session['user_id'], data.get('record_id')))
-    conn.commit()
-    conn.close()
-    
-    return jsonify({'message': 'Record verified successfully'}), 200
+    return jsonify(services.verify_record(session, request.json)), 200
 
 @app.route('/api/doctor/prescriptions', methods=['POST'])
 def add_prescription():
-    if 'user_id' not in session or session['role'] != 'doctor':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO prescriptions (patient_id, doctor_id, medication, dosage, instructions)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (data.get('patient_id'), session['user_id'], data.get('medication'), 
-          data.get('dosage'), data.get('instructions')))
-    conn.commit()
-    conn.close()
-    
-    return jsonify({'message': 'Prescription added successfully'}), 201
+    return jsonify(services.add_prescription(session, request.json)), 201
 
 # Admin routes
 @app.route('/api/admin/users', methods=['GET'])
 def admin_users():
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, email, role, name, phone, created_at FROM users ORDER BY created_at DESC')
-    users = cursor.fetchall()
-    conn.close()
-    
-    return jsonify([{
-        'id': u[0],
-        'email': u[1],
-        'role': u[2],
-        'name': u[3],
-        'phone': u[4],
-        'created_at': u[5]
-    } for u in users])
+    return list_response('admin_users')
 
 @app.route('/api/admin/stats', methods=['GET'])
 def admin_stats():
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'patient'")
-    patients = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'doctor'")
-    doctors = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM medical_records")
-    records = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM appointments")
-    appointments = cursor.fetchone()[0]
-    
-    conn.close()
-    
-    return jsonify({
-        'patients': patients,
-        'doctors': doctors,
-        'records': records,
-        'appointments': appointments
-    })
-
-# Import AI emotion recognition
-from emotion_ai import emotion_ai
-from ml_models import healthcare_ai
-from exercise_analyzer import ExerciseAnalyzer
-
-# Initialize the exercise analyzer with ML model
-exercise_analyzer = ExerciseAnalyzer()
+    return jsonify(services.admin_stats(session))
+
+def read_frame_request():
+    """Return (image, params) for a frame upload.
+
+    Frames can arrive as a raw image/* body (params in the query string), as a
+    multipart 'image' file (params in form fields or the query string), or as
+    the legacy JSON body carrying a base64 data URL.
+    """
+    if request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+        return request.get_data(), request.args
+    if 'image' in request.files:
+        return request.files['image'].read(), request.values
+    data = request.get_json(silent=True) or {}
+    return data.get('image', ''), data
+
+def frame_session_id(data):
+    return exercise_session_id(data, session, request.remote_addr)
 
 # Mental Health Analysis endpoints
 @app.route('/api/mental-health/analyze-text', methods=['POST'])
 def analyze_text():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    text = data.get('text', '')
-    
-    # Use AI emotion recognition
-    result = emotion_ai.analyze_text_sentiment(text)
-    
-    return jsonify(result), 200
+    require_user(session)
+    return jsonify(services.analyze_text(session, request.json)), 200
+
+@app.route('/api/mental-health/analyze-text/batch', methods=['POST'])
+def analyze_text_batch():
+    require_user(session)
+    return jsonify(services.analyze_text_batch(session, request.json)), 200
 
 @app.route('/api/mental-health/analyze-voice', methods=['POST'])
 def analyze_voice():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    # Use AI voice emotion recognition
-    result = emotion_ai.analyze_voice_features()
-    
-    return jsonify(result), 200
+    """Analyze an 'audio' file upload or a raw audio body; no audio gives the mock reading"""
+    require_user(session)
+    if 'audio' in request.files:
+        upload = request.files['audio']
+        options = services.voice_audio_options(request.values, upload.mimetype)
+        return jsonify(services.analyze_voice(session, upload.stream, options)), 200
+    if request.mimetype.startswith('audio/') or request.mimetype == 'application/octet-stream':
+        options = services.voice_audio_options(request.args, request.mimetype)
+        return jsonify(services.analyze_voice(session, request.stream, options)), 200
+    return jsonify(services.analyze_voice(session)), 200
+
+def serve_voice_stream(ws):
+    """Voice emotion per sliding window over 16-bit PCM streamed in binary messages
+
+    sample_rate and channels come from the query string. Each window result
+    is sent back as a JSON text message; a text message {"end": true}
+    analyzes the remaining audio and closes the stream.
+    """
+    try:
+        options = services.voice_audio_options(request.args)
+    except ServiceError as e:
+        ws.close(reason=1003, message=e.message)
+        return
+
+    stream = services.open_voice_stream(options)
+    while True:
+        message = ws.receive()
+        if message is None:
+            break
+        if isinstance(message, str):
+            try:
+                end = services.stream_control_message(message).get('end')
+            except ServiceError as e:
+                ws.send(json.dumps({'error': e.message}))
+                continue
+            if not end:
+                continue
+            for result in stream.flush():
+                ws.send(json.dumps(result))
+            ws.close()
+            break
+        for result in stream.push_pcm(message):
+            ws.send(json.dumps(result))
 
 @app.route('/api/mental-health/analyze-face', methods=['POST'])
 def analyze_face():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    image_data = data.get('image', '')
-    
-    # Use AI facial emotion recognition
-    result = emotion_ai.analyze_face_image(image_data)
-    
-    return jsonify(result), 200
+    require_user(session)
+    image_data, data = read_frame_request()
+    return jsonify(services.analyze_face(session, image_data, frame_session_id(data))), 200
 
 # Exercise Analysis endpoints
 @app.route('/api/exercise/analyze', methods=['POST'])
 def analyze_exercise():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    image_data = data.get('image', '')
-    exercise_type = data.get('exercise_type', 'pushup')
-    
-    # Use OpenCV pose estimation for exercise analysis
-    result = exercise_analyzer.analyze_exercise(image_data, exercise_type)
-    
-    return jsonify(result), 200
+    require_user(session)
+    image_data, data = read_frame_request()
+    return jsonify(services.analyze_exercise(image_data, data, frame_session_id(data))), 200
 
 # Test endpoint for visual tracking (no auth required)
 @app.route('/api/test/exercise/analyze', methods=['POST'])
 def test_analyze_exercise():
-    data = request.json
-    image_data = data.get('image', '')
-    exercise_type = data.get('exercise_type', 'pushup')
-    
-    # Use OpenCV pose estimation for exercise analysis
-    result = exercise_analyzer.analyze_exercise(image_data, exercise_type)
-    
-    return jsonify(result), 200
+    image_data, data = read_frame_request()
+    return jsonify(services.analyze_exercise(image_data, data, frame_session_id(data))), 200
+
+def serve_exercise_stream(ws):
+    """Feed websocket frames to an ExerciseStream until the client disconnects
+
+    Binary messages are encoded frames; text messages are JSON carrying an
+    optional 'image' data URL and/or a new 'exercise_type'. Render options
+    come from the query string. Each analysis result is pushed back as a
+    JSON text message.
+    """
+    try:
+        render_options = exercise_render_options(request.args)
+    except ValueError as e:
+        ws.close(reason=1003, message=str(e))
+        return
+
+    # The stream's worker thread and this one both send; keep frames whole
+    send_lock = threading.Lock()
+    def send(message):
+        with send_lock:
+            ws.send(message)
+
+    stream = ExerciseStream(exercise_inference, send, frame_session_id(request.args),
+                            request.args.get('exercise_type', 'pushup'), render_options).start()
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            if isinstance(message, str):
+                try:
+                    data = services.stream_control_message(message)
+                except ServiceError as e:
+                    send(json.dumps({'error': e.message}))
+                    continue
+                stream.submit(data.get('image'), data.get('exercise_type'))
+            else:
+                stream.submit(message)
+    finally:
+        stream.close()
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @sock.route('/api/exercise/stream')
+    def exercise_stream(ws):
+        if 'user_id' not in session:
+            ws.close(reason=1008, message='Unauthorized')
+            return
+        serve_exercise_stream(ws)
+
+    # Test stream for visual tracking (no auth required)
+    @sock.route('/api/test/exercise/stream')
+    def test_exercise_stream(ws):
+        serve_exercise_stream(ws)
+
+    @sock.route('/api/mental-health/voice-stream')
+    def voice_stream(ws):
+        if 'user_id' not in session:
+            ws.close(reason=1008, message='Unauthorized')
+            return
+        serve_voice_stream(ws)
+
+@app.route('/api/exercise/analyze-video', methods=['POST'])
+def analyze_exercise_video():
+    """Analyze an uploaded workout video, streaming the timeline as JSON lines"""
+    require_user(session)
+    if 'video' not in request.files:
+        return jsonify({'error': 'No video uploaded'}), 400
+
+    upload = request.files['video']
+    lines = services.open_video_analysis(session, upload.filename, upload.stream, request.values)
+    return Response(lines, mimetype='application/x-ndjson')
 
 @app.route('/api/exercise/reset', methods=['POST'])
 def reset_exercise():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
+    require_user(session)
     data = request.json
-    exercise_type = data.get('exercise_type', 'pushup')
-    
-    # Reset exercise counter
-    exercise_analyzer.reset_exercise(exercise_type)
-    
-    return jsonify({'message': f'{exercise_type} counter reset'}), 200
+    return jsonify(services.reset_exercise(data, frame_session_id(data))), 200
 
 # Test endpoint for exercise reset (no auth required)
 @app.route('/api/test/exercise/reset', methods=['POST'])
 def test_reset_exercise():
     data = request.json
-    exercise_type = data.get('exercise_type', 'pushup')
-    
-    # Reset exercise counter
-    exercise_analyzer.reset_exercise(exercise_type)
-    
-    return jsonify({'message': f'{exercise_type} counter reset'}), 200
+    return jsonify(services.reset_exercise(data, frame_session_id(data))), 200
+
+@app.route('/api/exercise/stats', methods=['GET'])
+def exercise_stats():
+    require_user(session)
+    return jsonify(services.exercise_stats(frame_session_id(request.args))), 200
+
+# Test endpoint for exercise stats (no auth required)
+@app.route('/api/test/exercise/stats', methods=['GET'])
+def test_exercise_stats():
+    return jsonify(services.exercise_stats(frame_session_id(request.args))), 200
 
 @app.route('/api/auth/status', methods=['GET'])
 def auth_status():
-    if 'user_id' in session:
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, email, role, name FROM users WHERE id = ?', (session['user_id'],))
-        user = cursor.fetchone()
-        conn.close()
-        
-        if user:
-            return jsonify({
-                'user': {
-                    'id': user[0],
-                    'email': user[1],
-                    'role': user[2],
-                    'name': user[3]
-                }
-            }), 200
-    
-    return jsonify({'error': 'Not authenticated'}), 401
+    return jsonify(services.auth_status(session)), 200
 
 @app.route('/api/personalized-recommendations', methods=['POST'])
 def personalized_recommendations():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    data = request.json
-    profile = data.get('profile', {})
-    symptoms = data.get('symptoms', '')
-    
-    # Prepare patient data for ML models
-    patient_data = {
-        'age': int(profile.get('age', 30)) if profile.get('age') else 30,
-        'gender': profile.get('gender', 'male'),
-        'bmi': 25,
-        'bp_systolic': 140 if 'hypertension' in profile.get('medicalHistory', '').lower() else 120,
-        'glucose': 130 if 'diabetes' in profile.get('medicalHistory', '').lower() else 100,
-        'diabetes': 'diabetes' in profile.get('medicalHistory', '').lower(),
-        'hypertension': 'hypertension' in profile.get('medicalHistory', '').lower(),
-        'heart_disease': 'heart' in profile.get('medicalHistory', '').lower(),
-        'smoking': profile.get('lifestyle', {}).get('smoking', False),
-        'alcohol': profile.get('lifestyle', {}).get('alcohol', False)
-    }
-    
-    # Get AI-powered recommendations
-    treatment_rec = healthcare_ai.predict_treatment(patient_data)
-    risk_assessment = healthcare_ai.predict_risk(patient_data)
-    diet_recs = healthcare_ai.get_diet_recommendations(patient_data)
-    exercise_recs = healthcare_ai.get_exercise_recommendations(patient_data)
-    
-    recommendations = {
-        'treatments': [
-            f"🎯 AI Recommended: {treatment_rec['treatment'].title()}",
-            f"📊 Confidence: {treatment_rec['confidence']:.1%}",
-            f"💡 {treatment_rec['explanation']}"
-        ],
-        'medications': [
-            "🔍 Alternative safer options available if interactions occur",
-            "📋 Regular monitoring recommended for current medications"
-        ],
-        'diet': [f"🥗 {rec}" for rec in diet_recs],
-        'exercise': [f"🏃 {rec}" for rec in exercise_recs],
-        'risks': [
-            f"⚠️ Risk Level: {risk_assessment['risk_level']} ({risk_assessment['risk_score']:.1%})"
-        ] + [f"🚨 {factor}" for factor in risk_assessment['risk_factors']]
-    }
-    
-    return jsonify(recommendations), 200
+    require_user(session)
+    return jsonify(services.personalized_recommendations(session, request.json)), 200
+
+@app.route('/api/personalized-recommendations/batch', methods=['POST'])
+def batch_recommendations():
+    """Treatment and risk predictions for many profiles, each model run once over the batch"""
+    require_user(session, 'doctor', 'admin')
+    return jsonify(services.batch_recommendations(session, request.json)), 200
 
 @app.route('/api/doctors', methods=['GET'])
 def get_doctors():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name FROM users WHERE role = 'doctor'")
-    doctors = cursor.fetchall()
-    conn.close()
-    
-    return jsonify([{'id': d[0], 'name': d[1]} for d in doctors])
+    return jsonify(services.doctors())
+
+@app.route('/api/admin/models/reload', methods=['POST'])
+def reload_models():
+    """Swap in the model bundle train_models.py last made current"""
+    return jsonify(services.reload_models(session)), 200
+
+@app.route('/api/admin/models', methods=['GET'])
+def admin_models():
+    return jsonify(services.admin_models(session)), 200
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """Per-model load state; 200 once every AI component is loaded, 503 before"""
+    body = services.readiness()
+    return jsonify(body), 200 if body['ready'] else 503
 
 if __name__ == '__main__':
-    app.run(debug=True, port=8000)
\ No newline at end of file
+    # Under the debug reloader only the serving child process warms up
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_model_warm_up()
+    app.run(debug=True, port=8000)
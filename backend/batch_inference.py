@@ -0,0 +1,90 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatchClassifier:
+    """Coalesces single-row predictions from concurrent callers into batches.
+
+    Callers block in predict() while a worker thread gathers up to
+    max_batch_size rows, waiting at most max_wait_ms after the first one
+    arrives, runs one classifier.predict over the stacked rows and maps the
+    encoded predictions to labels through a precomputed index -> label array
+    (instead of a LabelEncoder.inverse_transform per call). A lone caller is
+    dispatched immediately rather than waiting out the window.
+    """
+
+    def __init__(self, classifier, labels, max_batch_size=32, max_wait_ms=2):
+        self.classifier = classifier
+        self.labels = np.asarray(labels)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def predict(self, features):
+        """Predict the label of one feature row, shape (n_features,) or (1, n_features)"""
+        future = Future()
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            self._requests.put((np.asarray(features).reshape(-1), future))
+            return future.result()
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+    def close(self):
+        """Stop the worker once already-queued rows are answered"""
+        self._requests.put(None)
+        self._worker.join()
+
+    def _next_batch(self):
+        first = self._requests.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Nobody else has a row on the way, so waiting cannot grow the batch
+            if self._in_flight <= len(batch) and self._requests.empty():
+                break
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._requests.get(timeout=timeout) if timeout > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Answer this batch first, then let _run see the shutdown
+                self._requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            rows = np.vstack([row for row, _ in batch])
+            try:
+                labels = self.labels[self.classifier.predict(rows)].tolist()
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(batch)
+            for (_, future), label in zip(batch, labels):
+                future.set_result(label)
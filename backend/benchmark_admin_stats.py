@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/admin/stats data access at 1M records
+Compares the four COUNT(*) scans the route used to run against the
+trigger-maintained counters, with and without the TTL cache in front, and
+measures the write overhead the triggers add to inserts
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from database import connect, init_db
+from stats import TTLCache, read_admin_stats
+
+N_RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+REPEATS = 20
+
+
+def scan_stats(conn):
+    """The previous /api/admin/stats implementation"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'patient'")
+    patients = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'doctor'")
+    doctors = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM medical_records")
+    records = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM appointments")
+    appointments = cursor.fetchone()[0]
+    return {'patients': patients, 'doctors': doctors, 'records': records, 'appointments': appointments}
+
+
+def timed(fn, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def insert_records(conn, n, offset=0):
+    rng = random.Random(offset)
+    start = time.perf_counter()
+    conn.executemany('''
+        INSERT INTO medical_records (patient_id, record_type, title, status, created_at)
+        VALUES (?, 'lab', 'r', ?, datetime('2024-01-01', ?))
+    ''', ((rng.randrange(3, 10003), 'pending' if rng.random() < 0.01 else 'verified', f"+{(offset + i) // 2000} days")
+          for i in range(n)))
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, 'bench.db')
+        init_db(path)
+        conn = connect(path)
+        conn.executemany("INSERT INTO users (email, password, role, name) VALUES (?, 'x', 'patient', 'P')",
+                         ((f"p{i}@example.com",) for i in range(10000)))
+        conn.executemany("INSERT INTO appointments (patient_id, doctor_id, appointment_date) VALUES (3, 2, '2030-01-01')",
+                         (() for _ in range(N_RECORDS // 10)))
+        conn.commit()
+
+        print(f"🏗️ Inserting {N_RECORDS:,} records...")
+        with_triggers = insert_records(conn, N_RECORDS)
+        print(f"   {N_RECORDS / with_triggers:,.0f} inserts/s with stats triggers")
+
+        scan = scan_stats(conn)
+        counters = read_admin_stats(conn)
+        assert all(counters[k] == v for k, v in scan.items()), (scan, counters)
+
+        cache = TTLCache(lambda: read_admin_stats(conn), ttl=5.0)
+        print(f"\n{'implementation':28s} {'ms/request':>11s}")
+        print(f"{'4x COUNT(*) scans':28s} {timed(lambda: scan_stats(conn)):11.3f}")
+        print(f"{'counter tables':28s} {timed(lambda: read_admin_stats(conn), 200):11.3f}")
+        print(f"{'counter tables + TTL cache':28s} {timed(cache.get, 10000):11.5f}")
+
+        for trigger in [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]:
+            conn.execute(f"DROP TRIGGER {trigger}")
+        n = min(N_RECORDS, 200000)
+        without = insert_records(conn, n, offset=N_RECORDS)
+        print(f"\n   {n / without:,.0f} inserts/s without triggers (write overhead "
+              f"{(with_triggers / N_RECORDS) / (without / n) - 1:.0%})")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark exercise state classification under concurrency
+Compares one RandomForest predict + inverse_transform per frame with the
+MicroBatchClassifier, reporting aggregate predictions/sec per client count
+"""
+
+import threading
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from batch_inference import MicroBatchClassifier
+
+LABELS = ['jumping_jacks_down', 'jumping_jacks_up', 'pullups_down', 'pullups_up', 'pushups_down',
+          'pushups_up', 'situp_down', 'situp_up', 'squats_down', 'squats_up']
+DURATION = 3.0
+CLIENTS = [1, 4, 16, 64]
+
+
+def train_classifier():
+    """Stand-in for random_forest.joblib: 100 trees over 21 pose features"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, 21))
+    y = rng.choice(LABELS, size=5000)
+    encoder = LabelEncoder().fit(LABELS)
+    classifier = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, encoder.transform(y))
+    return classifier, encoder
+
+
+def run_clients(n_clients, predict_one):
+    rows = np.random.default_rng(1).normal(size=(n_clients, 21))
+    counts = [0] * n_clients
+    stop = time.monotonic() + DURATION
+
+    def client(i):
+        while time.monotonic() < stop:
+            predict_one(rows[i])
+            counts[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / DURATION
+
+
+def main():
+    classifier, encoder = train_classifier()
+
+    def direct(row):
+        return encoder.inverse_transform(classifier.predict(row.reshape(1, -1)))[0]
+
+    print(f"🏁 {DURATION:.0f}s per run\n")
+    print(f"{'clients':>7s} {'per-row pred/s':>15s} {'batched pred/s':>15s} {'mean batch':>11s}")
+    for n_clients in CLIENTS:
+        before = run_clients(n_clients, direct)
+        batcher = MicroBatchClassifier(classifier, encoder.classes_, max_batch_size=64, max_wait_ms=2)
+        after = run_clients(n_clients, batcher.predict)
+        batcher.close()
+        print(f"{n_clients:7d} {before:15.0f} {after:15.0f} {batcher.rows / max(batcher.batches, 1):11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark healthcare model throughput in patients/sec
+Scores the same synthetic population one patient at a time (predict_treatment
++ predict_risk, as the recommendations route used to) and with predict_batch
+at several batch sizes
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from ml_models import healthcare_ai
+
+POPULATION = 10000
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+SAMPLE = 500
+
+
+def population(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        'age': int(rng.integers(18, 90)),
+        'gender': 'male' if rng.random() < 0.5 else 'female',
+        'bmi': float(rng.normal(26, 5)),
+        'bp_systolic': float(rng.normal(125, 20)),
+        'glucose': float(rng.normal(105, 30)),
+        'diabetes': bool(rng.random() < 0.2),
+        'hypertension': bool(rng.random() < 0.3),
+        'heart_disease': bool(rng.random() < 0.1),
+        'smoking': bool(rng.random() < 0.2),
+        'alcohol': bool(rng.random() < 0.3)
+    } for _ in range(n)]
+
+
+def main():
+    healthcare_ai.load_models()
+    patients = population(POPULATION)
+    healthcare_ai.predict_batch(patients[:10])  # warm up
+
+    print(f"🧠 Scoring {POPULATION} patients with models {healthcare_ai.version}\n")
+    print(f"{'mode':18s} {'seconds':>8s} {'patients/s':>11s}")
+
+    # The slow modes run on a sample and are extrapolated to the population
+    def report(mode, n, elapsed):
+        note = '' if n == POPULATION else f"  (extrapolated from {n})"
+        print(f"{mode:18s} {elapsed * POPULATION / n:8.2f} {n / elapsed:11.0f}{note}")
+
+    start = time.perf_counter()
+    for patient in patients[:SAMPLE]:
+        healthcare_ai.predict_treatment(patient)
+        healthcare_ai.predict_risk(patient)
+    report('per patient', SAMPLE, time.perf_counter() - start)
+
+    for batch_size in BATCH_SIZES:
+        n = min(POPULATION, max(SAMPLE, batch_size * 10))
+        start = time.perf_counter()
+        for i in range(0, n, batch_size):
+            healthcare_ai.predict_batch(patients[i:i + batch_size])
+        report(f"batch of {batch_size}", n, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark the data-access layer through the Flask routes
+Compares requests/sec for /api/patient/records and /api/auth/status with a
+fresh rollback-journal connection per request (the old get_db()) against the
+pooled WAL connections from database.db()
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+DURATION = 3.0
+THREADS = [1, 8]
+N_RECORDS = 50
+
+workdir = tempfile.mkdtemp()
+os.environ['HEALTHCARE_DB'] = os.path.join(workdir, 'pooled.db')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+import database
+import services
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (email, password, role, name) VALUES ('bench@example.com', 'x', 'patient', 'Bench')")
+    patient_id = cursor.lastrowid
+    doctor_id = cursor.execute("SELECT id FROM users WHERE role = 'doctor'").fetchone()[0]
+    cursor.executemany('''
+        INSERT INTO medical_records (patient_id, doctor_id, record_type, title, description, ai_analysis)
+        VALUES (?, ?, 'lab', ?, 'Routine bloodwork', 'AI Analysis: normal')
+    ''', [(patient_id, doctor_id if i % 2 else None, f"Record {i}") for i in range(N_RECORDS)])
+    conn.commit()
+    conn.close()
+    return patient_id
+
+
+def legacy_db(path):
+    """The old access pattern: connect, query, commit, close on every request"""
+    @contextmanager
+    def connection():
+        conn = sqlite3.connect(path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+    return connection
+
+
+def run(url, patient_id, n_threads):
+    counts = [0] * n_threads
+    stop = time.monotonic() + DURATION
+
+    def client(i):
+        with app_module.app.test_client() as c:
+            with c.session_transaction() as s:
+                s['user_id'] = patient_id
+                s['role'] = 'patient'
+            while time.monotonic() < stop:
+                assert c.get(url).status_code == 200
+                counts[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / DURATION
+
+
+def main():
+    pooled_path = os.environ['HEALTHCARE_DB']
+    patient_id = seed(pooled_path)
+
+    legacy_path = os.path.join(workdir, 'legacy.db')
+    shutil.copy(pooled_path, legacy_path)
+    conn = sqlite3.connect(legacy_path)
+    conn.execute('PRAGMA journal_mode = DELETE')
+    conn.close()
+
+    print(f"🏁 {DURATION:.0f}s per run, {N_RECORDS} records\n")
+    print(f"{'endpoint':24s} {'threads':>7s} {'before req/s':>13s} {'after req/s':>12s}")
+    try:
+        for url in ['/api/patient/records', '/api/auth/status']:
+            for n_threads in THREADS:
+                services.db = legacy_db(legacy_path)
+                before = run(url, patient_id, n_threads)
+                services.db = database.db
+                after = run(url, patient_id, n_threads)
+                print(f"{url:24s} {n_threads:7d} {before:13.0f} {after:12.0f}")
+    finally:
+        database.pool.close()
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Latency of the face emotion CNN on each runtime in emotion_runtime.py
+Reports p50/p99 per call for one face (the per-frame case) and for a batch
+of eight, the model size, and the largest probability difference from
+Keras model.predict on face crops from the sample images
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from emotion_ai import emotion_ai
+from emotion_runtime import compile_face_model
+from test_emotion_runtime import sample_faces
+
+CALLS = 200
+RUNTIMES = ['keras', 'function', 'tflite', 'tflite-dynamic', 'tflite-int8']
+
+
+def latencies(runner, batch, calls):
+    runner(batch)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        runner(batch)
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    faces = sample_faces()
+    batch = np.concatenate([faces, faces])[:8]
+    expected = compile_face_model(emotion_ai.face_model, 'keras')(faces)
+
+    print(f"🙂 Emotion CNN, {CALLS} calls per row, {os.cpu_count()} CPUs\n")
+    print(f"{'runtime':15s} {'1 face p50':>11s} {'p99':>7s} {'8 faces p50':>12s} {'p99':>7s} "
+          f"{'size KB':>8s} {'max |diff|':>11s}")
+    for runtime in RUNTIMES:
+        runner = compile_face_model(emotion_ai.face_model, runtime, calibration_faces=faces)
+        calls = CALLS if runtime != 'keras' else CALLS // 4
+        single = latencies(runner, faces[:1], calls)
+        batched = latencies(runner, batch, calls)
+        size = len(runner.model_content) / 1024 if hasattr(runner, 'model_content') else float('nan')
+        diff = np.abs(runner(faces) - expected).max()
+        print(f"{runtime:15s} {single[0]:11.2f} {single[1]:7.2f} {batched[0]:12.2f} {batched[1]:7.2f} "
+              f"{size:8.0f} {diff:11.2e}")
+
+
+if __name__ == "__main__":
+    main()
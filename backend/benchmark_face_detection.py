@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Per-frame latency of face analysis on 1280x720 webcam-sized frames
+Compares the original full-resolution Haar pass with downscaled detection
+and with the per-session ROI, for the detection stage alone and for the
+whole analyze_face_image call (decode + detection + emotion CNN), and
+reports how often each configuration finds the face the reference finds
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from face_detection import FaceDetector, HaarBackend
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FRAMES = ['api_test_annotated.jpg', 'enhanced_annotated_bicep_curl.jpg', 'enhanced_annotated_jumping_jack.jpg',
+          'enhanced_annotated_plank.jpg', 'enhanced_annotated_pullup.jpg', 'enhanced_annotated_pushup.jpg',
+          'enhanced_annotated_situp.jpg', 'enhanced_annotated_squat.jpg', 'enhanced_test_pose.jpg']
+REPEATS = 3
+
+
+def configurations():
+    return [
+        ('full-res, 1.3 (original)', FaceDetector(HaarBackend(scale_factor=1.3), max_side=0), None),
+        ('downscaled to 480', FaceDetector(), None),
+        ('downscaled + session ROI', FaceDetector(), 'bench'),
+    ]
+
+
+def percentiles(samples):
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    grays = [cv2.imread(os.path.join(HERE, name), cv2.IMREAD_GRAYSCALE) for name in FRAMES]
+    jpegs = [open(os.path.join(HERE, name), 'rb').read() for name in FRAMES]
+    reference = [bool(faces) for faces in map(FaceDetector(HaarBackend(1.1), max_side=0).detect, grays)]
+    print(f"🙂 {len(FRAMES)} frames of {grays[0].shape[1]}x{grays[0].shape[0]} x {REPEATS} passes, "
+          f"{sum(reference)} with a face (fine full-resolution search)\n")
+
+    print("Detection stage")
+    print(f"{'detector':28s} {'p50 ms':>8s} {'p99 ms':>8s} {'faces found':>12s}")
+    for name, detector, session_id in configurations():
+        latencies, found = [], 0
+        for _ in range(REPEATS):
+            # Consecutive frames of one pose, as a camera stream would send them
+            for gray, has_face in zip(grays, reference):
+                start = time.perf_counter()
+                faces = detector.detect(gray, session_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found += bool(faces) and has_face
+        p50, p99 = percentiles(latencies)
+        print(f"{name:28s} {p50:8.1f} {p99:8.1f} {found:>6d}/{sum(reference) * REPEATS}")
+
+    from emotion_ai import emotion_ai
+    print("\nanalyze_face_image (decode + detection + CNN)")
+    print(f"{'detector':28s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    emotion_ai.analyze_face_image(jpegs[0])  # build the Keras predict function
+    for name, detector, session_id in configurations():
+        emotion_ai.face_detector = detector
+        latencies = []
+        for _ in range(REPEATS):
+            for jpeg in jpegs:
+                start = time.perf_counter()
+                emotion_ai.analyze_face_image(jpeg, session_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+        p50, p99 = percentiles(latencies)
+        print(f"{name:28s} {p50:8.1f} {p99:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Load test the Flask dev server against uvicorn serving the FastAPI port
+Starts each server as a subprocess on a throwaway database, logs a pool of
+client threads in, and hammers a session check, a keyset page and a
+recommendation, reporting requests/s and p50/p99 latency per endpoint
+"""
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLIENTS = int(os.environ.get('BENCH_CLIENTS', '16'))
+REQUESTS_PER_CLIENT = int(os.environ.get('BENCH_REQUESTS', '100'))
+WORKERS = int(os.environ.get('BENCH_WORKERS', str(os.cpu_count() or 1)))
+PROFILE = {'profile': {'age': 58, 'gender': 'male', 'medicalHistory': 'Diabetes, hypertension'}}
+ENDPOINTS = [
+    ('auth status', 'GET', '/api/auth/status', None),
+    ('records page', 'GET', '/api/doctor/records?limit=50', None),
+    ('recommendations', 'POST', '/api/personalized-recommendations', PROFILE),
+]
+
+
+def server_commands(port):
+    flask = [sys.executable, '-c', f"import app; app.app.run(port={port}, threaded=True)"]
+    fastapi = [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port),
+               '--workers', str(WORKERS), '--log-level', 'warning']
+    return [('Flask dev server', flask), (f'uvicorn x{WORKERS}', fastapi)]
+
+
+def request(conn, method, path, body=None, cookie=None):
+    headers = {'Content-Type': 'application/json'}
+    if cookie:
+        headers['Cookie'] = cookie
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    response.read()
+    return response
+
+
+def wait_until_up(port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            request(conn, 'GET', '/api/auth/status')
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def login(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    response = request(conn, 'POST', '/api/login', {'email': 'doctor@healthcare.com', 'password': 'doctor123'})
+    assert response.status == 200, response.status
+    return conn, response.getheader('Set-Cookie').split(';')[0]
+
+
+def load(port, method, path, body):
+    """Return (requests/s, latencies) for CLIENTS threads each sending REQUESTS_PER_CLIENT requests"""
+    sessions = [login(port) for _ in range(CLIENTS)]
+    latencies = [[] for _ in range(CLIENTS)]
+    errors = []
+    start_gate = threading.Barrier(CLIENTS + 1)
+
+    def client(i):
+        conn, cookie = sessions[i]
+        start_gate.wait()
+        for _ in range(REQUESTS_PER_CLIENT):
+            t0 = time.perf_counter()
+            status = request(conn, method, path, body, cookie).status
+            latencies[i].append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(CLIENTS)]
+    for t in threads:
+        t.start()
+    start_gate.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert not errors, f"{len(errors)} failed requests, e.g. {errors[0]}"
+    return CLIENTS * REQUESTS_PER_CLIENT / elapsed, np.concatenate(latencies) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        os.environ['HEALTHCARE_DB'] = db_path
+        from database import init_db
+        init_db(db_path)  # migrate once, before several workers open it
+
+        print(f"🔁 {CLIENTS} clients x {REQUESTS_PER_CLIENT} requests per endpoint, {os.cpu_count()} CPUs\n")
+        print(f"{'server':18s} {'endpoint':16s} {'req/s':>8s} {'p50 ms':>8s} {'p99 ms':>8s}")
+        base_port = 8800 + os.getpid() % 100
+        for offset, (name, _) in enumerate(server_commands(0)):
+            port = base_port + offset
+            name, command = server_commands(port)[offset]
+            server = subprocess.Popen(command, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up(port)
+                load(port, *ENDPOINTS[2][1:])  # warm the models in every worker
+                for label, method, path, body in ENDPOINTS:
+                    rate, latencies = load(port, method, path, body)
+                    print(f"{name:18s} {label:16s} {rate:8.0f} {np.percentile(latencies, 50):8.1f} "
+                          f"{np.percentile(latencies, 99):8.1f}")
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
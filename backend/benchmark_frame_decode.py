@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of per-frame decode cost for the exercise/face endpoints
+Compares the legacy base64 + PIL path with cv2.imdecode on the JSON
+data URL and on a raw image/jpeg upload, plus the bytes on the wire
+"""
+
+import base64
+import io
+import os
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from image_utils import decode_image
+
+ITERATIONS = 200
+
+
+def legacy_decode(image_data):
+    """Old path: data URL -> base64 -> PIL -> NumPy -> RGB->BGR -> BGR->RGB"""
+    image_bytes = base64.b64decode(image_data.split(',')[1])
+    image_np = np.array(Image.open(io.BytesIO(image_bytes)))
+    image_bgr = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+    return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+
+
+def imdecode_frame(image_data):
+    """New path: cv2.imdecode to BGR, one conversion to RGB for MediaPipe"""
+    return cv2.cvtColor(decode_image(image_data), cv2.COLOR_BGR2RGB)
+
+
+def time_per_frame(fn, payload):
+    fn(payload)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(payload)
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def main():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg')
+    frame = cv2.imread(path)
+    jpeg_bytes = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+    data_url = f"data:image/jpeg;base64,{base64.b64encode(jpeg_bytes).decode('utf-8')}"
+
+    print(f"🖼️ Frame {frame.shape[1]}x{frame.shape[0]}, {ITERATIONS} iterations\n")
+    print(f"{'path':36s} {'ms/frame':>9s} {'wire bytes':>11s}")
+    rows = [
+        ('JSON data URL, PIL (legacy)', legacy_decode, data_url),
+        ('JSON data URL, cv2.imdecode', imdecode_frame, data_url),
+        ('raw image/jpeg, cv2.imdecode', imdecode_frame, jpeg_bytes),
+    ]
+    for name, fn, payload in rows:
+        print(f"{name:36s} {time_per_frame(fn, payload):9.2f} {len(payload):11d}")
+
+
+if __name__ == "__main__":
+    main()
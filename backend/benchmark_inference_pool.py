@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Load test for the multi-process inference pool
+Drives concurrent exercise sessions through the inline analyzer and through
+InferencePool with 1..N workers, reporting aggregate frames/sec
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from exercise_analyzer import ExerciseAnalyzer
+from inference_pool import InferencePool
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg')
+
+
+def run_sessions(analyzer, image_bytes, n_sessions, duration):
+    counts = [0] * n_sessions
+    stop = time.monotonic() + duration
+
+    def client(i):
+        while time.monotonic() < stop:
+            analyzer.analyze_exercise(image_bytes, 'squat', f"load-{i}", render='none')
+            counts[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the pose inference pool')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='largest pool size to try')
+    parser.add_argument('--sessions', type=int, default=0, help='concurrent sessions (default: 2 per worker)')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per run')
+    args = parser.parse_args()
+
+    with open(IMAGE_PATH, 'rb') as f:
+        image_bytes = f.read()
+    n_sessions = args.sessions or 2 * args.max_workers
+
+    print(f"🏁 {n_sessions} sessions, {args.duration:.0f}s per run, {os.cpu_count()} CPUs\n")
+    inline = run_sessions(ExerciseAnalyzer(), image_bytes, n_sessions, args.duration)
+    print(f"{'workers':>7s} {'frames/s':>9s} {'speedup':>8s}")
+    print(f"{'inline':>7s} {inline:9.1f} {1.0:8.2f}")
+
+    for n_workers in range(1, args.max_workers + 1):
+        pool = InferencePool(n_workers, load_face_model=False)
+        try:
+            pool.warm_up()
+            fps = run_sessions(pool, image_bytes, n_sessions, args.duration)
+        finally:
+            pool.shutdown()
+        print(f"{n_workers:7d} {fps:9.1f} {fps / inline:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
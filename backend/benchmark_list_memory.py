@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory use of the list endpoints at 1M rows
+Each run happens in a fresh process that samples its RSS while it serves
+/api/admin/users: once the old way (fetchall + list + jsonify) and once
+streamed from the cursor. Reports the RSS growth over the idle baseline.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SIZES = [100000, 500000, 1000000]
+
+
+def rss_mb():
+    """Anonymous (heap) RSS; SQLite's mmap'd database pages are file-backed and excluded"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def build(path, n_users):
+    from database import connect, init_db
+    init_db(path)
+    conn = connect(path)
+    conn.executemany("INSERT INTO users (email, password, role, name, phone) VALUES (?, 'x', 'patient', ?, '555-0100')",
+                     ((f"user{i}@example.com", f"Patient Number {i}") for i in range(n_users)))
+    conn.commit()
+    conn.close()
+
+
+def measure(path, mode, n_rows):
+    """Child process: serve the listing once and print peak RSS growth as JSON"""
+    import database
+    database.pool = database.ConnectionPool(path)
+    import app as app_module
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = 1
+        s['role'] = 'admin'
+
+    baseline = rss_mb()
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], rss_mb())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    received = 0
+    if mode == 'fetchall':
+        # The pre-pagination handler body
+        with app_module.app.test_request_context():
+            with database.db() as conn:
+                users = conn.execute('SELECT id, email, role, name, phone, created_at FROM users ORDER BY created_at DESC').fetchall()
+            response = app_module.jsonify([{
+                'id': u[0], 'email': u[1], 'role': u[2], 'name': u[3], 'phone': u[4], 'created_at': u[5]
+            } for u in users])
+            received = len(response.get_data())
+    else:
+        response = client.get('/api/admin/users', buffered=False)
+        for chunk in response.response:
+            received += len(chunk)
+        response.close()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    print(json.dumps({'growth_mb': peak[0] - baseline, 'seconds': elapsed, 'bytes': received}))
+
+
+def main():
+    if len(sys.argv) == 4:
+        measure(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+        return
+
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, HEALTHCARE_DB=os.path.join(workdir, 'unused.db'), TF_CPP_MIN_LOG_LEVEL='3')
+    try:
+        print(f"{'rows':>8s} {'mode':>9s} {'RSS growth MB':>14s} {'seconds':>8s} {'body MB':>8s}")
+        for n_users in SIZES:
+            path = os.path.join(workdir, f"users_{n_users}.db")
+            build(path, n_users)
+            for mode in ['fetchall', 'stream']:
+                out = subprocess.run([sys.executable, __file__, path, mode, str(n_users)], env=env,
+                                     capture_output=True, text=True, check=True).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                print(f"{n_users:8d} {mode:>9s} {result['growth_mb']:14.1f} {result['seconds']:8.2f} "
+                      f"{result['bytes'] / 1e6:8.1f}")
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark what the first recommendation request pays for the healthcare models
+Compares training on demand (what a request did when the .pkl files were
+missing or failed to load) with loading a saved model bundle, and times the
+steady-state predict_treatment + predict_risk call after either
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ml_models import PersonalizedHealthcareAI
+
+RUNS = 5
+PREDICTIONS = 200
+PATIENT = {'age': 58, 'gender': 'male', 'bmi': 31, 'bp_systolic': 150, 'glucose': 140,
+           'diabetes': True, 'hypertension': True, 'smoking': True}
+
+
+def best_of(fn):
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer = PersonalizedHealthcareAI()
+        train_s = best_of(lambda: trainer.train_models(seed=42))
+        save_s = best_of(lambda: trainer.save_models(model_dir))
+        size_kb = os.path.getsize(os.path.join(model_dir, f"healthcare-{trainer.version}.joblib")) / 1024
+
+        served = PersonalizedHealthcareAI()
+        load_s = best_of(lambda: served.load_models(model_dir))
+
+        def predict():
+            for _ in range(PREDICTIONS):
+                served.predict_treatment(PATIENT)
+                served.predict_risk(PATIENT)
+        predict_ms = best_of(predict) / PREDICTIONS * 1000
+
+    print(f"🧠 Healthcare model bundle ({size_kb:.0f} KB, best of {RUNS})\n")
+    print(f"{'train on demand':22s} {train_s * 1000:9.1f} ms")
+    print(f"{'save bundle':22s} {save_s * 1000:9.1f} ms")
+    print(f"{'load bundle':22s} {load_s * 1000:9.1f} ms")
+    print(f"{'treatment + risk call':22s} {predict_ms:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Per-face emotion inference cost as the number of faces in a frame grows
+Compares one model call per face (the old loop) with all faces stacked
+into one (N, 48, 48, 1) batch, the way analyze_face_image now runs
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+
+from emotion_ai import emotion_ai
+
+FACE_COUNTS = [1, 2, 4, 8, 16, 32]
+REPEATS = 5
+
+
+def time_ms(fn):
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_annotated_squat.jpg')
+    gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    face = emotion_ai.face_detector.detect(gray)[0]
+
+    print(f"🙂 Emotion CNN on N faces of a {gray.shape[1]}x{gray.shape[0]} frame, {REPEATS} repeats\n")
+    print(f"{'faces':>5s} {'per-face calls ms':>18s} {'batched ms':>11s} {'ms/face':>8s} {'speedup':>8s}")
+    for n in FACE_COUNTS:
+        boxes = [face] * n
+        looped = time_ms(lambda: [emotion_ai.predict_emotions(gray, [box]) for box in boxes])
+        batched = time_ms(lambda: emotion_ai.predict_emotions(gray, boxes))
+        print(f"{n:5d} {looped:18.1f} {batched:11.1f} {batched / n:8.2f} {looped / batched:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
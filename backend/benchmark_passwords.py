@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark password hashing cost and login throughput
+Times one hash per scheme/cost, then drives /api/login with concurrent
+clients at the default scrypt cost and reports logins/sec, latency and how
+many requests the bounded pool turned away with 503
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import passwords
+from database import ConnectionPool, connect, init_db
+
+DURATION = 5.0
+CLIENTS = [1, 4, 16, 64]
+
+
+def time_hash(fn, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run_logins(client_factory, n_clients):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    stop = time.monotonic() + DURATION
+
+    def client():
+        c = client_factory()
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            status = c.post('/api/login', json={'email': 'bench@example.com', 'password': 'bench-pw'}).status_code
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(n_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+    return statuses.get(200, 0) / DURATION, p50, statuses.get(503, 0)
+
+
+def main():
+    print(f"🔐 Hash cost ({os.cpu_count()} CPUs)\n")
+    print(f"{'scheme':28s} {'ms/hash':>8s}")
+    print(f"{'sha256 (legacy, unsalted)':28s} {time_hash(lambda: hashlib.sha256(b'pw').hexdigest(), 1000):8.3f}")
+    print(f"{'pbkdf2_sha256 600k':28s} {time_hash(lambda: hashlib.pbkdf2_hmac('sha256', b'pw', b'salt', 600000), 2):8.1f}")
+    for log_n in [12, 13, 14, 15]:
+        marker = '  <- default' if 2 ** log_n == passwords.SCRYPT_N else ''
+        print(f"{'scrypt n=2^%d r=8 p=1' % log_n:28s} {time_hash(lambda: passwords.hash_password('pw', n=2 ** log_n)):8.1f}{marker}")
+
+    import app as app_module
+    import services
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        init_db(path)
+        database.pool = ConnectionPool(path)
+        conn = connect(path)
+        conn.execute("INSERT INTO users (email, password, role, name) VALUES ('bench@example.com', ?, 'patient', 'Bench')",
+                     (passwords.hash_password('bench-pw'),))
+        conn.commit()
+        conn.close()
+
+        hasher = services.password_hasher
+        print(f"\n🏁 /api/login, {DURATION:.0f}s per run, pool of {hasher._executor._max_workers} worker(s)\n")
+        print(f"{'clients':>7s} {'logins/s':>9s} {'p50 ms':>8s} {'503s':>6s}")
+        for n_clients in CLIENTS:
+            rate, p50, rejected = run_logins(app_module.app.test_client, n_clients)
+            print(f"{n_clients:7d} {rate:9.1f} {p50:8.1f} {rejected:6d}")
+        database.pool.close()
+
+
+if __name__ == "__main__":
+    main()
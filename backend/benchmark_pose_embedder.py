@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark FullBodyPoseEmbedder throughput
+Compares the original per-landmark embedder with the vectorized one,
+per pose and on (N, 33, 3) batches
+"""
+
+import time
+
+from exercise_analyzer import FullBodyPoseEmbedder
+from test_pose_embedder import ReferencePoseEmbedder, random_poses
+
+N_POSES = 2000
+BATCH_SIZES = [1, 16, 256, 2000]
+
+
+def poses_per_second(fn, poses, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(poses)
+        best = min(best, time.perf_counter() - start)
+    return len(poses) / best
+
+
+def main():
+    poses = random_poses(N_POSES)
+    reference = ReferencePoseEmbedder()
+    embedder = FullBodyPoseEmbedder()
+
+    print(f"🏁 {N_POSES} poses\n")
+    baseline = poses_per_second(lambda ps: [reference(p) for p in ps], poses)
+    print(f"{'reference, per pose':28s} {baseline:12,.0f} poses/s")
+    per_pose = poses_per_second(lambda ps: [embedder(p) for p in ps], poses)
+    print(f"{'vectorized, per pose':28s} {per_pose:12,.0f} poses/s ({per_pose / baseline:.1f}x)")
+
+    for batch_size in BATCH_SIZES:
+        def run(ps):
+            for i in range(0, len(ps), batch_size):
+                embedder(ps[i:i + batch_size])
+        rate = poses_per_second(run, poses)
+        print(f"{f'vectorized, batch of {batch_size}':28s} {rate:12,.0f} poses/s ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark MediaPipe pose throughput on the bundled sample images
+Compares building a Pose graph per frame (old behaviour) with the
+warm, video-mode PoseEnginePool used by ExerciseAnalyzer
+"""
+
+import glob
+import os
+import time
+
+import cv2
+import mediapipe as mp
+
+from exercise_analyzer import PoseEnginePool
+
+FRAMES_PER_IMAGE = 30
+
+
+def load_sample_frames():
+    """Load every bundled .jpg as an RGB frame"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.jpg'))):
+        image = cv2.imread(path)
+        if image is not None:
+            frames.append((os.path.basename(path), cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))
+    return frames
+
+
+def bench_per_frame_construction(image_rgb, n_frames):
+    """Old path: a fresh Pose graph inside a `with` block for every frame"""
+    start = time.perf_counter()
+    for _ in range(n_frames):
+        with mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
+            pose.process(image_rgb)
+    return n_frames / (time.perf_counter() - start)
+
+
+def bench_pooled_engine(pool, session_id, image_rgb, n_frames):
+    """New path: one warm engine per session, tracking across frames"""
+    pool.process(session_id, image_rgb)  # warm-up / first detection
+    start = time.perf_counter()
+    for _ in range(n_frames):
+        pool.process(session_id, image_rgb)
+    return n_frames / (time.perf_counter() - start)
+
+
+def main():
+    frames = load_sample_frames()
+    if not frames:
+        print("❌ No sample images found")
+        return
+
+    pool = PoseEnginePool()
+    print(f"🏁 {FRAMES_PER_IMAGE} frames per image\n")
+    print(f"{'image':40s} {'per-frame fps':>14s} {'pooled fps':>12s} {'speedup':>8s}")
+
+    totals = [0.0, 0.0]
+    for name, image_rgb in frames:
+        before = bench_per_frame_construction(image_rgb, FRAMES_PER_IMAGE)
+        after = bench_pooled_engine(pool, name, image_rgb, FRAMES_PER_IMAGE)
+        totals[0] += before
+        totals[1] += after
+        print(f"{name:40s} {before:14.1f} {after:12.1f} {after / before:7.1f}x")
+
+    pool.close()
+    mean_before = totals[0] / len(frames)
+    mean_after = totals[1] / len(frames)
+    print(f"\n📊 Mean: {mean_before:.1f} fps -> {mean_after:.1f} fps ({mean_after / mean_before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot route queries on a 1M-record database
+Times patient records, doctor records and patient appointments on the
+original schema and queries, then again after the index migrations and the
+rewritten doctor query
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from database import (KEYSET_START, PATIENT_RECORDS_SQL, DOCTOR_RECORDS_SQL, PATIENT_APPOINTMENTS_SQL,
+                      connect, init_db, migrate)
+
+N_RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+N_PATIENTS = 10000
+N_DOCTORS = 100
+REPEATS = 20
+
+ORIGINAL_PATIENT_RECORDS_SQL = '''
+    SELECT r.*, u.name as doctor_name
+    FROM medical_records r
+    LEFT JOIN users u ON r.doctor_id = u.id
+    WHERE r.patient_id = ?
+    ORDER BY r.created_at DESC
+'''
+
+ORIGINAL_DOCTOR_RECORDS_SQL = '''
+    SELECT r.*, u.name as patient_name
+    FROM medical_records r
+    JOIN users u ON r.patient_id = u.id
+    WHERE r.status = 'pending' OR r.doctor_id = ?
+    ORDER BY r.created_at DESC
+'''
+
+
+def build(path):
+    """Base tables only (migrations not applied) filled with synthetic rows"""
+    init_db(path)
+    conn = connect(path)
+    for index in [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")]:
+        conn.execute(f"DROP INDEX {index}")
+    conn.execute('PRAGMA user_version = 0')
+
+    rng = random.Random(0)
+    conn.executemany("INSERT INTO users (email, password, role, name) VALUES (?, 'x', 'doctor', ?)",
+                     [(f"doc{i}@example.com", f"Dr {i}") for i in range(N_DOCTORS)])
+    conn.executemany("INSERT INTO users (email, password, role, name) VALUES (?, 'x', 'patient', ?)",
+                     [(f"patient{i}@example.com", f"Patient {i}") for i in range(N_PATIENTS)])
+    doctors = [row[0] for row in conn.execute("SELECT id FROM users WHERE role = 'doctor'")]
+    patients = [row[0] for row in conn.execute("SELECT id FROM users WHERE role = 'patient'")]
+
+    def records():
+        for i in range(N_RECORDS):
+            # ~0.5% of records still pending review
+            pending = rng.random() < 0.005
+            yield (rng.choice(patients), None if pending else rng.choice(doctors),
+                   'lab', f"Record {i}", 'pending' if pending else 'verified',
+                   "2024-01-01 00:00:00", f"+{i} seconds")
+
+    conn.executemany('''
+        INSERT INTO medical_records (patient_id, doctor_id, record_type, title, status, created_at)
+        VALUES (?, ?, ?, ?, ?, datetime(?, ?))
+    ''', records())
+    conn.executemany('''
+        INSERT INTO appointments (patient_id, doctor_id, appointment_date)
+        VALUES (?, ?, datetime('2024-01-01', ?))
+    ''', [(rng.choice(patients), rng.choice(doctors), f"+{i} hours") for i in range(N_RECORDS // 10)])
+    conn.commit()
+    return conn, patients, doctors
+
+
+def time_query(conn, sql, ids):
+    start = time.perf_counter()
+    rows = 0
+    for i in range(REPEATS):
+        if ':user_id' in sql:
+            # Keyset-paginated listing; time the unpaged walk like the old query
+            params = {'user_id': ids[i % len(ids)], 'after_created': KEYSET_START[0],
+                      'after_id': KEYSET_START[1], 'limit': -1}
+        else:
+            params = (ids[i % len(ids)],)
+        rows += len(conn.execute(sql, params).fetchall())
+    return (time.perf_counter() - start) / REPEATS * 1000, rows // REPEATS
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"🏗️ Building {N_RECORDS:,} records...")
+        start = time.perf_counter()
+        conn, patients, doctors = build(os.path.join(workdir, 'bench.db'))
+        print(f"   built in {time.perf_counter() - start:.1f}s\n")
+
+        before = {
+            'patient_records': time_query(conn, ORIGINAL_PATIENT_RECORDS_SQL, patients),
+            'doctor_records': time_query(conn, ORIGINAL_DOCTOR_RECORDS_SQL, doctors),
+            'patient_appointments': time_query(conn, PATIENT_APPOINTMENTS_SQL, patients),
+        }
+
+        start = time.perf_counter()
+        migrate(conn)
+        print(f"   migrations applied in {time.perf_counter() - start:.1f}s\n")
+        after = {
+            'patient_records': time_query(conn, PATIENT_RECORDS_SQL, patients),
+            'doctor_records': time_query(conn, DOCTOR_RECORDS_SQL, doctors),
+            'patient_appointments': time_query(conn, PATIENT_APPOINTMENTS_SQL, patients),
+        }
+        conn.close()
+
+        print(f"{'query':22s} {'rows':>6s} {'before ms':>10s} {'after ms':>9s} {'speedup':>8s}")
+        for name in before:
+            (b, rows), (a, _) = before[name], after[name]
+            print(f"{name:22s} {rows:6d} {b:10.2f} {a:9.3f} {b / a:7.0f}x")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Load test /api/personalized-recommendations with a repeated-profile workload
+Draws profiles Zipf-style from a realistic pool (ages, gender, the history
+keywords the route understands, lifestyle flags), so popular profiles recur
+as they do in production, and reports requests/s and the cache hit rate with
+the prediction cache on and off, on the compiled engine and on the plain
+sklearn/xgboost path
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+REQUESTS = 3000
+HISTORIES = ['', 'diabetes', 'hypertension', 'heart disease', 'diabetes, hypertension',
+             'hypertension and heart disease', 'diabetes, heart disease', 'diabetes, hypertension, heart']
+
+
+def profile_pool():
+    return [{'age': age, 'gender': gender, 'medicalHistory': history,
+             'lifestyle': {'smoking': smoking, 'alcohol': alcohol}}
+            for age in range(18, 91) for gender in ['male', 'female'] for history in HISTORIES
+            for smoking in [False, True] for alcohol in [False, True]]
+
+
+def workload(n, seed=0):
+    pool = profile_pool()
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(pool))
+    ranks = np.minimum(rng.zipf(1.3, n), len(pool)) - 1
+    return [pool[order[rank]] for rank in ranks], len(pool)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['HEALTHCARE_DB'] = os.path.join(tmp, 'bench.db')
+        import app as app_module
+        from lru_cache import LRUCache
+        from ml_models import healthcare_ai, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+
+        import services
+        services.healthcare_ai.get()  # load through the app's registry before timing
+        client = app_module.app.test_client()
+        with client.session_transaction() as s:
+            s['user_id'] = 1
+            s['role'] = 'patient'
+        profiles, pool_size = workload(REQUESTS)
+        bundle, engine = healthcare_ai._active
+        distinct = len({(p['age'], p['gender'], p['medicalHistory'], tuple(p['lifestyle'].values())) for p in profiles})
+
+        print(f"🔁 {REQUESTS} requests, {distinct} distinct of {pool_size} possible profiles "
+              f"(cache size {PREDICTION_CACHE_SIZE})\n")
+        print(f"{'models':16s} {'cache':6s} {'req/s':>8s} {'hit rate':>9s}")
+        for path, path_engine in [('sklearn/xgboost', None), ('compiled engine', engine)]:
+            for cache_size in [0, PREDICTION_CACHE_SIZE]:
+                healthcare_ai._active = (bundle, path_engine)
+                healthcare_ai.prediction_cache = LRUCache(cache_size, PREDICTION_CACHE_TTL)
+                start = time.perf_counter()
+                for profile in profiles:
+                    response = client.post('/api/personalized-recommendations', json={'profile': profile})
+                    assert response.status_code == 200
+                elapsed = time.perf_counter() - start
+                stats = healthcare_ai.prediction_cache.stats()
+                print(f"{path:16s} {'on' if cache_size else 'off':6s} {REQUESTS / elapsed:8.0f} "
+                      f"{stats['hit_rate']:9.1%}")
+
+
+if __name__ == "__main__":
+    main()
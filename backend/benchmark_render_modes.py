@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark the response rendering stage of exercise analysis
+Measures CPU time and JSON bytes per frame for each render mode
+"""
+
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from exercise_analyzer import ExerciseAnalyzer
+
+ITERATIONS = 100
+
+CONFIGS = [
+    ('jpeg (q=95, full size)', {'render': 'jpeg', 'jpeg_quality': 95, 'jpeg_scale': 1.0}),
+    ('jpeg (q=70, full size)', {'render': 'jpeg', 'jpeg_quality': 70, 'jpeg_scale': 1.0}),
+    ('jpeg (q=70, 0.5x)', {'render': 'jpeg', 'jpeg_quality': 70, 'jpeg_scale': 0.5}),
+    ('keypoints', {'render': 'keypoints', 'jpeg_quality': 95, 'jpeg_scale': 1.0}),
+    ('none', {'render': 'none', 'jpeg_quality': 95, 'jpeg_scale': 1.0}),
+]
+
+
+def main():
+    analyzer = ExerciseAnalyzer()
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg')
+    image_bgr = cv2.imread(path)
+    results = analyzer.pose_engines.process('bench', cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+    if not results.pose_landmarks:
+        print("❌ No pose detected in sample image")
+        return
+    landmarks = np.array([[lmk.x, lmk.y, lmk.z] for lmk in results.pose_landmarks.landmark], dtype=np.float32)
+
+    print(f"🖼️ Frame {image_bgr.shape[1]}x{image_bgr.shape[0]}, {ITERATIONS} iterations\n")
+    print(f"{'render mode':26s} {'ms/frame':>9s} {'JSON bytes':>11s}")
+    for name, options in CONFIGS:
+        def render():
+            return analyzer._render_payload(image_bgr, results.pose_landmarks, landmarks,
+                                            'squats_down', 3, 'squats', **options)
+        render()
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            payload = render()
+        elapsed = (time.perf_counter() - start) / ITERATIONS * 1000
+        print(f"{name:26s} {elapsed:9.2f} {len(json.dumps(payload)):11d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Text sentiment cost on long journal texts and on batches of entries
+Compares the original keyword scan (one substring search of the whole text
+per keyword), the same scan over the full weighted lexicon, and the
+compiled single-pass SentimentLexicon matcher
+"""
+
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sentiment_lexicon import SentimentLexicon
+
+TEXT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BATCH_ENTRIES = 10_000
+ENTRY_SIZE = 400
+REPEATS = 5
+FILLER = ("today i went to work and then came home to cook dinner with my family we talked about the week "
+          "ahead and the plans for the weekend the weather was cloudy in the morning").split()
+
+
+def original_keywords(text):
+    """analyze_text_sentiment's keyword counting before the lexicon matcher"""
+    stress_keywords = ['stressed', 'anxious', 'worried', 'overwhelmed', 'tired', 'sad', 'depressed', 'angry',
+                       'frustrated']
+    positive_keywords = ['happy', 'good', 'great', 'excellent', 'wonderful', 'amazing', 'calm', 'peaceful', 'relaxed']
+    text_lower = text.lower()
+    return (sum(1 for word in stress_keywords if word in text_lower),
+            sum(1 for word in positive_keywords if word in text_lower))
+
+
+def substring_scanner(lexicon):
+    """The original approach grown to the full lexicon: one substring search per term"""
+    terms = list(lexicon.terms) + list(lexicon.stems)
+
+    def scan(text):
+        text_lower = text.lower()
+        return sum(1 for term in terms if term in text_lower)
+    return scan
+
+
+def journal_text(size, lexicon, rng):
+    """Filler prose with roughly one lexicon term in ten words"""
+    terms = list(lexicon.terms)
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(terms) if rng.random() < 0.1 else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def time_ms(fn):
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    rng = random.Random(0)
+    lexicon = SentimentLexicon.load()
+    full_scan = substring_scanner(lexicon)
+    methods = [('original 18 keywords', original_keywords), (f'substring x{len(lexicon)} terms', full_scan),
+               (f'compiled x{len(lexicon)} terms', lexicon.analyze)]
+
+    print(f"📝 Sentiment of one long text, {REPEATS} repeats, ms\n")
+    print(f"{'chars':>9s} " + ' '.join(f"{name:>24s}" for name, _ in methods))
+    for size in TEXT_SIZES:
+        text = journal_text(size, lexicon, rng)
+        print(f"{size:9d} " + ' '.join(f"{time_ms(lambda: fn(text)):24.2f}" for _, fn in methods))
+
+    entries = [journal_text(ENTRY_SIZE, lexicon, rng) for _ in range(BATCH_ENTRIES)]
+    print(f"\n📚 {BATCH_ENTRIES} journal entries of {ENTRY_SIZE} chars\n")
+    print(f"{'method':26s} {'seconds':>8s} {'entries/s':>10s}")
+    batches = [(name, lambda fn=fn: [fn(entry) for entry in entries]) for name, fn in methods[:2]]
+    batches.append(('compiled analyze_batch', lambda: lexicon.analyze_batch(entries)))
+    for name, run in batches:
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        print(f"{name:26s} {seconds:8.3f} {BATCH_ENTRIES / seconds:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
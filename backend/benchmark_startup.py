@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark app startup time
+Measures how long a fresh process takes to import app.py and answer
+/api/auth/status with lazy model loading, versus loading every AI component
+up front as the app used to, and lists the slowest imports from
+`python -X importtime -c "import app"`
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS = 3
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+if sys.argv[1] == 'eager':
+    for model in app.services.models.models.values():
+        model.get()
+loaded = time.perf_counter() - start
+app.app.test_client().get('/api/auth/status')
+print(json.dumps({'import': imported, 'ready': time.perf_counter() - start, 'loaded': loaded}))
+'''
+
+
+def run_startup(mode, env, cwd):
+    out = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, mode], cwd=cwd, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top=8):
+    """(cumulative seconds, module) for the slowest top-level imports of app"""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Direct imports of app are nested one level (three spaces) deep
+        if name.startswith('   ') and not name.startswith('    '):
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HEALTHCARE_DB=os.path.join(tmp, 'bench.db'),
+                   PYTHONPATH=BACKEND_DIR, TF_CPP_MIN_LOG_LEVEL='3')
+        env.pop('MODEL_WARMUP', None)
+        run_startup('lazy', env, tmp)  # create and migrate the database once
+
+        print(f"🚀 Startup to first /api/auth/status response (best of {RUNS})\n")
+        print(f"{'mode':6s} {'import s':>9s} {'API ready s':>12s}")
+        for mode in ['eager', 'lazy']:
+            best = min((run_startup(mode, env, tmp) for _ in range(RUNS)), key=lambda r: r['ready'])
+            print(f"{mode:6s} {best['import']:9.2f} {best['ready']:12.2f}")
+
+        print("\n🐢 Slowest imports of app.py (python -X importtime, cumulative)\n")
+        for seconds, name in slowest_imports(env):
+            print(f"{seconds:8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
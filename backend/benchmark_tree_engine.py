@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-row treatment + risk inference latency (p50/p99)
+Compares the old per-request path (scaler.transform, treatment predict and
+predict_proba, XGBoost predict_proba), one sklearn/xgboost predict_proba per
+model, and the compiled tree engine
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from ml_models import PersonalizedHealthcareAI
+from tree_engine import CompiledHealthcareModels
+
+ROWS = 1000
+
+
+def old_path(bundle, row):
+    scaled = bundle['scaler'].transform([row])
+    bundle['treatment_model'].predict(scaled)
+    np.max(bundle['treatment_model'].predict_proba(scaled))
+    scaled = bundle['scaler'].transform([row])
+    bundle['risk_model'].predict_proba(scaled)
+
+
+def proba_path(bundle, row):
+    scaled = bundle['scaler'].transform([row])
+    bundle['treatment_model'].predict_proba(scaled)
+    bundle['risk_model'].predict_proba(scaled)
+
+
+def latencies(fn, rows):
+    fn(rows[0])
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000
+
+
+def main():
+    ai = PersonalizedHealthcareAI()
+    ai.load_models()
+    bundle = ai.bundle
+    start = time.perf_counter()
+    engine = CompiledHealthcareModels(bundle)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([rng.integers(18, 90, ROWS), rng.integers(0, 2, ROWS), rng.normal(26, 5, ROWS),
+                            rng.normal(125, 20, ROWS), rng.normal(105, 30, ROWS)] +
+                           [rng.integers(0, 2, ROWS) for _ in range(5)]).astype(float)
+
+    print(f"🌲 Single-row treatment + risk latency over {ROWS} rows (engine compiled in {compile_ms:.0f} ms)\n")
+    print(f"{'path':28s} {'p50 ms':>8s} {'p99 ms':>8s} {'rows/s':>8s}")
+    for name, fn in [('old (predict + 2x proba)', lambda row: old_path(bundle, row)),
+                     ('sklearn/xgboost proba', lambda row: proba_path(bundle, row)),
+                     ('compiled engine', engine.predict)]:
+        ms = latencies(fn, rows)
+        print(f"{name:28s} {np.percentile(ms, 50):8.3f} {np.percentile(ms, 99):8.3f} {1000 / ms.mean():8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Real-time factor of the streaming voice emotion pipeline on CPU
+Streams a 60-second recording as 100 ms PCM chunks through a VoiceStream
+and compares it with re-extracting features from the whole recording so
+far at every one-second step, as a whole-file reload per analysis would.
+Reports processing time / audio time and per-chunk latency
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from emotion_ai import emotion_ai
+from test_voice_analysis import synthetic_speech, to_pcm16
+from voice_analysis import MFCCExtractor, StreamingMFCC
+
+SECONDS = 60
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 0.1
+
+
+def streaming(pcm):
+    stream = emotion_ai.open_voice_stream(SAMPLE_RATE)
+    chunk_bytes = int(SAMPLE_RATE * CHUNK_SECONDS) * 2
+    latencies, windows = [], 0
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), chunk_bytes):
+        t0 = time.perf_counter()
+        windows += len(stream.push_pcm(pcm[offset:offset + chunk_bytes]))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    windows += len(stream.flush())
+    return time.perf_counter() - start, latencies, windows
+
+
+def whole_recording_reload(audio):
+    """Every second, extract features from the full recording so far and classify its last 3 s"""
+    start = time.perf_counter()
+    windows = 0
+    for end in range(3 * SAMPLE_RATE, len(audio) + 1, SAMPLE_RATE):
+        mfcc, rms, pitch = StreamingMFCC(MFCCExtractor(SAMPLE_RATE)).push(audio[:end])
+        emotion_ai.classify_voice(mfcc[-300:].mean(axis=0, keepdims=True))
+        windows += 1
+    return time.perf_counter() - start, windows
+
+
+def main():
+    audio = synthetic_speech(SECONDS, SAMPLE_RATE)
+    pcm = to_pcm16(audio)
+    emotion_ai.classify_voice(np.zeros((1, 40)))  # trace the voice model
+
+    elapsed, latencies, windows = streaming(pcm)
+    reload_elapsed, reload_windows = whole_recording_reload(audio)
+    print(f"🎤 {SECONDS} s of 16 kHz speech, {CHUNK_SECONDS * 1000:.0f} ms chunks, {os.cpu_count()} CPUs\n")
+    print(f"{'pipeline':26s} {'windows':>8s} {'seconds':>8s} {'RTF':>8s} {'x realtime':>11s}")
+    for name, seconds, count in [('streaming (VoiceStream)', elapsed, windows),
+                                 ('whole-recording reload', reload_elapsed, reload_windows)]:
+        print(f"{name:26s} {count:8d} {seconds:8.3f} {seconds / SECONDS:8.4f} {SECONDS / seconds:11.0f}")
+    print(f"\nper 100 ms chunk: p50 {np.percentile(latencies, 50):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
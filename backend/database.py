@@ -1,9 +1,292 @@
 import sqlite3
-import hashlib
+import base64
+import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from passwords import hash_password
 
-def init_db():
-    conn = sqlite3.connect('healthcare.db')
+# Resolve the database next to this file instead of relative to the CWD
+DB_PATH = os.environ.get('HEALTHCARE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'healthcare.db'))
+
+# Applied to every connection: WAL lets readers run alongside a writer,
+# NORMAL sync is durable in WAL mode without an fsync per commit, and
+# busy_timeout waits for a competing writer instead of failing
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -16000),      # 16 MB page cache
+    ('mmap_size', 268435456),    # 256 MB memory-mapped reads
+    ('temp_store', 'MEMORY'),
+    ('busy_timeout', 5000),
+)
+
+# Seconds a request waits for a free pooled connection before giving up
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '5'))
+
+def connect(path=None):
+    """Open a connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(path or DB_PATH, check_same_thread=False, cached_statements=256)
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+class PoolExhausted(Exception):
+    """Raised when no pooled connection frees up within the pool's timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived connections shared by request threads.
+
+    Connections are opened lazily up to max_size and handed out one caller at
+    a time, so each keeps its page cache and prepared-statement cache warm
+    across requests. Once all max_size are out, acquire waits up to timeout
+    seconds for one to be released, then raises PoolExhausted. A pool
+    inherited through fork() is discarded and rebuilt in the child, so
+    pre-forking servers get one pool per worker.
+    """
+
+    def __init__(self, path=None, max_size=8, timeout=POOL_TIMEOUT):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self._reset()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.max_size:
+                self._opened += 1
+                try:
+                    return connect(self.path)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolExhausted(f"No database connection free after {self.timeout}s") from None
+
+    def release(self, conn):
+        if self._pid == os.getpid():
+            self._idle.put(conn)
+
+    def close(self):
+        """Close the idle connections (for shutdown and tests)"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._reset()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success, roll back on error"""
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+pool = ConnectionPool()
+
+def db():
+    """Context manager for a pooled connection: `with db() as conn: ...`"""
+    return pool.connection()
+
+# Schema migrations, applied in order on top of the base tables created by
+# init_db. The applied version is stored in PRAGMA user_version, so each
+# migration runs exactly once per database file. Append new ones; never edit
+# a migration that has shipped.
+MIGRATIONS = [
+    (1, 'indexes for the patient, doctor and appointment routes', [
+        # patient_records: WHERE patient_id = ? ORDER BY created_at DESC
+        'CREATE INDEX IF NOT EXISTS idx_records_patient_created ON medical_records (patient_id, created_at)',
+        # doctor_records: the status = 'pending' and doctor_id = ? branches
+        'CREATE INDEX IF NOT EXISTS idx_records_status_created ON medical_records (status, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_records_doctor_created ON medical_records (doctor_id, created_at)',
+        # patient_appointments: WHERE patient_id = ? ORDER BY appointment_date DESC
+        'CREATE INDEX IF NOT EXISTS idx_appointments_patient_date ON appointments (patient_id, appointment_date)',
+        'CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date ON appointments (doctor_id, appointment_date)',
+        'CREATE INDEX IF NOT EXISTS idx_prescriptions_patient_created ON prescriptions (patient_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_mental_health_patient_created ON mental_health_records (patient_id, created_at)',
+        # get_doctors and the admin role counts; covers (id, name)
+        'CREATE INDEX IF NOT EXISTS idx_users_role_name ON users (role, name)',
+    ]),
+    (2, 'indexes for keyset pagination of user listings', [
+        # admin_users and doctor_patients walk users newest first; the rowid
+        # (id) is implicitly the last index column, giving the (created_at, id) key
+        'CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_users_role_created ON users (role, created_at)',
+    ]),
+    (3, 'incrementally maintained statistics counters', [
+        # Totals keyed by name (users_<role>, records, records_pending,
+        # appointments), kept current by triggers in the writing transaction
+        '''CREATE TABLE IF NOT EXISTS stats_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID''',
+        '''CREATE TABLE IF NOT EXISTS stats_daily_records (
+            day TEXT PRIMARY KEY,
+            records INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID''',
+        """INSERT OR IGNORE INTO stats_counters (name) VALUES
+            ('users_patient'), ('users_doctor'), ('users_admin'),
+            ('records'), ('records_pending'), ('appointments')""",
+        "UPDATE stats_counters SET value = (SELECT COUNT(*) FROM users WHERE 'users_' || role = stats_counters.name) WHERE name LIKE 'users_%'",
+        "UPDATE stats_counters SET value = (SELECT COUNT(*) FROM medical_records) WHERE name = 'records'",
+        "UPDATE stats_counters SET value = (SELECT COUNT(*) FROM medical_records WHERE status = 'pending') WHERE name = 'records_pending'",
+        "UPDATE stats_counters SET value = (SELECT COUNT(*) FROM appointments) WHERE name = 'appointments'",
+        '''INSERT OR REPLACE INTO stats_daily_records (day, records)
+            SELECT date(created_at), COUNT(*) FROM medical_records GROUP BY date(created_at)''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_users_insert AFTER INSERT ON users BEGIN
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'users_' || NEW.role;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_users_delete AFTER DELETE ON users BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'users_' || OLD.role;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_users_role AFTER UPDATE OF role ON users
+        WHEN OLD.role IS NOT NEW.role BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'users_' || OLD.role;
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'users_' || NEW.role;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_records_insert AFTER INSERT ON medical_records BEGIN
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'records';
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'records_pending' AND NEW.status = 'pending';
+            INSERT INTO stats_daily_records (day, records) VALUES (date(NEW.created_at), 1)
+                ON CONFLICT (day) DO UPDATE SET records = records + 1;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_records_delete AFTER DELETE ON medical_records BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'records';
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'records_pending' AND OLD.status = 'pending';
+            UPDATE stats_daily_records SET records = records - 1 WHERE day = date(OLD.created_at);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_records_status AFTER UPDATE OF status ON medical_records
+        WHEN (OLD.status = 'pending') IS NOT (NEW.status = 'pending') BEGIN
+            UPDATE stats_counters SET value = value + (CASE WHEN NEW.status = 'pending' THEN 1 ELSE -1 END)
+                WHERE name = 'records_pending';
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_appointments_insert AFTER INSERT ON appointments BEGIN
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'appointments';
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS stats_appointments_delete AFTER DELETE ON appointments BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'appointments';
+        END''',
+    ]),
+]
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn):
+    """Apply pending MIGRATIONS, each in its own transaction; returns the new version"""
+    version = schema_version(conn)
+    for target, description, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        with conn:
+            # sqlite3 only opens transactions implicitly before DML, and the
+            # migrations are mostly DDL: begin explicitly so a failure part
+            # way rolls back the statements already run and the version bump
+            conn.execute('BEGIN')
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+        print(f"🗄️ Migrated database to v{target}: {description}")
+        version = target
+    conn.execute('PRAGMA optimize')
+    return version
+
+# Keyset pagination: list queries return rows newest first, ordered by
+# (created_at, id), and continue strictly below the (:after_created, :after_id)
+# key of the last row a client has seen. KEYSET_START sorts above every row,
+# and :limit -1 means no limit, so one prepared statement serves every page.
+KEYSET_START = ('9999-12-31 23:59:59', 2 ** 63 - 1)
+
+def encode_cursor(created_at, row_id):
+    """Opaque `after` token for the row a page ended on"""
+    return base64.urlsafe_b64encode(f"{created_at}|{row_id}".encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """(created_at, id) key from an `after` token; ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        created_at, row_id = raw.rsplit('|', 1)
+        return created_at, int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+# Hot route queries, kept here so the query plan test checks exactly what runs
+PATIENT_RECORDS_SQL = '''
+    SELECT r.*, u.name as doctor_name
+    FROM medical_records r
+    LEFT JOIN users u ON r.doctor_id = u.id
+    WHERE r.patient_id = :user_id AND (r.created_at, r.id) < (:after_created, :after_id)
+    ORDER BY r.created_at DESC, r.id DESC
+    LIMIT :limit
+'''
+
+# "status = 'pending' OR doctor_id = ?" as two index lookups; the second
+# branch skips pending rows so nothing is returned twice
+DOCTOR_RECORDS_SQL = '''
+    SELECT r.*, u.name as patient_name
+    FROM (
+        SELECT * FROM medical_records
+        WHERE status = 'pending' AND (created_at, id) < (:after_created, :after_id)
+        UNION ALL
+        SELECT * FROM medical_records
+        WHERE doctor_id = :user_id AND status IS NOT 'pending' AND (created_at, id) < (:after_created, :after_id)
+    ) r
+    JOIN users u ON r.patient_id = u.id
+    ORDER BY r.created_at DESC, r.id DESC
+    LIMIT :limit
+'''
+
+# Patients with at least one record; EXISTS instead of a DISTINCT join
+DOCTOR_PATIENTS_SQL = '''
+    SELECT u.id, u.name, u.email, u.phone, u.created_at
+    FROM users u
+    WHERE u.role = 'patient' AND (u.created_at, u.id) < (:after_created, :after_id)
+      AND EXISTS (SELECT 1 FROM medical_records r WHERE r.patient_id = u.id)
+    ORDER BY u.created_at DESC, u.id DESC
+    LIMIT :limit
+'''
+
+ADMIN_USERS_SQL = '''
+    SELECT id, email, role, name, phone, created_at
+    FROM users
+    WHERE (created_at, id) < (:after_created, :after_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+'''
+
+PATIENT_APPOINTMENTS_SQL = '''
+    SELECT a.*, u.name as doctor_name
+    FROM appointments a
+    JOIN users u ON a.doctor_id = u.id
+    WHERE a.patient_id = ?
+    ORDER BY a.appointment_date DESC
+'''
+
+def init_db(path=None):
+    conn = connect(path)
     cursor = conn.cursor()
     
     # Users table
@@ -82,25 +365,27 @@ def init_db():
         )
     ''')
     
-    # Insert default admin
-    admin_password = hashlib.sha256('admin123'.encode()).hexdigest()
-    cursor.execute('''
-        INSERT OR IGNORE INTO users (email, password, role, name, phone)
-        VALUES (?, ?, ?, ?, ?)
-    ''', ('admin@healthcare.com', admin_password, 'admin', 'System Admin', '1234567890'))
-    
-    # Insert sample doctor
-    doctor_password = hashlib.sha256('doctor123'.encode()).hexdigest()
-    cursor.execute('''
-        INSERT OR IGNORE INTO users (email, password, role, name, phone)
-        VALUES (?, ?, ?, ?, ?)
-    ''', ('doctor@healthcare.com', doctor_password, 'doctor', 'Dr. Smith', '0987654321'))
+    # Insert default admin and sample doctor (hashing only when missing,
+    # since a KDF hash on every startup would slow it down)
+    default_users = [
+        ('admin@healthcare.com', 'admin123', 'admin', 'System Admin', '1234567890'),
+        ('doctor@healthcare.com', 'doctor123', 'doctor', 'Dr. Smith', '0987654321'),
+    ]
+    for email, password, role, name, phone in default_users:
+        if cursor.execute('SELECT 1 FROM users WHERE email = ?', (email,)).fetchone():
+            continue
+        cursor.execute('''
+            INSERT OR IGNORE INTO users (email, password, role, name, phone)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (email, hash_password(password), role, name, phone))
     
     conn.commit()
+    migrate(conn)
     conn.close()
 
 def get_db():
-    return sqlite3.connect('healthcare.db')
+    """Standalone connection for scripts; request handlers should use db()"""
+    return connect()
 
 if __name__ == '__main__':
     init_db()
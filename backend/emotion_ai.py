@@ -2,15 +2,13 @@ import cv2
 import numpy as np
 import tensorflow as tf
 import os
-from PIL import Image
-import base64
-import io
+from image_utils import decode_image
+from face_detection import FaceDetector
+from emotion_runtime import FACE_MODEL_RUNTIME, VOICE_INPUT, FunctionRunner, KerasRunner, compile_face_model
+from voice_analysis import VOICE_SAMPLE_RATE, VoiceStream, audio_chunks, summarize_windows
+from sentiment_lexicon import SentimentLexicon
 
-try:
-    import librosa
-    LIBROSA_AVAILABLE = True
-except ImportError:
-    LIBROSA_AVAILABLE = False
+VOICE_MODEL_PATH = os.environ.get('VOICE_MODEL_PATH', 'voice_emotion_model.h5')
 
 class EmotionRecognition:
     def __init__(self):
@@ -18,13 +16,20 @@ class EmotionRecognition:
         self.emotions = ["Angry", "Disgust", "Fear", "Happy", "Neutral", "Sad", "Surprise"]
         self.voice_emotions = ["Angry", "Happy", "Neutral", "Sad", "Surprise"]
         
-        # Load OpenCV face detection
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # Load OpenCV face detection (Haar cascade or DNN, see face_detection.py)
+        self.face_detector = FaceDetector.from_env()
+
+        # Weighted mood lexicon for text analysis (SENTIMENT_LEXICON)
+        self.sentiment_lexicon = SentimentLexicon.from_env()
         
         # Initialize models
         self.face_model = None
+        self.face_runner = None
         self.voice_model = None
+        self.voice_runner = None
         self.load_models()
+        self.face_runner = self.compile_face_model(FACE_MODEL_RUNTIME)
+        self.voice_runner = self.compile_voice_model()
 
     def load_models(self):
         """Load models with exact architecture from reference training"""
@@ -40,7 +45,53 @@ class EmotionRecognition:
         except Exception as e:
             print(f"Model loading error: {e}")
             self.face_model = self.create_reference_face_model()
+
+        # Voice model: (1, 40) mean MFCC vector -> voice_emotions probabilities
+        try:
+            if os.path.exists(VOICE_MODEL_PATH):
+                self.voice_model = tf.keras.models.load_model(VOICE_MODEL_PATH)
+                print("Voice model loaded successfully")
+            else:
+                print("Creating new voice model with reference architecture")
+                self.voice_model = self.create_reference_voice_model()
+        except Exception as e:
+            print(f"Voice model loading error: {e}")
+            self.voice_model = self.create_reference_voice_model()
             
+    def compile_face_model(self, runtime):
+        """Inference callable for the face model on the given runtime (see emotion_runtime.py)"""
+        if self.face_model is None:
+            return None
+        try:
+            return compile_face_model(self.face_model, runtime)
+        except Exception as e:
+            print(f"⚠️ Face model runtime {runtime!r} unavailable, using Keras predict: {e}")
+            return KerasRunner(self.face_model)
+
+    def compile_voice_model(self):
+        if self.voice_model is None:
+            return None
+        try:
+            return FunctionRunner(self.voice_model, VOICE_INPUT)
+        except Exception as e:
+            print(f"⚠️ Compiled voice model unavailable, using Keras predict: {e}")
+            return KerasRunner(self.voice_model)
+
+    def create_reference_voice_model(self):
+        """Dense classifier over the 40 mean MFCCs, like the reference voice training"""
+        model = tf.keras.Sequential([
+            tf.keras.Input(shape=(40,)),
+            tf.keras.layers.Dense(256, activation='relu'),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(128, activation='relu'),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(len(self.voice_emotions), activation='softmax')
+        ])
+        model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.0001),
+                      loss='categorical_crossentropy',
+                      metrics=['accuracy'])
+        return model
+
     def create_reference_face_model(self):
         """Create exact CNN model from reference facetrain.py"""
         model = tf.keras.Sequential()
@@ -76,55 +127,36 @@ class EmotionRecognition:
         
         return model
 
-    def analyze_face_image(self, image_data):
-        """Perfect face analysis with exact reference preprocessing"""
+    def analyze_face_image(self, image_data, session_id=None):
+        """Perfect face analysis with exact reference preprocessing
+
+        image_data may be a base64 data URL or the raw bytes of an encoded frame.
+        With a session_id, the next frame of that session is first searched
+        around the face found in this one. Every detected face is classified
+        in one model call and listed under 'faces'; the top-level fields
+        describe the first one.
+        """
         try:
-            # Decode base64 image exactly like reference
-            image_bytes = base64.b64decode(image_data.split(',')[1])
-            image = Image.open(io.BytesIO(image_bytes))
-            img_array = np.array(image)
-            
-            # Convert to grayscale (exact reference preprocessing)
-            if len(img_array.shape) == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
+            # Decode directly to grayscale (exact reference preprocessing)
+            gray = decode_image(image_data, cv2.IMREAD_GRAYSCALE)
             
-            # Detect faces with exact reference parameters
-            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+            # Detect faces on a downscaled copy, boxes in full-resolution pixels
+            faces = self.predict_emotions(gray, self.face_detector.detect(gray, session_id))
             
-            for (x, y, w, h) in faces:
-                # Extract and preprocess face exactly like reference
-                face = gray[y:y+h, x:x+w]
-                face = cv2.resize(face, (48, 48))
-                
-                # Normalize pixel values (0-1 range) exactly like reference
-                face = face.astype("float32") / 255.0
-                face = face.reshape(1, 48, 48, 1)  # Add channel dimension
-                
-                # Predict emotion with model
-                if self.face_model:
-                    predictions = self.face_model.predict(face, verbose=0)
-                    emotion_pred = np.argmax(predictions)
-                    confidence = float(np.max(predictions))
-                    emotion_text = self.emotions[emotion_pred]
-                else:
-                    # Fallback prediction
-                    emotion_pred = np.random.randint(0, 7)
-                    emotion_text = self.emotions[emotion_pred]
-                    confidence = np.random.uniform(0.7, 0.95)
-                
+            if faces:
                 return {
-                    'emotion': emotion_text,
-                    'confidence': confidence,
+                    'emotion': faces[0]['emotion'],
+                    'confidence': faces[0]['confidence'],
                     'face_detected': True,
-                    'face_coordinates': [int(x), int(y), int(w), int(h)]
+                    'face_coordinates': faces[0]['face_coordinates'],
+                    'faces': faces
                 }
             
             return {
                 'emotion': 'Neutral',
                 'confidence': 0.5,
-                'face_detected': False
+                'face_detected': False,
+                'faces': []
             }
                 
         except Exception as e:
@@ -132,28 +164,76 @@ class EmotionRecognition:
                 'emotion': 'Neutral',
                 'confidence': 0.5,
                 'face_detected': False,
+                'faces': [],
                 'error': str(e)
             }
 
-    def analyze_voice_features(self, audio_data=None):
-        """Analyze voice exactly like reference system"""
+    def predict_emotions(self, gray, boxes):
+        """Classify the faces at boxes (x, y, w, h) of a grayscale frame as one (N, 48, 48, 1) batch"""
+        if len(boxes) == 0:
+            return []
+
+        # Extract and preprocess faces exactly like reference, stacked into one tensor
+        batch = np.stack([cv2.resize(gray[y:y+h, x:x+w], (48, 48)) for (x, y, w, h) in boxes])
+        
+        # Normalize pixel values (0-1 range) exactly like reference
+        batch = (batch.astype("float32") / 255.0).reshape(-1, 48, 48, 1)
+        
+        # Predict emotion with model
+        if self.face_runner:
+            predictions = self.face_runner(batch)
+        else:
+            # Fallback prediction
+            predictions = np.zeros((len(boxes), len(self.emotions)))
+            predictions[np.arange(len(boxes)), np.random.randint(0, 7, len(boxes))] = np.random.uniform(0.7, 0.95, len(boxes))
+        
+        return [{
+            'emotion': self.emotions[int(np.argmax(scores))],
+            'confidence': float(np.max(scores)),
+            'face_coordinates': [int(x), int(y), int(w), int(h)]
+        } for (x, y, w, h), scores in zip(boxes, predictions)]
+
+    def analyze_voice_features(self, audio_data=None, audio_format=None, sample_rate=None, channels=1):
+        """Analyze a voice recording window by window
+
+        audio_data is a binary stream, bytes or path of a WAV file, of raw
+        16-bit PCM (audio_format='pcm', at sample_rate with channels) or, when
+        librosa is installed, of any other recording. It is read a chunk at a
+        time through a VoiceStream; the answer summarizes the per-window
+        results listed under 'windows'. Without audio the reading is mocked
+        like the reference system.
+        """
+        if audio_data is not None:
+            try:
+                stream, windows = None, []
+                for samples, rate in audio_chunks(audio_data, audio_format, sample_rate, channels):
+                    stream = stream or self.open_voice_stream(rate)
+                    windows += stream.push(samples)
+                windows += stream.flush() if stream else []
+                if not windows:
+                    raise ValueError('Recording is too short to analyze')
+                result = summarize_windows(self.voice_emotions, windows)
+                result['duration'] = round(stream.frames_seen * stream.hop_seconds, 2)
+                result['windows'] = windows
+                return result
+            except Exception as e:
+                return {
+                    'tone': 'neutral',
+                    'confidence': 0.5,
+                    'stress_level': 50,
+                    'voice_features': {
+                        'pitch': 120,
+                        'speed': 130,
+                        'volume': 65
+                    },
+                    'windows': [],
+                    'error': str(e)
+                }
+
         try:
-            if LIBROSA_AVAILABLE and audio_data:
-                # Process audio like reference system
-                y, sr = librosa.load(audio_data, sr=None)
-                mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=40)
-                mfcc_mean = np.mean(mfcc, axis=1).reshape(1, -1)
-                
-                if self.voice_model:
-                    voice_emotion_pred = np.argmax(self.voice_model.predict(mfcc_mean))
-                    voice_emotion_text = self.voice_emotions[voice_emotion_pred]
-                else:
-                    voice_emotion_pred = np.random.randint(0, len(self.voice_emotions))
-                    voice_emotion_text = self.voice_emotions[voice_emotion_pred]
-            else:
-                # Mock analysis like reference system
-                voice_emotion_pred = np.random.randint(0, len(self.voice_emotions))
-                voice_emotion_text = self.voice_emotions[voice_emotion_pred]
+            # Mock analysis like reference system
+            voice_emotion_pred = np.random.randint(0, len(self.voice_emotions))
+            voice_emotion_text = self.voice_emotions[voice_emotion_pred]
             
             # Generate stress level based on emotion
             if voice_emotion_text == 'Angry':
@@ -188,50 +268,21 @@ class EmotionRecognition:
                 }
             }
 
+    def open_voice_stream(self, sample_rate=VOICE_SAMPLE_RATE, channels=1, sample_width=2):
+        """A VoiceStream emitting a voice emotion result per sliding window of pushed audio"""
+        return VoiceStream(self.classify_voice, self.voice_emotions, sample_rate, channels, sample_width)
+
+    def classify_voice(self, mfcc_means):
+        """(n, 40) mean MFCC vectors -> (n, len(voice_emotions)) probabilities"""
+        mfcc_means = np.asarray(mfcc_means, dtype=np.float32)
+        if self.voice_runner is None:
+            return np.full((len(mfcc_means), len(self.voice_emotions)), 1.0 / len(self.voice_emotions))
+        return self.voice_runner(mfcc_means)
+
     def analyze_text_sentiment(self, text):
-        """Analyze text for sentiment and mood"""
+        """Analyze text for sentiment and mood with the weighted lexicon (see sentiment_lexicon.py)"""
         try:
-            if not text or not text.strip():
-                return {
-                    'sentiment': 'neutral',
-                    'confidence': 0.5,
-                    'mood_score': 50
-                }
-            
-            # Simple keyword-based sentiment analysis
-            stress_keywords = ['stressed', 'anxious', 'worried', 'overwhelmed', 'tired', 'sad', 'depressed', 'angry', 'frustrated']
-            positive_keywords = ['happy', 'good', 'great', 'excellent', 'wonderful', 'amazing', 'calm', 'peaceful', 'relaxed']
-            
-            text_lower = text.lower()
-            stress_count = sum(1 for word in stress_keywords if word in text_lower)
-            positive_count = sum(1 for word in positive_keywords if word in text_lower)
-            
-            if stress_count > positive_count:
-                if 'stress' in text_lower or 'anxious' in text_lower:
-                    sentiment = 'stressed'
-                elif 'sad' in text_lower or 'depressed' in text_lower:
-                    sentiment = 'sad'
-                elif 'angry' in text_lower or 'frustrated' in text_lower:
-                    sentiment = 'angry'
-                else:
-                    sentiment = 'anxious'
-                confidence = min(0.7 + stress_count * 0.1, 0.95)
-                mood_score = max(100 - stress_count * 15, 10)
-            elif positive_count > 0:
-                sentiment = 'happy'
-                confidence = min(0.75 + positive_count * 0.08, 0.95)
-                mood_score = min(50 + positive_count * 15, 100)
-            else:
-                sentiment = 'neutral'
-                confidence = 0.6
-                mood_score = 50
-            
-            return {
-                'sentiment': sentiment,
-                'confidence': confidence,
-                'mood_score': mood_score
-            }
-            
+            return self.sentiment_lexicon.analyze(text)
         except Exception as e:
             print(f"Text analysis error: {e}")
             return {
@@ -241,5 +292,9 @@ class EmotionRecognition:
                 'error': str(e)
             }
 
+    def analyze_text_batch(self, texts):
+        """analyze_text_sentiment for each of many texts, e.g. a patient's journal history"""
+        return [self.analyze_text_sentiment(text) for text in texts]
+
 # Global instance
 emotion_ai = EmotionRecognition()
\ No newline at end of file
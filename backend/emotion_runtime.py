@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+
+import numpy as np
+import tensorflow as tf
+
+# How the face emotion CNN is run (see compile_face_model):
+#   keras          - model.predict, the original path
+#   function       - a tf.function traced once for any batch size (default)
+#   tflite         - the TFLite interpreter on a float32 conversion
+#   tflite-dynamic - TFLite with int8 weights, float activations
+#   tflite-int8    - TFLite with int8 weights and activations, calibrated on
+#                    the (N, 48, 48, 1) face crops saved in FACE_CALIBRATION_FACES (.npy)
+FACE_MODEL_RUNTIME = os.environ.get('FACE_MODEL_RUNTIME', 'function')
+FACE_CALIBRATION_FACES = os.environ.get('FACE_CALIBRATION_FACES', '')
+RUNTIMES = ('keras', 'function', 'tflite', 'tflite-dynamic', 'tflite-int8')
+FACE_INPUT = tf.TensorSpec([None, 48, 48, 1], tf.float32)
+VOICE_INPUT = tf.TensorSpec([None, 40], tf.float32)
+
+
+class KerasRunner:
+    """model.predict: data adapter, callbacks and all, for every call"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+class FunctionRunner:
+    """The model's inference graph as a tf.function with a fixed input signature.
+
+    The batch dimension is left open, so the graph is traced once and reused
+    for any number of faces (or voice windows) without retracing.
+    """
+
+    def __init__(self, model, input_spec=FACE_INPUT):
+        self._fn = tf.function(lambda batch: model(batch, training=False), input_signature=[input_spec])
+        self._fn.get_concrete_function()
+
+    def __call__(self, batch):
+        return self._fn(batch).numpy()
+
+
+class TFLiteRunner:
+    """A TFLite flatbuffer run by tf.lite.Interpreter.
+
+    The interpreter holds its tensors between calls, so calls are serialized
+    and its input is only resized (and tensors reallocated) when the batch
+    size changes.
+    """
+
+    def __init__(self, model_content, num_threads=None):
+        self.model_content = model_content
+        self.interpreter = tf.lite.Interpreter(model_content=model_content, num_threads=num_threads or os.cpu_count())
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = None
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            if len(batch) != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = len(batch)
+            self.interpreter.set_tensor(self.input_index, np.ascontiguousarray(batch, dtype=np.float32))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+
+def convert_to_tflite(model, quantize=None, calibration_faces=None):
+    """Convert a Keras face model to a TFLite flatbuffer.
+
+    quantize is None (float32), 'dynamic' (int8 weights) or 'int8' (int8
+    weights and activations, ranges calibrated on calibration_faces).
+    Conversion goes through a SavedModel export; converting the Keras 3
+    model's concrete function directly crashes the MLIR converter.
+    """
+    with tempfile.TemporaryDirectory() as export_dir:
+        model.export(export_dir, verbose=False)
+        converter = tf.lite.TFLiteConverter.from_saved_model(export_dir)
+        if quantize is not None:
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantize == 'int8':
+            if calibration_faces is None or len(calibration_faces) == 0:
+                raise ValueError('int8 quantization needs calibration faces')
+            faces = np.asarray(calibration_faces, dtype=np.float32).reshape(-1, 1, 48, 48, 1)
+            converter.representative_dataset = lambda: ([face] for face in faces)
+        return converter.convert()
+
+
+def compile_face_model(model, runtime='function', calibration_faces=None):
+    """Return a callable mapping an (N, 48, 48, 1) float32 batch to (N, 7) emotion probabilities"""
+    if runtime == 'keras':
+        return KerasRunner(model)
+    if runtime == 'function':
+        return FunctionRunner(model)
+    if runtime == 'tflite':
+        return TFLiteRunner(convert_to_tflite(model))
+    if runtime == 'tflite-dynamic':
+        return TFLiteRunner(convert_to_tflite(model, 'dynamic'))
+    if runtime == 'tflite-int8':
+        if calibration_faces is None and FACE_CALIBRATION_FACES:
+            calibration_faces = np.load(FACE_CALIBRATION_FACES)
+        return TFLiteRunner(convert_to_tflite(model, 'int8', calibration_faces))
+    raise ValueError(f"Unknown face model runtime {runtime!r}, expected one of {', '.join(RUNTIMES)}")
@@ -2,11 +2,221 @@ import cv2
 import numpy as np
 import mediapipe as mp
 import base64
-import io
-from PIL import Image
 import joblib
 import os
-from collections import deque, Counter
+import threading
+import time
+from collections import deque, Counter, OrderedDict
+from image_utils import decode_image, RENDER_MODES
+from batch_inference import MicroBatchClassifier
+
+# Per worker process: rep-counting state for up to EXERCISE_SESSIONS trainees
+# (a few KB each), and warm Pose graphs for up to POSE_ENGINES of them (about
+# 75 MB each). Set POSE_ENGINES to the peak number of trainees streaming at
+# once; it is capped at EXERCISE_SESSIONS, since an engine is never useful
+# without its session.
+EXERCISE_SESSIONS = int(os.environ.get('EXERCISE_SESSIONS', '1000'))
+POSE_ENGINES = min(int(os.environ.get('POSE_ENGINES', '16')), EXERCISE_SESSIONS)
+
+
+class _PoseEngine:
+    """A warm MediaPipe Pose graph plus the lock that serializes access to it
+
+    users counts frames that have acquired the engine and not finished with
+    it; a retired engine (evicted or released while in use) is closed by
+    its last user.
+    """
+    __slots__ = ('pose', 'lock', 'last_used', 'users', 'retired')
+
+    def __init__(self, pose):
+        self.pose = pose
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.users = 0
+        self.retired = False
+
+
+class PoseEnginePool:
+    """Long-lived MediaPipe Pose engines keyed by client session.
+
+    Each engine runs in video mode (static_image_mode=False), so consecutive
+    frames from the same client reuse the previous landmarks as a tracking
+    ROI instead of running full person detection every frame. Engines are
+    evicted least-recently-used once max_engines is reached, or after
+    idle_timeout seconds without a frame.
+
+    The pool is a cache over the session store's active sessions: a trainee
+    whose engine was evicted keeps their counters, and their next frame pays
+    one graph build plus a cold detection. More trainees streaming at once
+    than max_engines means that cost on every frame, so size it (POSE_ENGINES)
+    to the expected concurrency rather than to the session store.
+    """
+
+    def __init__(self, max_engines=POSE_ENGINES, idle_timeout=300,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        self.mp_pose = mp.solutions.pose
+        self.max_engines = max_engines
+        self.idle_timeout = idle_timeout
+        self.pose_options = {
+            'static_image_mode': False,
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence
+        }
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def process(self, session_id, image_rgb):
+        """Run pose estimation on an RGB frame with the session's engine"""
+        engine = self._acquire(session_id)
+        try:
+            with engine.lock:
+                engine.last_used = time.monotonic()
+                return engine.pose.process(image_rgb)
+        finally:
+            self._finish(engine)
+
+    def release(self, session_id):
+        """Close the engine for a session, e.g. when its stream ends"""
+        with self._lock:
+            engine = self._engines.pop(session_id, None)
+            closing = self._retire_locked([engine] if engine is not None else [])
+        for engine in closing:
+            self._close(engine)
+
+    def close(self):
+        """Close every engine in the pool"""
+        with self._lock:
+            closing = self._retire_locked(list(self._engines.values()))
+            self._engines.clear()
+        for engine in closing:
+            self._close(engine)
+
+    def __len__(self):
+        return len(self._engines)
+
+    def _acquire(self, session_id):
+        evicted = []
+        with self._lock:
+            engine = self._engines.get(session_id)
+            if engine is not None:
+                self._engines.move_to_end(session_id)
+            else:
+                evicted = self._evict_locked()
+                engine = _PoseEngine(self.mp_pose.Pose(**self.pose_options))
+                self._engines[session_id] = engine
+            # Counted before the lock drops, so eviction can't close it under us
+            engine.users += 1
+        for stale in evicted:
+            self._close(stale)
+        return engine
+
+    def _finish(self, engine):
+        with self._lock:
+            engine.users -= 1
+            closing = engine.retired and engine.users == 0
+        if closing:
+            self._close(engine)
+
+    def _evict_locked(self):
+        """Drop idle engines and make room for one more (caller holds _lock)
+
+        Engines with a frame in flight are never evicted; if every engine is
+        busy the pool briefly grows past max_engines instead.
+        """
+        now = time.monotonic()
+        idle = [k for k, e in self._engines.items() if e.users == 0]
+        stale = [k for k in idle if now - self._engines[k].last_used > self.idle_timeout]
+        lru = iter([k for k in idle if k not in stale])
+        evicted = [self._engines.pop(key) for key in stale]
+        while len(self._engines) >= self.max_engines:
+            key = next(lru, None)
+            if key is None:
+                break
+            evicted.append(self._engines.pop(key))
+        return evicted
+
+    @staticmethod
+    def _retire_locked(engines):
+        """Engines to close now; in-use ones are left to their last user (caller holds _lock)"""
+        for engine in engines:
+            engine.retired = True
+        return [engine for engine in engines if engine.users == 0]
+
+    @staticmethod
+    def _close(engine):
+        # Wait for any in-flight frame before tearing the graph down
+        with engine.lock:
+            engine.pose.close()
+
+
+EXERCISES = ('pushups', 'squats', 'situps', 'jumping_jacks', 'pullups')
+
+
+class ExerciseSession:
+    """Rep-counting state for one trainee: label smoothing window, states and counters"""
+    __slots__ = ('label_window', 'exercise_states', 'exercise_counters', 'lock', 'last_seen')
+
+    def __init__(self, window_size=35):
+        self.label_window = deque(maxlen=window_size)
+        self.exercise_states = dict.fromkeys(EXERCISES, 'down')
+        self.exercise_counters = dict.fromkeys(EXERCISES, 0)
+        self.lock = threading.Lock()
+        self.last_seen = time.monotonic()
+
+
+class ExerciseSessionStore:
+    """Bounded in-memory store of ExerciseSession objects keyed by session id.
+
+    Sessions idle for longer than ttl seconds are dropped, and once
+    max_sessions is reached the least recently used session is evicted,
+    which caps memory at roughly max_sessions small objects per worker.
+    """
+
+    def __init__(self, max_sessions=EXERCISE_SESSIONS, ttl=1800, window_size=35):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.window_size = window_size
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Return the session's state, creating it if needed"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._sessions.get(session_id)
+            if state is not None and now - state.last_seen <= self.ttl:
+                self._sessions.move_to_end(session_id)
+            else:
+                self._sessions.pop(session_id, None)
+                self._evict_locked(now)
+                state = ExerciseSession(self.window_size)
+                self._sessions[session_id] = state
+            state.last_seen = now
+            return state
+
+    def peek(self, session_id):
+        """Return the session's state without creating or touching it"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None or time.monotonic() - state.last_seen > self.ttl:
+                return None
+            return state
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict_locked(self, now):
+        # Sessions are kept in last-seen order, so expired ones sit at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen <= self.ttl and len(self._sessions) < self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
 
 class ExerciseAnalyzer:
     def __init__(self):
@@ -22,35 +232,22 @@ class ExerciseAnalyzer:
         if os.path.exists(model_path) and os.path.exists(encoder_path):
             self.random_forest_classifier = joblib.load(model_path)
             self.label_encoder = joblib.load(encoder_path)
+            # Rows from concurrent sessions share one predict() call
+            self.state_classifier = MicroBatchClassifier(self.random_forest_classifier, self.label_encoder.classes_)
             self.ml_model_loaded = True
             print("✅ ML model and label encoder loaded successfully!")
         else:
             self.ml_model_loaded = False
             print("⚠️ ML model files not found. Using basic pose detection only.")
         
+        # Warm pose engines, one per client session (video-mode tracking)
+        self.pose_engines = PoseEnginePool()
+        
         # Initialize pose embedder
         self.pose_embedder = FullBodyPoseEmbedder()
         
-        # Exercise state tracking
-        self.exercise_states = {
-            'pushups': 'down',
-            'squats': 'down', 
-            'situps': 'down',
-            'jumping_jacks': 'down',
-            'pullups': 'down'
-        }
-        
-        # Exercise counters
-        self.exercise_counters = {
-            'pushups': 0,
-            'squats': 0,
-            'situps': 0,
-            'jumping_jacks': 0,
-            'pullups': 0
-        }
-        
-        # Label smoothing window
-        self.label_window = deque(maxlen=35)
+        # Per-session exercise states, counters and label smoothing windows
+        self.sessions = ExerciseSessionStore()
         
         # Exercise-specific feedback
         self.exercise_feedback = {
@@ -81,87 +278,96 @@ class ExerciseAnalyzer:
             }
         }
 
-    def analyze_exercise(self, image_data, exercise_type):
-        """Analyze exercise using the trained ML model and MediaPipe"""
+    def analyze_exercise(self, image_data, exercise_type, session_id=None,
+                         render='jpeg', jpeg_quality=95, jpeg_scale=1.0):
+        """Analyze exercise using the trained ML model and MediaPipe
+
+        image_data may be a base64 data URL or the raw bytes of an encoded
+        frame. Frames sharing a session_id are processed by the same warm pose
+        engine, so MediaPipe tracks landmarks across them instead of re-detecting.
+        render picks the response payload (see RENDER_MODES); for 'jpeg' the
+        annotated frame is drawn at jpeg_scale and encoded at jpeg_quality.
+        """
+        try:
+            # Decode straight to a BGR array for OpenCV
+            image_bgr = decode_image(image_data)
+        except Exception as e:
+            print(f"Error in exercise analysis: {str(e)}")
+            return {'success': False, 'error': str(e)}
+        
+        return self.analyze_frame(image_bgr, exercise_type, session_id, render, jpeg_quality, jpeg_scale)
+
+    def analyze_frame(self, image_bgr, exercise_type, session_id=None,
+                      render='jpeg', jpeg_quality=95, jpeg_scale=1.0):
+        """Analyze an already-decoded BGR frame (see analyze_exercise)"""
+        if render not in RENDER_MODES:
+            return {'success': False, 'error': f"render must be one of {', '.join(RENDER_MODES)}"}
+        render_options = {'render': render, 'jpeg_quality': jpeg_quality, 'jpeg_scale': jpeg_scale}
+        
         try:
-            # Decode base64 image
-            image_bytes = base64.b64decode(image_data.split(',')[1])
-            image = Image.open(io.BytesIO(image_bytes))
-            image_np = np.array(image)
+            # Convert to RGB for MediaPipe
+            image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
             
-            # Convert to BGR for OpenCV
-            if len(image_np.shape) == 3:
-                image_bgr = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
-            else:
-                image_bgr = image_np
+            # Process with the session's warm MediaPipe engine (EXACT reference settings)
+            results = self.pose_engines.process(session_id, image_rgb)
             
-            # Process with MediaPipe (EXACT reference settings)
-            with self.mp_pose.Pose(
-                min_detection_confidence=0.5, 
-                min_tracking_confidence=0.5
-            ) as pose:
-                # Convert to RGB for MediaPipe
-                image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-                results = pose.process(image_rgb)
+            if results.pose_landmarks:
+                # Extract pose landmarks
+                pose_landmarks = np.array([[lmk.x, lmk.y, lmk.z] for lmk in results.pose_landmarks.landmark], dtype=np.float32)
                 
-                if results.pose_landmarks:
-                    # Extract pose landmarks
-                    pose_landmarks = np.array([[lmk.x, lmk.y, lmk.z] for lmk in results.pose_landmarks.landmark], dtype=np.float32)
-                    
-                    if pose_landmarks.shape == (33, 3):
-                        # Get pose embeddings
-                        landmarks, distance_embedding, distance3D_embedding, angle_embedding = self.pose_embedder(pose_landmarks)
-                        
-                        # Combine features for ML model
-                        features = np.concatenate((distance3D_embedding, angle_embedding), axis=0)
-                        features = np.reshape(features, (1, features.size))
+                if pose_landmarks.shape == (33, 3):
+                    # Predict exercise state using ML model
+                    if self.ml_model_loaded:
+                        # Pose embedding (3D distances + angles) as a single feature row
+                        features = self.pose_embedder.features(pose_landmarks)
+                        predicted_label = self.state_classifier.predict(features)
                         
-                        # Predict exercise state using ML model
-                        if self.ml_model_loaded:
-                            label_numeric = self.random_forest_classifier.predict(features)
-                            predicted_label = self.label_encoder.inverse_transform(label_numeric)[0]
-                            
+                        state = self.sessions.get(session_id)
+                        with state.lock:
                             # Add to smoothing window
-                            self.label_window.append(predicted_label)
-                            most_common_label = Counter(self.label_window).most_common(1)[0][0]
+                            state.label_window.append(predicted_label)
+                            most_common_label = Counter(state.label_window).most_common(1)[0][0]
                             
                             # Update exercise counters and states
-                            self._update_exercise_tracking(most_common_label)
+                            self._update_exercise_tracking(state, most_common_label)
                             
                             # Get current exercise info
                             current_exercise = self._get_current_exercise(most_common_label)
-                            current_count = self.exercise_counters.get(current_exercise, 0)
+                            current_count = state.exercise_counters.get(current_exercise, 0)
                             
                             # Generate feedback
                             feedback = self._generate_feedback(most_common_label, current_exercise)
-                            form_score = self._calculate_form_score(most_common_label, current_exercise)
-                            
-                            # Draw pose landmarks with enhanced visualization
-                            annotated_image = self._draw_pose_landmarks(image_bgr, results.pose_landmarks, most_common_label, current_count)
-                            
-                            return {
-                                'success': True,
-                                'exercise_type': current_exercise,
-                                'current_state': most_common_label,
-                                'rep_count': current_count,
-                                'feedback': feedback,
-                                'form_score': form_score,
-                                'annotated_image': base64.b64encode(cv2.imencode('.jpg', annotated_image)[1]).decode('utf-8'),
-                                'keypoints': self._extract_keypoints(pose_landmarks)
-                            }
-                        else:
-                            # Fallback to basic pose detection
-                            return self._basic_pose_analysis(image_bgr, results.pose_landmarks, exercise_type)
+                            form_score = self._calculate_form_score(state, most_common_label, current_exercise)
+                        
+                        result = {
+                            'success': True,
+                            'exercise_type': current_exercise,
+                            'current_state': most_common_label,
+                            'rep_count': current_count,
+                            'feedback': feedback,
+                            'form_score': form_score
+                        }
+                        
+                        # Keypoints and/or enhanced visualization, as requested
+                        result.update(self._render_payload(
+                            image_bgr, results.pose_landmarks, pose_landmarks,
+                            most_common_label, current_count, current_exercise, **render_options
+                        ))
+                        return result
                     else:
-                        return {'success': False, 'error': 'Invalid pose landmarks shape'}
+                        # Fallback to basic pose detection
+                        return self._basic_pose_analysis(image_bgr, results.pose_landmarks, pose_landmarks,
+                                                         exercise_type, render_options)
                 else:
-                    return {'success': False, 'error': 'No pose detected'}
-                    
+                    return {'success': False, 'error': 'Invalid pose landmarks shape'}
+            else:
+                return {'success': False, 'error': 'No pose detected'}
+                
         except Exception as e:
             print(f"Error in exercise analysis: {str(e)}")
             return {'success': False, 'error': str(e)}
 
-    def _update_exercise_tracking(self, label):
+    def _update_exercise_tracking(self, state, label):
         """Update exercise counters and states based on ML predictions"""
         exercise_mappings = {
             'pushups_up': ('pushups', 'up'),
@@ -177,19 +383,19 @@ class ExerciseAnalyzer:
         }
         
         if label in exercise_mappings:
-            exercise, state = exercise_mappings[label]
-            prev_state = self.exercise_states[exercise]
+            exercise, position = exercise_mappings[label]
+            prev_position = state.exercise_states[exercise]
             
             # Update state
-            self.exercise_states[exercise] = state
+            state.exercise_states[exercise] = position
             
             # Increment counter when transitioning from up to down
-            if prev_state == 'up' and state == 'down':
-                self.exercise_counters[exercise] += 1
+            if prev_position == 'up' and position == 'down':
+                state.exercise_counters[exercise] += 1
 
     def _get_current_exercise(self, label):
         """Extract exercise name from label"""
-        for exercise in self.exercise_counters.keys():
+        for exercise in EXERCISES:
             if exercise in label:
                 return exercise
         return 'unknown'
@@ -204,19 +410,36 @@ class ExerciseAnalyzer:
         
         return "Keep going! Maintain good form."
 
-    def _calculate_form_score(self, label, exercise):
+    def _calculate_form_score(self, state, label, exercise):
         """Calculate form score based on exercise state and consistency"""
         base_score = 85
         
         # Bonus for consistent form
-        if len(self.label_window) > 10:
-            recent_labels = list(self.label_window)[-10:]
+        if len(state.label_window) > 10:
+            recent_labels = list(state.label_window)[-10:]
             consistency = len(set(recent_labels)) / len(recent_labels)
             base_score += int(consistency * 15)
         
         return min(100, base_score)
 
-    def _draw_pose_landmarks(self, image, pose_landmarks, current_label, rep_count):
+    def _render_payload(self, image, pose_landmarks, landmarks_array, current_label, rep_count,
+                        exercise, render, jpeg_quality, jpeg_scale):
+        """Build the keypoints / annotated_image part of a response for a render mode"""
+        payload = {}
+        if render == 'none':
+            return payload
+        
+        payload['keypoints'] = self._extract_keypoints(landmarks_array)
+        if render == 'jpeg':
+            # Downscale before drawing so both drawing and encoding get cheaper
+            if jpeg_scale < 1.0:
+                image = cv2.resize(image, None, fx=jpeg_scale, fy=jpeg_scale, interpolation=cv2.INTER_AREA)
+            annotated_image = self._draw_pose_landmarks(image, pose_landmarks, current_label, rep_count, exercise)
+            encoded = cv2.imencode('.jpg', annotated_image, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])[1]
+            payload['annotated_image'] = base64.b64encode(encoded).decode('utf-8')
+        return payload
+
+    def _draw_pose_landmarks(self, image, pose_landmarks, current_label, rep_count, exercise=None):
         """Draw enhanced pose landmarks with exercise information using EXACT reference styling"""
         # Create a copy for drawing
         annotated_image = image.copy()
@@ -235,7 +458,7 @@ class ExerciseAnalyzer:
         )
         
         # Add exercise information overlay (same as reference)
-        exercise = self._get_current_exercise(current_label)
+        exercise = exercise or self._get_current_exercise(current_label)
         if exercise:
             # Display the counter for the current exercise (exact reference style)
             cv2.putText(annotated_image, f"{exercise.title()}: {rep_count}", (50, 100), 
@@ -267,60 +490,85 @@ class ExerciseAnalyzer:
         
         return keypoints
 
-    def _basic_pose_analysis(self, image, pose_landmarks, exercise_type):
+    def _basic_pose_analysis(self, image, pose_landmarks, landmarks_array, exercise_type, render_options):
         """Fallback pose analysis when ML model is not available - with EXACT visual tracking"""
-        # Draw pose landmarks with EXACT reference styling
-        annotated_image = image.copy()
-        
-        # Draw pose landmarks with EXACT reference styling (orange dots, magenta lines)
-        self.mp_drawing.draw_landmarks(
-            annotated_image,
-            pose_landmarks,
-            self.mp_pose.POSE_CONNECTIONS,
-            landmark_drawing_spec=self.mp_drawing.DrawingSpec(
-                color=(245, 117, 66), thickness=2, circle_radius=2  # Orange dots (BGR: 66, 117, 245)
-            ),
-            connection_drawing_spec=self.mp_drawing.DrawingSpec(
-                color=(245, 66, 230), thickness=2  # Magenta lines (BGR: 230, 66, 245)
-            )
-        )
-        
-        # Add exercise information overlay (same as reference)
-        cv2.putText(annotated_image, f"{exercise_type.title()}: 0", (50, 100), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-        cv2.putText(annotated_image, f"{exercise_type}_detected", (50, 50), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
-        
-        return {
+        result = {
             'success': True,
             'exercise_type': exercise_type,
             'current_state': 'detected',
             'rep_count': 0,
             'feedback': 'Pose detected - ML model not available',
-            'form_score': 70,
-            'annotated_image': base64.b64encode(cv2.imencode('.jpg', annotated_image)[1]).decode('utf-8'),
-            'keypoints': self._extract_keypoints(np.array([[lmk.x, lmk.y, lmk.z] for lmk in pose_landmarks.landmark]))
+            'form_score': 70
         }
+        
+        # Same overlay as the ML path, labelled with the requested exercise
+        result.update(self._render_payload(
+            image, pose_landmarks, landmarks_array, f"{exercise_type}_detected", 0, exercise_type, **render_options
+        ))
+        return result
 
-    def reset_exercise(self, exercise_type):
-        """Reset exercise counter for a specific exercise"""
-        if exercise_type in self.exercise_counters:
-            self.exercise_counters[exercise_type] = 0
-            self.exercise_states[exercise_type] = 'down'
-            return True
-        return False
-
-    def get_exercise_stats(self):
-        """Get current exercise statistics"""
-        return {
-            'counters': self.exercise_counters.copy(),
-            'states': self.exercise_states.copy(),
-            'total_reps': sum(self.exercise_counters.values())
-        }
+    def reset_exercise(self, exercise_type, session_id=None):
+        """Reset exercise counter for a specific exercise in one session"""
+        if exercise_type not in EXERCISES:
+            return False
+        
+        state = self.sessions.peek(session_id)
+        if state is not None:
+            with state.lock:
+                state.exercise_counters[exercise_type] = 0
+                state.exercise_states[exercise_type] = 'down'
+        return True
+
+    def get_exercise_stats(self, session_id=None):
+        """Get current exercise statistics for one session"""
+        state = self.sessions.peek(session_id) or ExerciseSession(0)
+        with state.lock:
+            return {
+                'counters': state.exercise_counters.copy(),
+                'states': state.exercise_states.copy(),
+                'total_reps': sum(state.exercise_counters.values())
+            }
+
+    def end_stream(self, session_id=None):
+        """Free the session's pose engine once its stream ends; the rep counters
+        stay for the stats and reset endpoints until the session store expires them"""
+        self.pose_engines.release(session_id)
 
 
 class FullBodyPoseEmbedder:
-    """Converts 3D pose landmarks into 3D embedding."""
+    """Converts 3D pose landmarks into 3D embedding.
+    
+    Landmark pairs and triples are resolved to index arrays once, so each
+    embedding is a few NumPy fancy-indexing operations. Accepts a single pose
+    of shape (33, 3) or a batch of shape (N, 33, 3).
+    """
+    
+    _DISTANCE_PAIRS = [
+        ('left_shoulder', 'left_wrist'),
+        ('right_shoulder', 'right_wrist'),
+        ('left_hip', 'left_ankle'),
+        ('right_hip', 'right_ankle'),
+        ('left_hip', 'left_wrist'),
+        ('right_hip', 'right_wrist'),
+        ('left_shoulder', 'left_ankle'),
+        ('right_shoulder', 'right_ankle'),
+        ('left_hip', 'right_wrist'),
+        ('right_hip', 'left_wrist'),
+        ('left_elbow', 'right_elbow'),
+        ('left_knee', 'right_knee'),
+        ('left_wrist', 'right_wrist'),
+        ('left_ankle', 'right_ankle'),
+    ]
+    
+    _ANGLE_TRIPLES = [
+        ('right_elbow', 'right_shoulder', 'right_hip'),
+        ('left_elbow', 'left_shoulder', 'left_hip'),
+        ('right_knee', 'mid_hip', 'left_knee'),
+        ('right_hip', 'right_knee', 'right_ankle'),
+        ('left_hip', 'left_knee', 'left_ankle'),
+        ('right_wrist', 'right_elbow', 'right_shoulder'),
+        ('left_wrist', 'left_elbow', 'left_shoulder'),
+    ]
     
     def __init__(self, torso_size_multiplier=2.5):
         self._torso_size_multiplier = torso_size_multiplier
@@ -335,139 +583,94 @@ class FullBodyPoseEmbedder:
             'left_ankle', 'right_ankle', 'left_heel', 'right_heel',
             'left_foot_index', 'right_foot_index',
         ]
+        index = {name: i for i, name in enumerate(self._landmark_names)}
+        
+        self._left_hip = index['left_hip']
+        self._right_hip = index['right_hip']
+        self._distance_from = np.array([index[a] for a, _ in self._DISTANCE_PAIRS])
+        self._distance_to = np.array([index[b] for _, b in self._DISTANCE_PAIRS])
+        
+        # Triples naming a landmark MediaPipe does not output ('mid_hip') have
+        # always embedded as 0 degrees; keep that so trained models still match
+        self._angle_slots = np.array([
+            i for i, triple in enumerate(self._ANGLE_TRIPLES) if all(n in index for n in triple)
+        ])
+        valid_triples = [self._ANGLE_TRIPLES[i] for i in self._angle_slots]
+        self._angle_from = np.array([index[a] for a, _, _ in valid_triples])
+        self._angle_mid = np.array([index[b] for _, b, _ in valid_triples])
+        self._angle_to = np.array([index[c] for _, _, c in valid_triples])
 
     def __call__(self, landmarks):
         """Normalizes pose landmarks and converts to embedding"""
-        assert landmarks.shape[0] == len(self._landmark_names)
+        landmarks = np.asarray(landmarks)
+        single = landmarks.ndim == 2
+        batch = landmarks[np.newaxis] if single else landmarks
+        assert batch.shape[1:] == (len(self._landmark_names), 3)
         
-        landmarks = np.copy(landmarks)
-        landmarks = self._normalize_pose_landmarks(landmarks)
+        batch = self._normalize_pose_landmarks(batch)
         
-        distance_embedding = self._get_pose_distance_embedding(landmarks)
-        angle_embedding = self._get_pose_angle_embedding(landmarks)
-        distance3D_embedding = self._get_pose_3Ddistance_embedding(landmarks)
+        # The "2D" distance embedding has always used the 3D norm, so both
+        # distance embeddings are the same values; compute them once
+        distance3D_embedding = self._get_pose_3Ddistance_embedding(batch)
+        distance_embedding = distance3D_embedding.copy()
+        angle_embedding = self._get_pose_angle_embedding(batch)
         
-        return landmarks, distance_embedding, distance3D_embedding, angle_embedding
+        if single:
+            return batch[0], distance_embedding[0], distance3D_embedding[0], angle_embedding[0]
+        return batch, distance_embedding, distance3D_embedding, angle_embedding
+
+    def features(self, landmarks):
+        """Classifier input: 3D distances followed by angles, (21,) or (N, 21)"""
+        _, _, distance3D_embedding, angle_embedding = self(landmarks)
+        return np.concatenate((distance3D_embedding, angle_embedding), axis=-1)
 
     def _normalize_pose_landmarks(self, landmarks):
         """Normalizes landmarks translation and scale."""
-        landmarks = np.copy(landmarks)
-        
         # Normalize translation
-        pose_center = self._get_pose_center(landmarks)
-        landmarks -= pose_center
+        landmarks = landmarks - self._get_pose_center(landmarks)[:, np.newaxis]
         
         # Normalize scale
         pose_size = self._get_pose_size(landmarks, self._torso_size_multiplier)
-        landmarks /= pose_size
+        landmarks /= pose_size[:, np.newaxis, np.newaxis]
         landmarks *= 100
         
         return landmarks
 
     def _get_pose_center(self, landmarks):
         """Calculates pose center as point between hips."""
-        left_hip = landmarks[self._landmark_names.index('left_hip')]
-        right_hip = landmarks[self._landmark_names.index('right_hip')]
-        center = (left_hip + right_hip) * 0.5
-        return center
+        return (landmarks[:, self._left_hip] + landmarks[:, self._right_hip]) * 0.5
 
     def _get_pose_size(self, landmarks, torso_size_multiplier):
         """Calculates pose size."""
-        landmarks = landmarks[:, :2]
+        landmarks = landmarks[:, :, :2]
         hip_center = self._get_pose_center(landmarks)
         
-        max_dist = 0
-        for landmark in landmarks:
-            dist = np.linalg.norm(landmark - hip_center)
-            if dist > max_dist:
-                max_dist = dist
-        
+        max_dist = np.linalg.norm(landmarks - hip_center[:, np.newaxis], axis=2).max(axis=1)
         torso_size = max_dist * torso_size_multiplier
-        return max(torso_size, max_dist)
-
-    def _get_pose_distance_embedding(self, landmarks):
-        """Gets pose distance embedding."""
-        embedding = np.array([
-            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_wrist')[1],
-            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_hip', 'left_ankle')[1],
-            self._get_distance_by_names(landmarks, 'right_hip', 'right_ankle')[1],
-            self._get_distance_by_names(landmarks, 'left_hip', 'left_wrist')[1],
-            self._get_distance_by_names(landmarks, 'right_hip', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_ankle')[1],
-            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_ankle')[1],
-            self._get_distance_by_names(landmarks, 'left_hip', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'right_hip', 'left_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_elbow', 'right_elbow')[1],
-            self._get_distance_by_names(landmarks, 'left_knee', 'right_knee')[1],
-            self._get_distance_by_names(landmarks, 'left_wrist', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_ankle', 'right_ankle')[1],
-        ])
-        return embedding
-
-    def _get_pose_angle_embedding(self, landmarks):
-        """Gets pose angle embedding."""
-        angle_embedding = np.array([
-            self._get_angle_by_names(landmarks, 'right_elbow', 'right_shoulder', 'right_hip'),
-            self._get_angle_by_names(landmarks, 'left_elbow', 'left_shoulder', 'left_hip'),
-            self._get_angle_by_names(landmarks, 'right_knee', 'mid_hip', 'left_knee'),
-            self._get_angle_by_names(landmarks, 'right_hip', 'right_knee', 'right_ankle'),
-            self._get_angle_by_names(landmarks, 'left_hip', 'left_knee', 'left_ankle'),
-            self._get_angle_by_names(landmarks, 'right_wrist', 'right_elbow', 'right_shoulder'),
-            self._get_angle_by_names(landmarks, 'left_wrist', 'left_elbow', 'left_shoulder')
-        ])
-        return angle_embedding
+        return np.maximum(torso_size, max_dist)
 
     def _get_pose_3Ddistance_embedding(self, landmarks):
         """Gets 3D pose distance embedding."""
-        embedding_3d = np.array([
-            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_wrist')[1],
-            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_hip', 'left_ankle')[1],
-            self._get_distance_by_names(landmarks, 'right_hip', 'right_ankle')[1],
-            self._get_distance_by_names(landmarks, 'left_hip', 'left_wrist')[1],
-            self._get_distance_by_names(landmarks, 'right_hip', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_ankle')[1],
-            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_ankle')[1],
-            self._get_distance_by_names(landmarks, 'left_hip', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'right_hip', 'left_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_elbow', 'right_elbow')[1],
-            self._get_distance_by_names(landmarks, 'left_knee', 'right_knee')[1],
-            self._get_distance_by_names(landmarks, 'left_wrist', 'right_wrist')[1],
-            self._get_distance_by_names(landmarks, 'left_ankle', 'right_ankle')[1],
-        ])
-        return embedding_3d
+        deltas = landmarks[:, self._distance_from] - landmarks[:, self._distance_to]
+        return np.sqrt(np.sum(deltas ** 2, axis=2))
 
-    def _get_distance_by_names(self, landmarks, name_from, name_to):
-        """Gets distance between two landmarks by name."""
-        try:
-            lmk_from = landmarks[self._landmark_names.index(name_from)]
-            lmk_to = landmarks[self._landmark_names.index(name_to)]
-            return self._get_distance(lmk_from, lmk_to)[0], self._get_distance(lmk_from, lmk_to)[1]
-        except ValueError:
-            return np.array([0, 0]), np.array([0, 0])
-
-    def _get_distance(self, lmk_from, lmk_to):
-        """Gets distance between two landmarks."""
-        squared_dist = np.sum((lmk_from - lmk_to) ** 2, axis=0)
-        dist_3D = np.sqrt(squared_dist)
-        return self._get_distance(lmk_from, lmk_to)[0], self._get_distance(lmk_from, lmk_to)[1]
-
-    def _get_angle_by_names(self, landmarks, name_from, name_mid, name_to):
-        """Gets angle between three landmarks by name."""
-        try:
-            lmk_from = landmarks[self._landmark_names.index(name_from)]
-            lmk_mid = landmarks[self._landmark_names.index(name_mid)]
-            lmk_to = landmarks[self._landmark_names.index(name_to)]
-            return self._get_angle(lmk_from, lmk_mid, lmk_to)
-        except ValueError:
-            return 0.0
-
-    def _get_angle(self, lmk_from, lmk_mid, lmk_to):
-        """Gets angle between three landmarks."""
-        v1 = lmk_from - lmk_mid
-        v2 = lmk_to - lmk_mid
+    def _get_pose_angle_embedding(self, landmarks):
+        """Gets pose angle embedding."""
+        v1 = landmarks[:, self._angle_from] - landmarks[:, self._angle_mid]
+        v2 = landmarks[:, self._angle_to] - landmarks[:, self._angle_mid]
         
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-        return np.degrees(angle)
\ No newline at end of file
+        # Stacked matmul takes the same dot-product kernel as np.dot on one
+        # vector pair, and the per-pair scalar clip promoted to float64, so
+        # this reproduces the per-pair results exactly
+        dot = self._row_dot(v1, v2)
+        cos_angle = dot / (np.sqrt(self._row_dot(v1, v1)) * np.sqrt(self._row_dot(v2, v2)))
+        angles = np.degrees(np.arccos(np.clip(cos_angle.astype(np.float64), -1.0, 1.0)))
+        
+        angle_embedding = np.zeros((landmarks.shape[0], len(self._ANGLE_TRIPLES)))
+        angle_embedding[:, self._angle_slots] = angles
+        return angle_embedding
+
+    @staticmethod
+    def _row_dot(a, b):
+        """Dot product of matching vectors along the last axis"""
+        return np.matmul(a[..., np.newaxis, :], b[..., :, np.newaxis])[..., 0, 0]
@@ -0,0 +1,96 @@
+import json
+import threading
+
+
+class LatestFrameSlot:
+    """Single-slot mailbox: a new frame replaces any frame not yet picked up"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def take(self):
+        """Block until a frame is available; returns None once closed"""
+        with self._cond:
+            while self._item is None and not self._closed:
+                self._cond.wait()
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._item = None
+            self._cond.notify_all()
+
+
+class ExerciseStream:
+    """Analyzes frames from one streaming client, always on the newest frame.
+
+    Frames are pushed with submit() as fast as the client sends them. A single
+    worker thread runs the analyzer on whatever frame is most recent and hands
+    each result (as a JSON string) to send, so when inference is slower than
+    the camera the backlog is dropped instead of queued.
+    """
+
+    def __init__(self, analyzer, send, session_id, exercise_type='pushup', render_options=None):
+        self.analyzer = analyzer
+        self.send = send
+        self.session_id = session_id
+        self.exercise_type = exercise_type
+        self.render_options = render_options or {}
+        self.frames_received = 0
+        self.frames_processed = 0
+        self._slot = LatestFrameSlot()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._worker.start()
+        return self
+
+    def submit(self, image_data, exercise_type=None):
+        """Queue a frame (raw bytes or data URL); older pending frames are dropped"""
+        if exercise_type:
+            self.exercise_type = exercise_type
+        if image_data:
+            self.frames_received += 1
+            self._slot.put((self.frames_received, image_data, self.exercise_type))
+
+    def close(self, timeout=5):
+        """Stop the worker and hand the session's pose engine back to the pool"""
+        self._slot.close()
+        if self._worker.is_alive() and self._worker is not threading.current_thread():
+            self._worker.join(timeout)
+        self.analyzer.end_stream(self.session_id)
+
+    @property
+    def frames_dropped(self):
+        return self._slot.dropped
+
+    def _run(self):
+        while True:
+            item = self._slot.take()
+            if item is None:
+                return
+            frame_id, image_data, exercise_type = item
+            result = self.analyzer.analyze_exercise(image_data, exercise_type, self.session_id,
+                                                    **self.render_options)
+            result['frame_id'] = frame_id
+            result['dropped_frames'] = self._slot.dropped
+            self.frames_processed += 1
+            try:
+                self.send(json.dumps(result))
+            except Exception as e:
+                # Client went away mid-send; stop analyzing for it
+                print(f"Exercise stream closed: {str(e)}")
+                self._slot.close()
+                return
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+# FACE_DETECTOR=dnn swaps the Haar cascade for OpenCV's YuNet CNN detector
+# (cv2.FaceDetectorYN), given its ONNX weights in FACE_DNN_MODEL
+FACE_DETECTOR = os.environ.get('FACE_DETECTOR', 'haar')
+FACE_DNN_MODEL = os.environ.get('FACE_DNN_MODEL', '')
+FACE_DETECT_MAX_SIDE = int(os.environ.get('FACE_DETECT_MAX_SIDE', '480'))
+FACE_DETECT_SCALE_FACTOR = float(os.environ.get('FACE_DETECT_SCALE_FACTOR', '1.2'))
+
+
+class HaarBackend:
+    """The frontal-face Haar cascade.
+
+    With the reference scaleFactor of 1.3 the cascade's pyramid is coarse
+    enough that whether a face is found depends on how the frame happens to
+    be scaled, so downscaled frames use a 1.2 step. detect_near only tries
+    scales close to a known face size, where a fine 1.1 step is cheap.
+    """
+    name = 'haar'
+
+    def __init__(self, scale_factor=1.2, min_neighbors=5, near_scale_factor=1.1):
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.near_scale_factor = near_scale_factor
+
+    def detect(self, gray):
+        return self._detect(gray, self.scale_factor, (0, 0), (0, 0))
+
+    def detect_near(self, gray, min_size, max_size):
+        return self._detect(gray, self.near_scale_factor, min_size, max_size)
+
+    def _detect(self, gray, scale_factor, min_size, max_size):
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=scale_factor, minNeighbors=self.min_neighbors,
+                                              minSize=min_size, maxSize=max_size)
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class YuNetBackend:
+    """OpenCV's YuNet face detector on the CPU, fed the grayscale frame as BGR"""
+    name = 'dnn'
+
+    def __init__(self, model_path, score_threshold=0.7):
+        self.detector = cv2.FaceDetectorYN.create(model_path, '', (320, 320), score_threshold)
+        self.detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.lock = threading.Lock()  # the input size is per-call state
+
+    def detect(self, gray):
+        height, width = gray.shape[:2]
+        with self.lock:
+            self.detector.setInputSize((width, height))
+            _, faces = self.detector.detect(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+        boxes = []
+        for face in faces if faces is not None else []:
+            x, y, w, h = (int(round(v)) for v in face[:4])
+            x, y = max(x, 0), max(y, 0)
+            w, h = min(w, width - x), min(h, height - y)
+            if w > 0 and h > 0:
+                boxes.append((x, y, w, h))
+        return boxes
+
+    def detect_near(self, gray, min_size, max_size):
+        return [face for face in self.detect(gray) if min_size[0] <= face[2] <= max_size[0]]
+
+
+def _same_face(a, b):
+    """Whether box a's centre lies inside box b"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return bx <= ax + aw / 2 <= bx + bw and by <= ay + ah / 2 <= by + bh
+
+
+class FaceDetector:
+    """Face detection stage for emotion analysis.
+
+    Frames whose longer side exceeds max_side are downscaled (INTER_AREA)
+    before detection and the boxes mapped back to full resolution, so the
+    detector's cost no longer grows with the camera resolution. With a
+    session id, a lone face found for that session is kept for roi_ttl
+    seconds and the next frame first searches only that face plus a
+    roi_margin border, at face-sized scales; a miss falls back to the full
+    frame. Every full_search_every-th frame is searched in full anyway,
+    merged with the ROI hits, so someone joining a one-person session is
+    found within that many frames. Frames with several faces keep no ROI,
+    so group scenes are always searched in full. Up to max_sessions ROIs
+    are kept, least recently used evicted.
+    """
+
+    def __init__(self, backend=None, max_side=480, roi_margin=0.5, roi_ttl=2.0, max_sessions=1000,
+                 full_search_every=10):
+        self.backend = backend or HaarBackend()
+        self.max_side = max_side
+        self.roi_margin = roi_margin
+        self.roi_ttl = roi_ttl
+        self.max_sessions = max_sessions
+        self.full_search_every = full_search_every
+        self.roi_hits = 0
+        self.full_searches = 0
+        self._rois = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build the detector configured by the FACE_DETECTOR / FACE_DNN_MODEL / FACE_DETECT_* variables"""
+        backend = None
+        if FACE_DETECTOR == 'dnn':
+            try:
+                backend = YuNetBackend(FACE_DNN_MODEL)
+            except cv2.error as e:
+                print(f"⚠️ DNN face detector unavailable ({FACE_DNN_MODEL or 'FACE_DNN_MODEL not set'}): {e}; "
+                      f"using the Haar cascade")
+        return cls(backend or HaarBackend(FACE_DETECT_SCALE_FACTOR), max_side=FACE_DETECT_MAX_SIDE)
+
+    def detect(self, gray, session_id=None):
+        """Return face boxes (x, y, w, h) in the frame's own pixel coordinates"""
+        roi_faces = []
+        if session_id is not None:
+            face, roi_frames = self._last_face(session_id)
+            roi_faces = self._detect_in_roi(gray, face)
+            if roi_faces and roi_frames + 1 < self.full_search_every:
+                self.roi_hits += 1
+                self._remember(session_id, roi_faces[0], roi_frames + 1)
+                return roi_faces
+
+        self.full_searches += 1
+        faces = self.detect_full(gray)
+        # Keep ROI hits the coarser full-frame search missed
+        faces += [face for face in roi_faces if not any(_same_face(face, other) for other in faces)]
+        if session_id is not None:
+            self._remember(session_id, faces[0] if len(faces) == 1 else None)
+        return faces
+
+    def detect_full(self, gray):
+        """Search the whole (downscaled) frame"""
+        height, width = gray.shape[:2]
+        scale = min(1.0, self.max_side / max(height, width)) if self.max_side else 1.0
+        if scale == 1.0:
+            return self.backend.detect(gray)
+        small = cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+        return [tuple(int(round(v / scale)) for v in face) for face in self.backend.detect(small)]
+
+    def forget(self, session_id):
+        with self._lock:
+            self._rois.pop(session_id, None)
+
+    def _detect_in_roi(self, gray, face):
+        if face is None:
+            return []
+        x, y, w, h = face
+        height, width = gray.shape[:2]
+        x0, y0 = max(int(x - w * self.roi_margin), 0), max(int(y - h * self.roi_margin), 0)
+        x1, y1 = min(int(x + w * (1 + self.roi_margin)), width), min(int(y + h * (1 + self.roi_margin)), height)
+        if x1 <= x0 or y1 <= y0:
+            return []
+        # The face moves between frames but barely changes size
+        faces = self.backend.detect_near(gray[y0:y1, x0:x1], (int(w * 0.7), int(h * 0.7)),
+                                         (int(w * 1.4), int(h * 1.4)))
+        return [(fx + x0, fy + y0, fw, fh) for fx, fy, fw, fh in faces]
+
+    def _last_face(self, session_id):
+        """(face, frames served from the ROI since the last full search), or (None, 0)"""
+        with self._lock:
+            entry = self._rois.get(session_id)
+            if entry is None:
+                return None, 0
+            if time.monotonic() - entry[1] > self.roi_ttl:
+                del self._rois[session_id]
+                return None, 0
+            return entry[0], entry[2]
+
+    def _remember(self, session_id, face, roi_frames=0):
+        with self._lock:
+            if face is None:
+                self._rois.pop(session_id, None)
+                return
+            self._rois[session_id] = (face, time.monotonic(), roi_frames)
+            self._rois.move_to_end(session_id)
+            while len(self._rois) > self.max_sessions:
+                self._rois.popitem(last=False)
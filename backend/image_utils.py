@@ -0,0 +1,34 @@
+import base64
+
+import cv2
+import numpy as np
+
+# What exercise analysis sends back besides the exercise state:
+# 'none' - state only, 'keypoints' - plus keypoints, 'jpeg' - plus annotated image
+RENDER_MODES = ('none', 'keypoints', 'jpeg')
+
+
+def encoded_image_bytes(image_data):
+    """Return the encoded (JPEG/PNG) bytes of a frame.
+
+    Accepts either raw bytes from a binary upload or the legacy
+    `data:image/jpeg;base64,...` data URL sent inside JSON.
+    """
+    if isinstance(image_data, (bytes, bytearray, memoryview)):
+        return image_data
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    return base64.b64decode(image_data)
+
+
+def decode_image(image_data, flags=cv2.IMREAD_COLOR):
+    """Decode a frame straight into a NumPy array with cv2.imdecode.
+
+    IMREAD_COLOR yields a BGR image, IMREAD_GRAYSCALE a single channel one.
+    Raises ValueError when the payload is not a decodable image.
+    """
+    buffer = np.frombuffer(encoded_image_bytes(image_data), dtype=np.uint8)
+    image = cv2.imdecode(buffer, flags)
+    if image is None:
+        raise ValueError('Could not decode image data')
+    return image
@@ -0,0 +1,130 @@
+import itertools
+import multiprocessing
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Models owned by this worker process (set by _init_worker)
+_exercise_analyzer = None
+_emotion_ai = None
+
+
+def _init_worker(load_face_model):
+    global _exercise_analyzer, _emotion_ai
+    from exercise_analyzer import ExerciseAnalyzer
+    _exercise_analyzer = ExerciseAnalyzer()
+    if load_face_model:
+        from emotion_ai import emotion_ai
+        _emotion_ai = emotion_ai
+
+
+def _analyze_exercise(image_data, exercise_type, session_id, render_options):
+    return _exercise_analyzer.analyze_exercise(image_data, exercise_type, session_id, **render_options)
+
+
+def _reset_exercise(exercise_type, session_id):
+    return _exercise_analyzer.reset_exercise(exercise_type, session_id)
+
+
+def _get_exercise_stats(session_id):
+    return _exercise_analyzer.get_exercise_stats(session_id)
+
+
+def _end_stream(session_id):
+    return _exercise_analyzer.end_stream(session_id)
+
+
+def _analyze_face_image(image_data, session_id):
+    return _emotion_ai.analyze_face_image(image_data, session_id)
+
+
+def _ping():
+    return True
+
+
+class InferencePool:
+    """Process-pool tier for the CPU-heavy pose and face models.
+
+    Each of the N workers is a single-process executor that loads its own
+    ExerciseAnalyzer (and EmotionRecognition) once, so inference runs outside
+    the Flask process and its GIL. Calls for a session always go to the same
+    worker (crc32 of the session id), which keeps that session's pose
+    tracking and rep counters in one place and its frames in order. Calls
+    without a session are spread round-robin.
+
+    Exposes the same analyze/reset/stats/end_stream methods as ExerciseAnalyzer and
+    analyze_face_image like EmotionRecognition, blocking until the worker
+    answers.
+
+    A worker that dies (a native crash in MediaPipe or TensorFlow, an OOM
+    kill) is replaced by a fresh one and the call retried once there; the
+    sessions it owned start over with new tracking and counters.
+    """
+
+    def __init__(self, n_workers, load_face_model=True):
+        self.n_workers = n_workers
+        self.load_face_model = load_face_model
+        self.restarts = 0
+        self._workers = [self._start_worker() for _ in range(n_workers)]
+        self._round_robin = itertools.cycle(range(n_workers))
+        self._lock = threading.Lock()
+
+    def worker_for(self, session_id):
+        """Index of the worker that owns a session"""
+        if session_id is None:
+            return next(self._round_robin)
+        return zlib.crc32(str(session_id).encode('utf-8')) % self.n_workers
+
+    def warm_up(self):
+        """Block until every worker has loaded its models"""
+        for future in [worker.submit(_ping) for worker in self._workers]:
+            future.result()
+
+    def analyze_exercise(self, image_data, exercise_type, session_id=None, **render_options):
+        return self._call(session_id, _analyze_exercise, image_data, exercise_type, session_id, render_options)
+
+    def reset_exercise(self, exercise_type, session_id=None):
+        return self._call(session_id, _reset_exercise, exercise_type, session_id)
+
+    def get_exercise_stats(self, session_id=None):
+        return self._call(session_id, _get_exercise_stats, session_id)
+
+    def end_stream(self, session_id=None):
+        return self._call(session_id, _end_stream, session_id)
+
+    def analyze_face_image(self, image_data, session_id=None):
+        return self._call(session_id, _analyze_face_image, image_data, session_id)
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.shutdown()
+
+    def _start_worker(self):
+        # Spawn rather than fork: TensorFlow and MediaPipe are not fork-safe
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(self.load_face_model,))
+
+    def _replace_worker(self, index, broken):
+        """Swap a fresh executor in for a broken one, unless another caller already did"""
+        with self._lock:
+            if self._workers[index] is broken:
+                print(f"⚠️ Inference worker {index} died; starting a new one")
+                self._workers[index] = self._start_worker()
+                self.restarts += 1
+                broken.shutdown(wait=False)
+            return self._workers[index]
+
+    def _call(self, session_id, fn, *args):
+        index = self.worker_for(session_id)
+        worker = self._workers[index]
+        try:
+            return worker.submit(fn, *args).result()
+        except BrokenProcessPool:
+            worker = self._replace_worker(index, worker)
+        try:
+            return worker.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # Crashed again, likely on this input: fail this call, keep the shard usable
+            self._replace_worker(index, worker)
+            raise
@@ -1,12 +1,54 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.websockets import WebSocketDisconnect
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
+import io
+import os
 import uvicorn
-import json
 import random
 
-app = FastAPI(title="Healthcare AI API", version="1.0.0")
+import database
+from database import init_db
+import services
+from services import ServiceError, require_user
+from exercise_stream import ExerciseStream
+
+# Async port of app.py: the same routes, backed by the same services.py, so
+# one uvicorn deployment (WEB_CONCURRENCY workers) serves everything. Blocking
+# work never runs on the event loop: SQLite calls go to a thread pool sized to
+# the connection pool, model inference to one sized to the CPU count (or on to
+# the INFERENCE_WORKERS processes), and password hashing to the default
+# thread pool, since PasswordHasher bounds its own concurrency.
+db_executor = ThreadPoolExecutor(max_workers=database.pool.max_size, thread_name_prefix='db')
+analysis_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='analysis')
+
+async def in_db(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(db_executor, partial(fn, *args))
+
+async def in_analysis(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(analysis_executor, partial(fn, *args))
+
+@asynccontextmanager
+async def lifespan(app):
+    services.start_model_warm_up()
+    yield
+    db_executor.shutdown(wait=False)
+    analysis_executor.shutdown(wait=False)
+    if services.inference_pool is not None:
+        services.inference_pool.shutdown()
+
+# Initialize database
+init_db()
+
+app = FastAPI(title="Healthcare AI API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -15,7 +57,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(SessionMiddleware, secret_key='healthcare_secret_key')
+
+@app.exception_handler(ServiceError)
+async def service_error(request, e):
+    return JSONResponse({'error': e.message}, status_code=e.status, headers=e.headers)
 
 # Pydantic models
 class SymptomInput(BaseModel):
@@ -222,5 +270,314 @@ async def get_health_recommendations():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Routes shared with app.py
+
+async def json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ServiceError('Request body must be JSON')
+
+def form_values(form, query_params):
+    """Form fields overridden by query parameters, like Flask's request.values"""
+    return dict({k: v for k, v in form.items() if isinstance(v, str)}, **query_params)
+
+def client_session_id(data, connection):
+    return services.exercise_session_id(data, connection.session, connection.client.host if connection.client else None)
+
+async def list_response(request, name):
+    """Keyset-paginated listing: a page plus X-Next-Cursor with ?limit=, else the whole listing streamed"""
+    listing, params, limit = services.open_listing(name, request.session, request.query_params.get('limit'),
+                                                   request.query_params.get('after'))
+    if limit is None:
+        # The first chunk is read here; Starlette iterates the rest of the
+        # blocking generator in its thread pool
+        chunks = await in_db(services.stream_list, listing, params)
+        return StreamingResponse(chunks, media_type='application/json')
+
+    rows, next_cursor = await in_db(services.list_page, listing, params, limit)
+    return JSONResponse(rows, headers={'X-Next-Cursor': next_cursor} if next_cursor else None)
+
+async def read_frame_request(request):
+    """Return (image, params) for a frame upload; the same three formats as app.py"""
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    params = dict(request.query_params)
+    if content_type.startswith('image/') or content_type == 'application/octet-stream':
+        return await request.body(), params
+    if content_type == 'multipart/form-data':
+        form = await request.form()
+        image = form.get('image')
+        if not hasattr(image, 'read'):
+            return '', {}
+        return await image.read(), form_values(form, params)
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    data = data if isinstance(data, dict) else {}
+    return data.get('image', ''), data
+
+@app.post('/api/register', status_code=201)
+async def register(request: Request):
+    return await run_in_threadpool(services.register, await json_body(request))
+
+@app.post('/api/login')
+async def login(request: Request):
+    return await run_in_threadpool(services.login, request.session, await json_body(request))
+
+@app.post('/api/logout')
+async def logout(request: Request):
+    return services.logout(request.session)
+
+@app.get('/api/auth/status')
+async def auth_status(request: Request):
+    return await in_db(services.auth_status, request.session)
+
+# Patient routes
+@app.get('/api/patient/records')
+async def patient_records(request: Request):
+    return await list_response(request, 'patient_records')
+
+@app.post('/api/patient/records', status_code=201)
+async def create_record(request: Request):
+    require_user(request.session, 'patient')
+    form = await request.form()
+    file = form.get('file')
+    upload = (file.filename, file.file) if hasattr(file, 'read') else None
+    return await in_db(services.create_record, request.session, form, upload)
+
+@app.get('/api/patient/appointments')
+async def patient_appointments(request: Request):
+    return await in_db(services.patient_appointments, request.session)
+
+@app.post('/api/patient/appointments', status_code=201)
+async def create_appointment(request: Request):
+    require_user(request.session, 'patient')
+    return await in_db(services.create_appointment, request.session, await json_body(request))
+
+@app.get('/api/doctors')
+async def get_doctors():
+    return await in_db(services.doctors)
+
+# Doctor routes
+@app.get('/api/doctor/patients')
+async def doctor_patients(request: Request):
+    return await list_response(request, 'doctor_patients')
+
+@app.get('/api/doctor/records')
+async def doctor_records(request: Request):
+    return await list_response(request, 'doctor_records')
+
+@app.post('/api/doctor/verify-record')
+async def verify_record(request: Request):
+    require_user(request.session, 'doctor')
+    return await in_db(services.verify_record, request.session, await json_body(request))
+
+@app.post('/api/doctor/prescriptions', status_code=201)
+async def add_prescription(request: Request):
+    require_user(request.session, 'doctor')
+    return await in_db(services.add_prescription, request.session, await json_body(request))
+
+# Admin routes
+@app.get('/api/admin/users')
+async def admin_users(request: Request):
+    return await list_response(request, 'admin_users')
+
+@app.get('/api/admin/stats')
+async def admin_stats(request: Request):
+    return await in_db(services.admin_stats, request.session)
+
+@app.post('/api/admin/models/reload')
+async def reload_models(request: Request):
+    return await in_analysis(services.reload_models, request.session)
+
+@app.get('/api/admin/models')
+async def admin_models(request: Request):
+    return services.admin_models(request.session)
+
+@app.get('/api/ready')
+async def readiness():
+    body = services.readiness()
+    return JSONResponse(body, status_code=200 if body['ready'] else 503)
+
+# Mental Health Analysis endpoints
+@app.post('/api/mental-health/analyze-text')
+async def analyze_text(request: Request):
+    require_user(request.session)
+    return await in_analysis(services.analyze_text, request.session, await json_body(request))
+
+@app.post('/api/mental-health/analyze-text/batch')
+async def analyze_text_batch(request: Request):
+    require_user(request.session)
+    return await in_analysis(services.analyze_text_batch, request.session, await json_body(request))
+
+@app.post('/api/mental-health/analyze-voice')
+async def analyze_voice(request: Request):
+    """Analyze an 'audio' file upload or a raw audio body; no audio gives the mock reading"""
+    require_user(request.session)
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    if content_type == 'multipart/form-data':
+        form = await request.form()
+        upload = form.get('audio')
+        if hasattr(upload, 'read'):
+            options = services.voice_audio_options(form_values(form, request.query_params), upload.content_type or '')
+            return await in_analysis(services.analyze_voice, request.session, upload.file, options)
+    elif content_type.startswith('audio/') or content_type == 'application/octet-stream':
+        options = services.voice_audio_options(request.query_params, content_type)
+        audio = io.BytesIO(await request.body())
+        return await in_analysis(services.analyze_voice, request.session, audio, options)
+    return await in_analysis(services.analyze_voice, request.session)
+
+@app.post('/api/mental-health/analyze-face')
+async def analyze_face(request: Request):
+    require_user(request.session)
+    image_data, data = await read_frame_request(request)
+    return await in_analysis(services.analyze_face, request.session, image_data, client_session_id(data, request))
+
+# Exercise Analysis endpoints
+@app.post('/api/exercise/analyze')
+async def analyze_exercise(request: Request):
+    require_user(request.session)
+    image_data, data = await read_frame_request(request)
+    return await in_analysis(services.analyze_exercise, image_data, data, client_session_id(data, request))
+
+# Test endpoint for visual tracking (no auth required)
+@app.post('/api/test/exercise/analyze')
+async def test_analyze_exercise(request: Request):
+    image_data, data = await read_frame_request(request)
+    return await in_analysis(services.analyze_exercise, image_data, data, client_session_id(data, request))
+
+async def serve_exercise_stream(ws):
+    """Feed websocket frames to an ExerciseStream until the client disconnects; see app.py"""
+    params = dict(ws.query_params)
+    await ws.accept()
+    try:
+        render_options = services.exercise_render_options(params)
+    except ValueError as e:
+        await ws.close(code=1003, reason=str(e))
+        return
+
+    # ExerciseStream sends from its worker thread; hand each message to the loop
+    loop = asyncio.get_running_loop()
+    send = lambda message: asyncio.run_coroutine_threadsafe(ws.send_text(message), loop).result()
+    stream = ExerciseStream(services.exercise_inference, send, client_session_id(params, ws),
+                            params.get('exercise_type', 'pushup'), render_options).start()
+    try:
+        while True:
+            message = await ws.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message.get('text') is not None:
+                try:
+                    data = services.stream_control_message(message['text'])
+                except ServiceError as e:
+                    await ws.send_json({'error': e.message})
+                    continue
+                stream.submit(data.get('image'), data.get('exercise_type'))
+            elif message.get('bytes') is not None:
+                stream.submit(message['bytes'])
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # close() joins the worker, which may be waiting on a send to this loop
+        await loop.run_in_executor(None, stream.close)
+
+@app.websocket('/api/exercise/stream')
+async def exercise_stream(ws: WebSocket):
+    if 'user_id' not in ws.session:
+        await ws.close(code=1008, reason='Unauthorized')
+        return
+    await serve_exercise_stream(ws)
+
+# Test stream for visual tracking (no auth required)
+@app.websocket('/api/test/exercise/stream')
+async def test_exercise_stream(ws: WebSocket):
+    await serve_exercise_stream(ws)
+
+@app.websocket('/api/mental-health/voice-stream')
+async def voice_stream(ws: WebSocket):
+    """Voice emotion per sliding window over streamed 16-bit PCM; see app.py"""
+    if 'user_id' not in ws.session:
+        await ws.close(code=1008, reason='Unauthorized')
+        return
+    await ws.accept()
+    try:
+        options = services.voice_audio_options(dict(ws.query_params))
+    except ServiceError as e:
+        await ws.close(code=1003, reason=e.message)
+        return
+
+    # The first stream loads the voice model (TensorFlow); keep that off the loop
+    stream = await in_analysis(services.open_voice_stream, options)
+    try:
+        while True:
+            message = await ws.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message.get('text') is not None:
+                try:
+                    end = services.stream_control_message(message['text']).get('end')
+                except ServiceError as e:
+                    await ws.send_json({'error': e.message})
+                    continue
+                if not end:
+                    continue
+                for result in await in_analysis(stream.flush):
+                    await ws.send_json(result)
+                await ws.close()
+                break
+            if message.get('bytes') is not None:
+                for result in await in_analysis(stream.push_pcm, message['bytes']):
+                    await ws.send_json(result)
+    except WebSocketDisconnect:
+        pass
+
+@app.post('/api/exercise/analyze-video')
+async def analyze_exercise_video(request: Request):
+    """Analyze an uploaded workout video, streaming the timeline as JSON lines"""
+    require_user(request.session)
+    form = await request.form()
+    upload = form.get('video')
+    if not hasattr(upload, 'read'):
+        return JSONResponse({'error': 'No video uploaded'}, status_code=400)
+
+    lines = await in_analysis(services.open_video_analysis, request.session, upload.filename, upload.file,
+                              form_values(form, request.query_params))
+    return StreamingResponse(lines, media_type='application/x-ndjson')
+
+@app.post('/api/exercise/reset')
+async def reset_exercise(request: Request):
+    require_user(request.session)
+    data = await json_body(request)
+    return await in_analysis(services.reset_exercise, data, client_session_id(data, request))
+
+# Test endpoint for exercise reset (no auth required)
+@app.post('/api/test/exercise/reset')
+async def test_reset_exercise(request: Request):
+    data = await json_body(request)
+    return await in_analysis(services.reset_exercise, data, client_session_id(data, request))
+
+@app.get('/api/exercise/stats')
+async def exercise_stats(request: Request):
+    require_user(request.session)
+    return await in_analysis(services.exercise_stats, client_session_id(request.query_params, request))
+
+# Test endpoint for exercise stats (no auth required)
+@app.get('/api/test/exercise/stats')
+async def test_exercise_stats(request: Request):
+    return await in_analysis(services.exercise_stats, client_session_id(request.query_params, request))
+
+@app.post('/api/personalized-recommendations')
+async def personalized_recommendations(request: Request):
+    require_user(request.session)
+    return await in_analysis(services.personalized_recommendations, request.session, await json_body(request))
+
+@app.post('/api/personalized-recommendations/batch')
+async def batch_recommendations(request: Request):
+    require_user(request.session, 'doctor', 'admin')
+    return await in_analysis(services.batch_recommendations, request.session, await json_body(request))
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # e.g. WEB_CONCURRENCY=4 python main.py; each worker process loads its own models
+    uvicorn.run("main:app", host="0.0.0.0", port=int(os.environ.get('PORT', '8000')),
+                workers=int(os.environ.get('WEB_CONCURRENCY', '1')))
\ No newline at end of file
@@ -5,21 +5,77 @@ from xgboost import XGBClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics.pairwise import cosine_similarity
-import joblib
 import json
+import os
+from datetime import datetime, timezone
+from lru_cache import LRUCache
+from model_artifacts import ModelNotTrained, current_version, load_bundle, new_version, save_bundle
+from tree_engine import CompiledHealthcareModels
+
+FEATURE_COLS = ['age', 'gender_encoded', 'bmi', 'bp_systolic', 'glucose',
+                'diabetes', 'hypertension', 'heart_disease', 'smoking', 'alcohol']
+
+# Profiles from the recommendations route map onto a small set of discrete
+# feature rows, so single-patient model outputs are memoized per row
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '4096'))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '3600'))
 
 class PersonalizedHealthcareAI:
-    def __init__(self):
-        self.treatment_model = None
-        self.risk_model = None
+    def __init__(self, cache_size=None):
+        self.prediction_cache = LRUCache(PREDICTION_CACHE_SIZE if cache_size is None else cache_size,
+                                         PREDICTION_CACHE_TTL)
+        self.bundle = None
         self.drug_interaction_model = None
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
         self.patient_profiles = []
         self.treatment_outcomes = []
+
+    @property
+    def bundle(self):
+        """Models, scaler, encoders and feature schema of one training run"""
+        return self._active[0]
+
+    @bundle.setter
+    def bundle(self, bundle):
+        # The bundle and its compiled single-row engine are replaced as one
+        # tuple, so a request never mixes two versions. Cached predictions
+        # are keyed by version too; clearing just frees the old entries.
+        self._active = (bundle, self._compile(bundle))
+        self.prediction_cache.clear()
+
+    @staticmethod
+    def _compile(bundle):
+        if bundle is None:
+            return None
+        try:
+            return CompiledHealthcareModels(bundle)
+        except (ValueError, KeyError, AttributeError) as e:
+            print(f"⚠️ Fast inference path unavailable, using sklearn/xgboost: {str(e)}")
+            return None
+
+    @property
+    def version(self):
+        return self.bundle['version'] if self.bundle else None
+
+    @property
+    def treatment_model(self):
+        return self.bundle['treatment_model'] if self.bundle else None
+
+    @property
+    def risk_model(self):
+        return self.bundle['risk_model'] if self.bundle else None
+
+    @property
+    def scaler(self):
+        return self.bundle['scaler'] if self.bundle else None
+
+    @property
+    def label_encoders(self):
+        return self.bundle['label_encoders'] if self.bundle else {}
         
-    def create_sample_data(self):
+    def create_sample_data(self, seed=None):
         """Create sample training data for ML models"""
+        if seed is not None:
+            np.random.seed(seed)
         # Sample patient data
         patients = []
         treatments = []
@@ -68,63 +124,93 @@ class PersonalizedHealthcareAI:
         
         return pd.DataFrame(patients), treatments, outcomes
     
-    def train_models(self):
-        """Train ML models for personalized recommendations"""
+    def train_models(self, seed=None):
+        """Train ML models for personalized recommendations and return them as a bundle"""
         # Create sample data
-        df, treatments, outcomes = self.create_sample_data()
+        df, treatments, outcomes = self.create_sample_data(seed)
         
         # Encode categorical variables
         le_gender = LabelEncoder()
         df['gender_encoded'] = le_gender.fit_transform(df['gender'])
-        self.label_encoders['gender'] = le_gender
         
         le_treatment = LabelEncoder()
         treatment_encoded = le_treatment.fit_transform(treatments)
-        self.label_encoders['treatment'] = le_treatment
         
         # Prepare features
-        feature_cols = ['age', 'gender_encoded', 'bmi', 'bp_systolic', 'glucose', 
-                       'diabetes', 'hypertension', 'heart_disease', 'smoking', 'alcohol']
-        X = df[feature_cols]
+        X = df[FEATURE_COLS]
         
         # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X.to_numpy())
         
         # Train treatment recommendation model
-        self.treatment_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.treatment_model.fit(X_scaled, treatment_encoded)
+        treatment_model = RandomForestClassifier(n_estimators=100, random_state=42)
+        treatment_model.fit(X_scaled, treatment_encoded)
         
         # Train risk prediction model
         # Create risk labels (high risk if multiple conditions)
         risk_labels = (df['diabetes'] + df['hypertension'] + df['heart_disease'] >= 2).astype(int)
-        self.risk_model = XGBClassifier(random_state=42)
-        self.risk_model.fit(X_scaled, risk_labels)
+        risk_model = XGBClassifier(random_state=42)
+        risk_model.fit(X_scaled, risk_labels)
         
-        # Save models
-        joblib.dump(self.treatment_model, 'treatment_model.pkl')
-        joblib.dump(self.risk_model, 'risk_model.pkl')
-        joblib.dump(self.scaler, 'scaler.pkl')
-        
-        print("Models trained and saved successfully!")
+        self.bundle = {
+            'version': new_version(),
+            'trained_at': datetime.now(timezone.utc).isoformat(),
+            'samples': len(df),
+            'feature_cols': list(FEATURE_COLS),
+            'treatment_model': treatment_model,
+            'risk_model': risk_model,
+            'scaler': scaler,
+            'label_encoders': {'gender': le_gender, 'treatment': le_treatment}
+        }
+        return self.bundle
     
-    def load_models(self):
-        """Load pre-trained models"""
-        try:
-            self.treatment_model = joblib.load('treatment_model.pkl')
-            self.risk_model = joblib.load('risk_model.pkl')
-            self.scaler = joblib.load('scaler.pkl')
-            return True
-        except:
-            return False
+    def save_models(self, model_dir=None, activate=True):
+        """Save the trained bundle as a new version; returns its path"""
+        if self.bundle is None:
+            raise ModelNotTrained("Nothing to save; call train_models() first")
+        return save_bundle(self.bundle, model_dir, activate)
     
-    def predict_treatment(self, patient_data):
-        """Predict best treatment for patient"""
-        if not self.treatment_model:
-            if not self.load_models():
-                self.train_models()
-        
-        # Prepare patient data
-        features = [
+    def load_models(self, model_dir=None, version=None):
+        """Load the current (or given) model bundle; returns its version"""
+        self.bundle = load_bundle(model_dir, version, FEATURE_COLS)
+        return self.bundle['version']
+    
+    def reload(self, model_dir=None):
+        """Swap in the bundle CURRENT points at if it changed; returns (previous, current) versions"""
+        previous = self.version
+        if current_version(model_dir) != previous:
+            self.load_models(model_dir)
+        return previous, self.version
+    
+    def _loaded(self):
+        """(bundle, compiled engine or None) of the loaded version"""
+        bundle, engine = self._active
+        if bundle is None:
+            raise ModelNotTrained("Healthcare models are not loaded; run python train_models.py")
+        return bundle, engine
+    
+    @staticmethod
+    def patient_data_from_profile(profile):
+        """Model inputs from a frontend health profile (age, gender, medicalHistory, lifestyle)"""
+        history = (profile.get('medicalHistory') or '').lower()
+        lifestyle = profile.get('lifestyle') or {}
+        return {
+            'age': int(profile.get('age', 30)) if profile.get('age') else 30,
+            'gender': profile.get('gender', 'male'),
+            'bmi': 25,
+            'bp_systolic': 140 if 'hypertension' in history else 120,
+            'glucose': 130 if 'diabetes' in history else 100,
+            'diabetes': 'diabetes' in history,
+            'hypertension': 'hypertension' in history,
+            'heart_disease': 'heart' in history,
+            'smoking': lifestyle.get('smoking', False),
+            'alcohol': lifestyle.get('alcohol', False)
+        }
+    
+    def patient_features(self, patient_data):
+        """Feature row in FEATURE_COLS order"""
+        return [
             patient_data.get('age', 30),
             1 if patient_data.get('gender') == 'male' else 0,
             patient_data.get('bmi', 25),
@@ -136,47 +222,81 @@ class PersonalizedHealthcareAI:
             1 if patient_data.get('smoking', False) else 0,
             1 if patient_data.get('alcohol', False) else 0
         ]
-        
-        features_scaled = self.scaler.transform([features])
-        prediction = self.treatment_model.predict(features_scaled)[0]
-        confidence = np.max(self.treatment_model.predict_proba(features_scaled))
-        
-        treatment_name = self.label_encoders['treatment'].inverse_transform([prediction])[0]
-        
+    
+    def _scaled_features(self, bundle, patients):
+        """One scaled feature matrix for all patients"""
+        X = np.array([self.patient_features(p) for p in patients], dtype=float)
+        return bundle['scaler'].transform(X)
+    
+    def _treatment_result(self, bundle, patient_data, encoded, confidence):
+        treatment_name = bundle['label_encoders']['treatment'].classes_[encoded]
         return {
             'treatment': treatment_name,
             'confidence': float(confidence),
             'explanation': self.get_treatment_explanation(patient_data, treatment_name)
         }
     
-    def predict_risk(self, patient_data):
-        """Predict disease risk for patient"""
-        if not self.risk_model:
-            if not self.load_models():
-                self.train_models()
-        
-        features = [
-            patient_data.get('age', 30),
-            1 if patient_data.get('gender') == 'male' else 0,
-            patient_data.get('bmi', 25),
-            patient_data.get('bp_systolic', 120),
-            patient_data.get('glucose', 100),
-            1 if patient_data.get('diabetes', False) else 0,
-            1 if patient_data.get('hypertension', False) else 0,
-            1 if patient_data.get('heart_disease', False) else 0,
-            1 if patient_data.get('smoking', False) else 0,
-            1 if patient_data.get('alcohol', False) else 0
-        ]
-        
-        features_scaled = self.scaler.transform([features])
-        risk_prob = self.risk_model.predict_proba(features_scaled)[0][1]
-        
+    def _risk_result(self, patient_data, risk_prob):
         return {
             'risk_score': float(risk_prob),
             'risk_level': 'High' if risk_prob > 0.7 else 'Medium' if risk_prob > 0.4 else 'Low',
             'risk_factors': self.identify_risk_factors(patient_data)
         }
     
+    def _predict_row(self, bundle, engine, patient_data):
+        """(encoded treatment, confidence, risk probability), memoized per model version and feature row"""
+        features = self.patient_features(patient_data)
+        key = (bundle['version'],) + tuple(float(f) for f in features)
+        
+        def compute():
+            if engine is not None:
+                return engine.predict(features)
+            X = self._scaled_features(bundle, [patient_data])
+            probabilities = bundle['treatment_model'].predict_proba(X)[0]
+            return (bundle['treatment_model'].classes_[np.argmax(probabilities)], float(np.max(probabilities)),
+                    float(bundle['risk_model'].predict_proba(X)[0][1]))
+        
+        return self.prediction_cache.get(key, compute)
+    
+    def predict_treatment(self, patient_data):
+        """Predict best treatment for patient"""
+        bundle, engine = self._loaded()
+        encoded, confidence, _ = self._predict_row(bundle, engine, patient_data)
+        return self._treatment_result(bundle, patient_data, encoded, confidence)
+    
+    def predict_risk(self, patient_data):
+        """Predict disease risk for patient"""
+        bundle, engine = self._loaded()
+        _, _, risk_prob = self._predict_row(bundle, engine, patient_data)
+        return self._risk_result(patient_data, risk_prob)
+    
+    def predict_batch(self, patients):
+        """Treatment and risk predictions for many patients.
+
+        Builds and scales one feature matrix and runs each model once over
+        the whole batch; returns [{'treatment': ..., 'risk': ...}] in the
+        order of patients, each part shaped like predict_treatment/predict_risk.
+        A single patient goes through the compiled engine and prediction
+        cache instead.
+        """
+        bundle, engine = self._loaded()
+        if not patients:
+            return []
+        if len(patients) == 1:
+            encoded, confidence, risk_prob = self._predict_row(bundle, engine, patients[0])
+            return [{'treatment': self._treatment_result(bundle, patients[0], encoded, confidence),
+                     'risk': self._risk_result(patients[0], risk_prob)}]
+        
+        X = self._scaled_features(bundle, patients)
+        model = bundle['treatment_model']
+        probabilities = model.predict_proba(X)
+        encoded = model.classes_[probabilities.argmax(axis=1)]
+        risk_probs = bundle['risk_model'].predict_proba(X)[:, 1]
+        return [{
+            'treatment': self._treatment_result(bundle, patient, code, confidence),
+            'risk': self._risk_result(patient, risk_prob)
+        } for patient, code, confidence, risk_prob in zip(patients, encoded, probabilities.max(axis=1), risk_probs)]
+    
     def get_treatment_explanation(self, patient_data, treatment):
         """Provide explanation for treatment recommendation"""
         explanations = {
@@ -0,0 +1,93 @@
+import json
+import os
+from datetime import datetime, timezone
+
+# Trained healthcare models live here as versioned bundles, one file per
+# training run, plus a CURRENT pointer naming the live one. Both are written
+# to a temp file and renamed into place, so a reader always sees either the
+# old or the new version, never a half-written one.
+MODEL_DIR = os.environ.get('HEALTHCARE_MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+POINTER_NAME = 'CURRENT'
+BUNDLE_FORMAT = 1
+
+
+class ModelNotTrained(Exception):
+    """Raised when no usable model bundle has been trained yet"""
+
+
+def new_version():
+    return datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+
+
+def bundle_path(version, model_dir=None):
+    return os.path.join(model_dir or MODEL_DIR, f"healthcare-{version}.joblib")
+
+
+def _replace(path, write):
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def save_bundle(bundle, model_dir=None, activate=True):
+    """Write a bundle under its version and (by default) point CURRENT at it"""
+    import joblib
+    model_dir = model_dir or MODEL_DIR
+    os.makedirs(model_dir, exist_ok=True)
+    bundle = dict(bundle, format=BUNDLE_FORMAT)
+    path = bundle_path(bundle['version'], model_dir)
+    _replace(path, lambda tmp: joblib.dump(bundle, tmp, compress=3))
+    if activate:
+        activate_version(bundle['version'], model_dir)
+    return path
+
+
+def activate_version(version, model_dir=None):
+    """Point CURRENT at an already saved version (also used to roll back)"""
+    model_dir = model_dir or MODEL_DIR
+    if not os.path.exists(bundle_path(version, model_dir)):
+        raise ModelNotTrained(f"No model bundle {version} in {model_dir}")
+
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump({'version': version}, f)
+
+    _replace(os.path.join(model_dir, POINTER_NAME), write)
+
+
+def current_version(model_dir=None):
+    try:
+        with open(os.path.join(model_dir or MODEL_DIR, POINTER_NAME)) as f:
+            return json.load(f)['version']
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(model_dir=None):
+    model_dir = model_dir or MODEL_DIR
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(name[len('healthcare-'):-len('.joblib')] for name in os.listdir(model_dir)
+                  if name.startswith('healthcare-') and name.endswith('.joblib'))
+
+
+def load_bundle(model_dir=None, version=None, feature_cols=None):
+    """Load the given (default: current) bundle, checking its format and feature schema"""
+    import joblib
+    model_dir = model_dir or MODEL_DIR
+    version = version or current_version(model_dir)
+    if version is None:
+        raise ModelNotTrained(f"No trained models in {model_dir}; run python train_models.py")
+    try:
+        bundle = joblib.load(bundle_path(version, model_dir))
+    except FileNotFoundError:
+        raise ModelNotTrained(f"Model bundle {version} is missing from {model_dir}")
+    if bundle.get('format') != BUNDLE_FORMAT:
+        raise ModelNotTrained(f"Model bundle {version} has format {bundle.get('format')}, expected {BUNDLE_FORMAT}")
+    if feature_cols is not None and list(bundle['feature_cols']) != list(feature_cols):
+        raise ModelNotTrained(f"Model bundle {version} was trained on features {bundle['feature_cols']}")
+    return bundle
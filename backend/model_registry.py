@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+class LazyModel:
+    """Stands in for an AI component that is built on first use.
+
+    Attribute access is forwarded to the real object, building it on the
+    first call (once, even under concurrent requests), so route code can use
+    a LazyModel exactly like the component itself.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+        self.state = 'not_loaded'
+        self.error = None
+        self.load_seconds = None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self.state = 'loading'
+                    start = time.perf_counter()
+                    try:
+                        instance = self._factory()
+                    except Exception as e:
+                        self.state = 'failed'
+                        self.error = str(e)
+                        raise
+                    self.load_seconds = round(time.perf_counter() - start, 3)
+                    self.error = None
+                    self.state = 'ready'
+                    self._instance = instance
+        return self._instance
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def status(self):
+        return {'state': self.state, 'load_seconds': self.load_seconds, 'error': self.error}
+
+    def __getattr__(self, name):
+        # Only reached for attributes LazyModel itself does not define
+        return getattr(self.get(), name)
+
+
+class ModelRegistry:
+    """The app's lazily loaded AI components, with optional background warm-up"""
+
+    def __init__(self):
+        self.models = {}
+        self._warm_up_thread = None
+
+    def register(self, name, factory):
+        model = LazyModel(name, factory)
+        self.models[name] = model
+        return model
+
+    def warm_up(self, names=None):
+        """Load the named (default: all) models one by one on a daemon thread"""
+        names = list(names or self.models)
+
+        def run():
+            for name in names:
+                try:
+                    self.models[name].get()
+                    print(f"🔥 Warmed up {name} model in {self.models[name].load_seconds}s")
+                except Exception as e:
+                    print(f"⚠️ Warm-up of {name} model failed: {str(e)}")
+
+        self._warm_up_thread = threading.Thread(target=run, name='model-warm-up', daemon=True)
+        self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def status(self):
+        return {name: model.status() for name, model in self.models.items()}
+
+    @property
+    def ready(self):
+        return all(model.ready for model in self.models.values())
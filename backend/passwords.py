@@ -0,0 +1,116 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Default cost for new hashes (~16 MB and ~80 ms per hash on one core).
+# Stored hashes carry their own parameters, so raising these only affects
+# new hashes; older ones are upgraded on the next successful login.
+SCRYPT_N = int(os.environ.get('PASSWORD_SCRYPT_N', 2 ** 14))
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p, length):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 2 ** 20, dklen=length)
+
+
+def hash_password(password, n=None):
+    """Salted scrypt hash encoded as scrypt$n$r$p$salt$hash"""
+    n = n or SCRYPT_N
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, n, SCRYPT_R, SCRYPT_P, 32)
+    return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash of any supported scheme.
+
+    Besides scrypt hashes this accepts pbkdf2_sha256$iterations$salt$hash and
+    the legacy unsalted SHA-256 hex digests from before the KDF migration.
+    """
+    if not stored:
+        return False
+    try:
+        if stored.startswith('scrypt$'):
+            _, n, r, p, salt, digest = stored.split('$')
+            expected = _unb64(digest)
+            actual = _scrypt(password, _unb64(salt), int(n), int(r), int(p), len(expected))
+        elif stored.startswith('pbkdf2_sha256$'):
+            _, iterations, salt, digest = stored.split('$')
+            expected = _unb64(digest)
+            actual = hashlib.pbkdf2_hmac('sha256', password.encode(), _unb64(salt), int(iterations), len(expected))
+        else:
+            expected = stored.encode()
+            actual = hashlib.sha256(password.encode()).hexdigest().encode()
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored):
+    """True for legacy/PBKDF2 hashes and scrypt hashes below the current cost"""
+    if not stored.startswith('scrypt$'):
+        return True
+    _, n, r, p, _, _ = stored.split('$')
+    return (int(n), int(r), int(p)) < (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+class HasherBusy(Exception):
+    """Raised when too many password operations are already queued"""
+
+
+class PasswordHasher:
+    """Bounded pool for the CPU-heavy password operations.
+
+    At most max_workers hashes run at once (hashlib's KDFs release the GIL,
+    so threads give real parallelism) and at most max_pending may wait, so a
+    burst of logins cannot monopolize the CPU needed by the analysis routes;
+    callers past that limit get HasherBusy immediately.
+    """
+
+    def __init__(self, max_workers=None, max_pending=32):
+        max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        # Verified against when the email is unknown, so a miss costs as
+        # much as a wrong password and does not reveal which emails exist
+        self._dummy_hash = None
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        """(ok, new_hash); new_hash is set when a verified hash should be upgraded"""
+        return self._run(self._verify, password, stored)
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+    def _verify(self, password, stored):
+        if not stored and self._dummy_hash is None:
+            self._dummy_hash = hash_password(os.urandom(16).hex())
+        if not verify_password(password, stored or self._dummy_hash) or not stored:
+            return False, None
+        return True, hash_password(password) if needs_rehash(stored) else None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Too many password operations in progress')
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
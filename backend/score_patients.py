@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Population-wide risk scoring for a nightly job
+Reads health profiles as JSON lines ({"patient_id": ..., "age": ...,
+"gender": ..., "medicalHistory": ..., "lifestyle": {...}}) and writes one
+JSON line of treatment and risk predictions per profile, scoring them in
+batches with PersonalizedHealthcareAI.predict_batch.
+
+    python score_patients.py profiles.jsonl > scores.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from ml_models import healthcare_ai
+
+
+def read_batches(lines, batch_size):
+    batch = []
+    for line in lines:
+        if line.strip():
+            batch.append(json.loads(line))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('profiles', nargs='?', default='-', help='JSON lines file (default: stdin)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--model-dir', default=None)
+    args = parser.parse_args()
+
+    version = healthcare_ai.load_models(args.model_dir)
+    source = sys.stdin if args.profiles == '-' else open(args.profiles)
+    scored = 0
+    start = time.perf_counter()
+    with source:
+        for batch in read_batches(source, args.batch_size):
+            patients = [healthcare_ai.patient_data_from_profile(p) for p in batch]
+            for profile, prediction in zip(batch, healthcare_ai.predict_batch(patients)):
+                print(json.dumps(dict(prediction, patient_id=profile.get('patient_id'), model_version=version)))
+            scored += len(batch)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {scored} patients with models {version} in {elapsed:.1f}s "
+          f"({scored / max(elapsed, 1e-9):.0f} patients/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+"""
+Request handling shared by the Flask (app.py) and FastAPI (main.py) servers
+
+Each function takes already-parsed request data plus the caller's session
+mapping (Flask's session or Starlette's request.session) and returns the JSON
+body of the response; errors are raised as ServiceError carrying the HTTP
+status. The servers only parse requests, pick the success status and, in
+main.py, decide which executor a call runs on.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+
+import database
+from database import (PoolExhausted, KEYSET_START, encode_cursor, decode_cursor, PATIENT_RECORDS_SQL,
+                      DOCTOR_RECORDS_SQL, DOCTOR_PATIENTS_SQL, ADMIN_USERS_SQL, PATIENT_APPOINTMENTS_SQL)
+from stats import TTLCache, read_admin_stats
+from passwords import PasswordHasher, HasherBusy
+from image_utils import RENDER_MODES
+from video_analysis import VideoAnalysis
+from inference_pool import InferencePool
+from model_registry import ModelRegistry
+from model_artifacts import ModelNotTrained
+
+
+class ServiceError(Exception):
+    """Returned to the client as {'error': message} with the given status"""
+
+    def __init__(self, message, status=400, headers=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.headers = headers or {}
+
+
+@contextmanager
+def db():
+    """database.db(), with a pool that stays exhausted reported as a 503"""
+    with ExitStack() as stack:
+        try:
+            conn = stack.enter_context(database.db())
+        except PoolExhausted as e:
+            raise ServiceError(str(e), 503, {'Retry-After': '1'})
+        yield conn
+
+
+def require_user(session, *roles):
+    """The session's user id; ServiceError 401 unless logged in (with one of roles, if given)"""
+    if 'user_id' not in session or (roles and session['role'] not in roles):
+        raise ServiceError('Unauthorized', 401)
+    return session['user_id']
+
+
+# Bounded pool for password hashing, so login bursts cannot starve the analysis routes
+password_hasher = PasswordHasher()
+
+def load_admin_stats():
+    with db() as conn:
+        return read_admin_stats(conn)
+
+# Dashboard refreshes within the TTL share one read of the counter tables;
+# this worker's own writes invalidate it immediately
+admin_stats_cache = TTLCache(load_admin_stats, ttl=5.0)
+
+# Auth
+
+def register(data):
+    email = data.get('email')
+    password = data.get('password')
+    role = data.get('role', 'patient')
+    name = data.get('name')
+    phone = data.get('phone')
+
+    if not all([email, password, name]):
+        raise ServiceError('Missing required fields')
+
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusy as e:
+        raise ServiceError(str(e), 503, {'Retry-After': '1'})
+
+    try:
+        with db() as conn:
+            conn.execute('''
+                INSERT INTO users (email, password, role, name, phone)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (email, hashed_password, role, name, phone))
+    except sqlite3.IntegrityError:
+        raise ServiceError('Email already exists')
+    admin_stats_cache.invalidate()
+    return {'message': 'User registered successfully'}
+
+def login(session, data):
+    email = data.get('email')
+    password = data.get('password')
+
+    if not all([email, password]):
+        raise ServiceError('Missing email or password')
+
+    with db() as conn:
+        user = conn.execute('SELECT id, email, role, name, password FROM users WHERE email = ?', (email,)).fetchone()
+
+    # Unknown emails are verified against a dummy hash so they cost the same
+    try:
+        verified, new_hash = password_hasher.verify(password, user[4] if user else None)
+    except HasherBusy as e:
+        raise ServiceError(str(e), 503, {'Retry-After': '1'})
+    if not verified:
+        raise ServiceError('Invalid credentials', 401)
+    if new_hash:
+        # Upgrade legacy or under-cost hashes now that we know the password
+        with db() as conn:
+            conn.execute('UPDATE users SET password = ? WHERE id = ?', (new_hash, user[0]))
+
+    session['user_id'] = user[0]
+    session['role'] = user[2]
+    return {'user': {'id': user[0], 'email': user[1], 'role': user[2], 'name': user[3]}}
+
+def logout(session):
+    session.clear()
+    return {'message': 'Logged out successfully'}
+
+def auth_status(session):
+    if 'user_id' in session:
+        with db() as conn:
+            user = conn.execute('SELECT id, email, role, name FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        if user:
+            return {'user': {'id': user[0], 'email': user[1], 'role': user[2], 'name': user[3]}}
+    raise ServiceError('Not authenticated', 401)
+
+# Keyset-paginated listings
+
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_ROWS = 500
+
+# role: who may list it; user_param: whether the SQL takes the caller's id
+Listing = namedtuple('Listing', 'role sql to_json row_key user_param')
+
+LISTINGS = {
+    'patient_records': Listing('patient', PATIENT_RECORDS_SQL, lambda r: {
+        'id': r[0],
+        'record_type': r[3],
+        'title': r[4],
+        'description': r[5],
+        'file_path': r[6],
+        'ai_analysis': r[7],
+        'status': r[8],
+        'doctor_name': r[10] or 'Pending Review',
+        'created_at': r[9]
+    }, lambda r: (r[9], r[0]), True),
+    'doctor_patients': Listing('doctor', DOCTOR_PATIENTS_SQL, lambda p: {
+        'id': p[0],
+        'name': p[1],
+        'email': p[2],
+        'phone': p[3]
+    }, lambda p: (p[4], p[0]), False),
+    'doctor_records': Listing('doctor', DOCTOR_RECORDS_SQL, lambda r: {
+        'id': r[0],
+        'patient_name': r[10],
+        'record_type': r[3],
+        'title': r[4],
+        'description': r[5],
+        'ai_analysis': r[7],
+        'status': r[8],
+        'created_at': r[9]
+    }, lambda r: (r[9], r[0]), True),
+    'admin_users': Listing('admin', ADMIN_USERS_SQL, lambda u: {
+        'id': u[0],
+        'email': u[1],
+        'role': u[2],
+        'name': u[3],
+        'phone': u[4],
+        'created_at': u[5]
+    }, lambda u: (u[5], u[0]), False),
+}
+
+def open_listing(name, session, limit=None, after=None):
+    """Check access to a listing and parse ?limit=&after=; returns (listing, params, limit or None)"""
+    listing = LISTINGS[name]
+    user_id = require_user(session, listing.role)
+    try:
+        if limit is not None:
+            limit = int(limit)
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after_created, after_id = decode_cursor(after) if after else KEYSET_START
+    except ValueError as e:
+        raise ServiceError(str(e))
+    params = {'after_created': after_created, 'after_id': after_id}
+    if listing.user_param:
+        params['user_id'] = user_id
+    return listing, params, limit
+
+def list_page(listing, params, limit):
+    """(rows as JSON, cursor of the next page or None) for one page of a listing"""
+    with db() as conn:
+        rows = conn.execute(listing.sql, dict(params, limit=limit + 1)).fetchall()
+    next_cursor = encode_cursor(*listing.row_key(rows[limit - 1])) if len(rows) > limit else None
+    return [listing.to_json(r) for r in rows[:limit]], next_cursor
+
+def read_chunk(listing, params):
+    with db() as conn:
+        return conn.execute(listing.sql, dict(params, limit=STREAM_CHUNK_ROWS)).fetchall()
+
+def stream_list(listing, params, dumps=json.dumps):
+    """The whole listing as a JSON array, generated STREAM_CHUNK_ROWS rows per chunk.
+
+    Each chunk is a keyset page read on a pooled connection that is released
+    before the chunk is sent, so a slow client never holds a connection and
+    memory stays flat however many rows match. The first chunk is read
+    before returning, so an exhausted pool is a 503 rather than a broken stream.
+    """
+    return stream_chunks(listing, params, read_chunk(listing, params), dumps)
+
+def stream_chunks(listing, params, rows, dumps):
+    yield '['
+    separator = ''
+    while rows:
+        yield separator + dumps([listing.to_json(r) for r in rows], separators=(',', ':'))[1:-1]
+        separator = ','
+        if len(rows) < STREAM_CHUNK_ROWS:
+            break
+        after_created, after_id = listing.row_key(rows[-1])
+        params = dict(params, after_created=after_created, after_id=after_id)
+        rows = read_chunk(listing, params)
+    yield ']'
+
+# Records, appointments and prescriptions
+
+def create_record(session, form, upload=None):
+    """Store a medical record; upload is an optional (filename, readable file) pair"""
+    user_id = require_user(session, 'patient')
+    record_type = form.get('record_type')
+    title = form.get('title')
+    description = form.get('description')
+
+    file_path = None
+    if upload is not None and upload[0]:
+        filename, stream = upload
+        # Create uploads directory if it doesn't exist
+        upload_dir = 'uploads'
+        if not os.path.exists(upload_dir):
+            os.makedirs(upload_dir)
+
+        # Save file with unique name
+        file_path = os.path.join(upload_dir, f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}")
+        with open(file_path, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+
+    # Enhanced AI analysis based on file type
+    ai_analysis = f"AI Analysis: Based on the {record_type}"
+    if file_path:
+        if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
+            ai_analysis += " with uploaded image, visual analysis suggests normal patterns. "
+        elif file_path.lower().endswith('.pdf'):
+            ai_analysis += " with uploaded document, text analysis indicates standard results. "
+    ai_analysis += "Preliminary findings suggest routine monitoring. Professional review recommended."
+
+    with db() as conn:
+        conn.execute('''
+            INSERT INTO medical_records (patient_id, record_type, title, description, file_path, ai_analysis)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (user_id, record_type, title, description, file_path, ai_analysis))
+    admin_stats_cache.invalidate()
+    return {'message': 'Record uploaded successfully', 'ai_analysis': ai_analysis}
+
+def patient_appointments(session):
+    user_id = require_user(session, 'patient')
+    with db() as conn:
+        appointments = conn.execute(PATIENT_APPOINTMENTS_SQL, (user_id,)).fetchall()
+    return [{
+        'id': a[0],
+        'doctor_name': a[7],
+        'appointment_date': a[3],
+        'status': a[4],
+        'notes': a[5]
+    } for a in appointments]
+
+def create_appointment(session, data):
+    user_id = require_user(session, 'patient')
+    with db() as conn:
+        conn.execute('''
+            INSERT INTO appointments (patient_id, doctor_id, appointment_date)
+            VALUES (?, ?, ?)
+        ''', (user_id, data.get('doctor_id'), data.get('appointment_date')))
+    admin_stats_cache.invalidate()
+    return {'message': 'Appointment scheduled successfully'}
+
+def verify_record(session, data):
+    user_id = require_user(session, 'doctor')
+    with db() as conn:
+        conn.execute('''
+            UPDATE medical_records
+            SET doctor_id = ?, status = 'verified'
+            WHERE id = ?
+        ''', (user_id, data.get('record_id')))
+    admin_stats_cache.invalidate()
+    return {'message': 'Record verified successfully'}
+
+def add_prescription(session, data):
+    user_id = require_user(session, 'doctor')
+    with db() as conn:
+        conn.execute('''
+            INSERT INTO prescriptions (patient_id, doctor_id, medication, dosage, instructions)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (data.get('patient_id'), user_id, data.get('medication'),
+              data.get('dosage'), data.get('instructions')))
+    return {'message': 'Prescription added successfully'}
+
+def admin_stats(session):
+    require_user(session, 'admin')
+    return admin_stats_cache.get()
+
+def doctors():
+    with db() as conn:
+        rows = conn.execute("SELECT id, name FROM users WHERE role = 'doctor'").fetchall()
+    return [{'id': d[0], 'name': d[1]} for d in rows]
+
+# AI components are built on first use (TensorFlow, MediaPipe and the
+# sklearn/xgboost stack take seconds to import), so the auth and records
+# routes serve immediately after startup. MODEL_WARMUP=1 loads them on a
+# background thread instead of on the first request that needs each one.
+def load_emotion_ai():
+    from emotion_ai import emotion_ai
+    return emotion_ai
+
+def load_healthcare_ai():
+    # Trained offline by train_models.py; never trained inside a request
+    from ml_models import healthcare_ai
+    healthcare_ai.load_models()
+    return healthcare_ai
+
+def load_exercise_analyzer():
+    from exercise_analyzer import ExerciseAnalyzer
+    return ExerciseAnalyzer()
+
+models = ModelRegistry()
+emotion_ai = models.register('emotion', load_emotion_ai)
+healthcare_ai = models.register('healthcare', load_healthcare_ai)
+exercise_analyzer = models.register('exercise', load_exercise_analyzer)
+
+def start_model_warm_up():
+    if os.environ.get('MODEL_WARMUP') == '1':
+        models.warm_up()
+
+# With INFERENCE_WORKERS > 0, frame analysis runs in a pool of model worker
+# processes instead of inline in the request thread
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', '0'))
+inference_pool = InferencePool(INFERENCE_WORKERS) if INFERENCE_WORKERS > 0 else None
+exercise_inference = inference_pool or exercise_analyzer
+face_inference = inference_pool or emotion_ai
+
+# Mental health and exercise analysis
+
+def exercise_session_id(data, session, remote_addr):
+    """Key per-client exercise state by stream id, falling back to the logged-in user"""
+    return data.get('stream_id') or session.get('user_id') or remote_addr
+
+def exercise_render_options(data):
+    """Parse the render / jpeg_quality / jpeg_scale options of an exercise request"""
+    render = data.get('render', 'jpeg')
+    if render not in RENDER_MODES:
+        raise ValueError(f"render must be one of {', '.join(RENDER_MODES)}")
+    return {
+        'render': render,
+        'jpeg_quality': min(max(int(data.get('jpeg_quality', 95)), 1), 100),
+        'jpeg_scale': min(max(float(data.get('jpeg_scale', 1.0)), 0.1), 1.0)
+    }
+
+def analyze_text(session, data):
+    require_user(session)
+    return emotion_ai.analyze_text_sentiment(data.get('text', ''))
+
+MAX_BATCH_TEXTS = 10000
+
+def analyze_text_batch(session, data):
+    """Sentiment for many texts (e.g. journal entries) in one request, in input order"""
+    require_user(session)
+    texts = (data or {}).get('texts')
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise ServiceError('texts must be a list of strings')
+    if len(texts) > MAX_BATCH_TEXTS:
+        raise ServiceError(f"At most {MAX_BATCH_TEXTS} texts per batch")
+    return emotion_ai.analyze_text_batch(texts)
+
+# Content types that mean headerless 16-bit PCM; anything else is sniffed as WAV
+PCM_CONTENT_TYPES = ('audio/l16', 'audio/pcm', 'application/octet-stream')
+
+def voice_audio_options(params, content_type=''):
+    """Parse format / sample_rate / channels for a voice upload or stream"""
+    audio_format = params.get('format') or ('pcm' if content_type.lower() in PCM_CONTENT_TYPES else None)
+    try:
+        sample_rate = int(params.get('sample_rate') or 16000)
+        channels = int(params.get('channels') or 1)
+    except ValueError:
+        raise ServiceError('sample_rate and channels must be integers')
+    if not 8000 <= sample_rate <= 192000 or not 1 <= channels <= 8:
+        raise ServiceError('sample_rate must be 8000-192000 and channels 1-8')
+    return {'audio_format': audio_format, 'sample_rate': sample_rate, 'channels': channels}
+
+def analyze_voice(session, audio=None, options=None):
+    """Voice emotion over an uploaded recording (a binary stream), or the mock reading without one"""
+    require_user(session)
+    if audio is None:
+        return emotion_ai.analyze_voice_features()
+    return emotion_ai.analyze_voice_features(audio, **options)
+
+def open_voice_stream(options):
+    return emotion_ai.open_voice_stream(options['sample_rate'], options['channels'])
+
+def stream_control_message(text):
+    """A websocket text message parsed as a JSON object; ServiceError if it is not one"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        raise ServiceError('Text messages must be JSON objects')
+    return data
+
+def analyze_face(session, image_data, session_id):
+    require_user(session)
+    return face_inference.analyze_face_image(image_data, session_id)
+
+def analyze_exercise(image_data, data, session_id):
+    try:
+        render_options = exercise_render_options(data)
+    except ValueError as e:
+        raise ServiceError(str(e))
+    return exercise_inference.analyze_exercise(image_data, data.get('exercise_type', 'pushup'), session_id,
+                                               **render_options)
+
+def reset_exercise(data, session_id):
+    exercise_type = data.get('exercise_type', 'pushup')
+    exercise_inference.reset_exercise(exercise_type, session_id)
+    return {'message': f'{exercise_type} counter reset'}
+
+def exercise_stats(session_id):
+    return exercise_inference.get_exercise_stats(session_id)
+
+def open_video_analysis(session, filename, stream, values):
+    """Save an uploaded workout video and return its timeline as JSON lines
+
+    One line per analyzed frame, then a final {"summary": ...} line with rep
+    counts and throughput. The generator removes the saved video when done.
+    """
+    require_user(session)
+    fd, video_path = tempfile.mkstemp(suffix=os.path.splitext(filename or '')[1])
+    with os.fdopen(fd, 'wb') as f:
+        shutil.copyfileobj(stream, f)
+
+    try:
+        analysis = VideoAnalysis(exercise_analyzer, video_path, values.get('exercise_type', 'pushup'),
+                                 int(values.get('stride', 1)))
+    except ValueError as e:
+        os.remove(video_path)
+        raise ServiceError(str(e))
+
+    def generate():
+        try:
+            for entry in analysis:
+                yield json.dumps(entry) + '\n'
+            yield json.dumps({'summary': analysis.summary}) + '\n'
+        except ValueError:
+            yield json.dumps({'error': 'Could not read uploaded video'}) + '\n'
+        finally:
+            os.remove(video_path)
+
+    return generate()
+
+# Personalized recommendations and model management
+
+MAX_BATCH_PROFILES = 5000
+
+def personalized_recommendations(session, data):
+    require_user(session)
+    profile = data.get('profile', {})
+
+    # Any use of healthcare_ai loads the model bundle, which fails without one
+    try:
+        # Prepare patient data for ML models
+        patient_data = healthcare_ai.patient_data_from_profile(profile)
+
+        # Get AI-powered recommendations (both models in one pass)
+        prediction = healthcare_ai.predict_batch([patient_data])[0]
+        diet_recs = healthcare_ai.get_diet_recommendations(patient_data)
+        exercise_recs = healthcare_ai.get_exercise_recommendations(patient_data)
+    except ModelNotTrained as e:
+        raise ServiceError(str(e), 503)
+    treatment_rec = prediction['treatment']
+    risk_assessment = prediction['risk']
+
+    return {
+        'treatments': [
+            f"🎯 AI Recommended: {treatment_rec['treatment'].title()}",
+            f"📊 Confidence: {treatment_rec['confidence']:.1%}",
+            f"💡 {treatment_rec['explanation']}"
+        ],
+        'medications': [
+            "🔍 Alternative safer options available if interactions occur",
+            "📋 Regular monitoring recommended for current medications"
+        ],
+        'diet': [f"🥗 {rec}" for rec in diet_recs],
+        'exercise': [f"🏃 {rec}" for rec in exercise_recs],
+        'risks': [
+            f"⚠️ Risk Level: {risk_assessment['risk_level']} ({risk_assessment['risk_score']:.1%})"
+        ] + [f"🚨 {factor}" for factor in risk_assessment['risk_factors']]
+    }
+
+def batch_recommendations(session, data):
+    """Treatment and risk predictions for many profiles, each model run once over the batch"""
+    require_user(session, 'doctor', 'admin')
+    profiles = (data or {}).get('profiles')
+    if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+        raise ServiceError('profiles must be a list of profile objects')
+    if len(profiles) > MAX_BATCH_PROFILES:
+        raise ServiceError(f"At most {MAX_BATCH_PROFILES} profiles per batch")
+
+    try:
+        patients = [healthcare_ai.patient_data_from_profile(p) for p in profiles]
+        predictions = healthcare_ai.predict_batch(patients)
+    except ModelNotTrained as e:
+        raise ServiceError(str(e), 503)
+    except (TypeError, ValueError) as e:
+        raise ServiceError(f"Invalid profile: {str(e)}")
+
+    return [dict(prediction, patient_id=profile.get('patient_id'))
+            for profile, prediction in zip(profiles, predictions)]
+
+def reload_models(session):
+    """Swap in the model bundle train_models.py last made current"""
+    require_user(session, 'admin')
+    try:
+        previous, current = healthcare_ai.reload()
+    except ModelNotTrained as e:
+        raise ServiceError(str(e), 503)
+    return {'previous_version': previous, 'version': current}
+
+def admin_models(session):
+    """Model load states plus the loaded healthcare version and its prediction cache metrics"""
+    require_user(session, 'admin')
+    healthcare = None
+    if healthcare_ai.ready:
+        healthcare = {'version': healthcare_ai.version, 'prediction_cache': healthcare_ai.prediction_cache.stats()}
+    return {'models': models.status(), 'healthcare': healthcare}
+
+def readiness():
+    """Per-model load state; serve with 200 once every AI component is loaded, 503 before"""
+    return {'ready': models.ready, 'models': models.status()}
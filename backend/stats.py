@@ -0,0 +1,60 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class TTLCache:
+    """Caches the result of loader() for ttl seconds.
+
+    Concurrent callers that find the value expired wait for one reload
+    instead of each running the loader.
+    """
+
+    def __init__(self, loader, ttl=5.0):
+        self.loader = loader
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._value = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._expires:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            self._value = self.loader()
+            self._expires = now + self.ttl
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._expires = 0.0
+
+
+def read_admin_stats(conn, days=30):
+    """Admin dashboard statistics from the trigger-maintained counter tables.
+
+    Reads a handful of primary-key rows regardless of table sizes: the user,
+    record and appointment totals, the pending-review backlog and the number
+    of records created on each of the last `days` days (UTC, oldest first).
+    """
+    counters = dict(conn.execute('SELECT name, value FROM stats_counters'))
+    today = datetime.now(timezone.utc).date()
+    first_day = today - timedelta(days=days - 1)
+    per_day = dict(conn.execute('SELECT day, records FROM stats_daily_records WHERE day >= ?',
+                                (first_day.isoformat(),)))
+    return {
+        'patients': counters.get('users_patient', 0),
+        'doctors': counters.get('users_doctor', 0),
+        'records': counters.get('records', 0),
+        'appointments': counters.get('appointments', 0),
+        'pending_review': counters.get('records_pending', 0),
+        'records_per_day': [
+            {'day': day, 'records': per_day.get(day, 0)}
+            for day in ((first_day + timedelta(days=i)).isoformat() for i in range(days))
+        ]
+    }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for micro-batched exercise state classification
+"""
+
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from batch_inference import MicroBatchClassifier
+
+
+class CountingClassifier:
+    """Predicts the rounded first feature and records each batch size"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, rows):
+        self.batch_sizes.append(len(rows))
+        return rows[:, 0].astype(int)
+
+
+def test_concurrent_rows_share_a_batch():
+    """Rows from concurrent callers are answered correctly by fewer predict calls"""
+    print("🧪 Testing micro-batching...")
+
+    labels = ['pushups_down', 'pushups_up', 'squats_down', 'squats_up']
+    classifier = CountingClassifier()
+    batcher = MicroBatchClassifier(classifier, labels, max_batch_size=8, max_wait_ms=20)
+
+    results = {}
+    barrier = threading.Barrier(16)
+
+    def worker(i):
+        barrier.wait()
+        row = np.full(21, i % len(labels), dtype=np.float64)
+        results[i] = batcher.predict(row)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {i: labels[i % len(labels)] for i in range(16)}
+    assert sum(classifier.batch_sizes) == 16
+    assert max(classifier.batch_sizes) <= 8
+    assert len(classifier.batch_sizes) < 16, "concurrent rows should be coalesced"
+    assert batcher.rows == 16 and batcher.batches == len(classifier.batch_sizes)
+    print(f"✅ 16 rows answered in {batcher.batches} predict calls")
+
+
+def test_predict_errors_reach_callers():
+    """A failing predict is raised in the calling thread"""
+    print("🧪 Testing micro-batch error propagation...")
+
+    class BrokenClassifier:
+        def predict(self, rows):
+            raise ValueError('bad features')
+
+    batcher = MicroBatchClassifier(BrokenClassifier(), ['a'], max_wait_ms=0)
+    try:
+        batcher.predict(np.zeros(21))
+        raise AssertionError('expected ValueError')
+    except ValueError as e:
+        assert 'bad features' in str(e)
+    batcher.close()
+    print("✅ Errors propagate to callers")
+
+
+if __name__ == "__main__":
+    test_concurrent_rows_share_a_batch()
+    test_predict_errors_reach_callers()
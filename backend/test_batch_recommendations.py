@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for batch healthcare predictions
+Checks predict_batch matches the single-patient predictions row for row, and
+exercises the /api/personalized-recommendations/batch endpoint
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import temp_db  # first: keeps the tracked healthcare.db untouched
+
+import app as app_module
+import services
+from ml_models import PersonalizedHealthcareAI
+from model_registry import LazyModel
+
+PROFILES = [
+    {'patient_id': 1, 'age': 34, 'gender': 'female', 'medicalHistory': '', 'lifestyle': {}},
+    {'patient_id': 2, 'age': 70, 'gender': 'male', 'medicalHistory': 'Diabetes', 'lifestyle': {'smoking': True}},
+    {'patient_id': 3, 'age': 55, 'gender': 'male', 'medicalHistory': 'hypertension, heart failure'},
+    {'patient_id': 4, 'age': 45, 'gender': 'female', 'medicalHistory': 'diabetes and hypertension',
+     'lifestyle': {'alcohol': True}},
+]
+
+
+def test_batch_matches_single_predictions():
+    """Each predict_batch row equals predict_treatment/predict_risk for that patient"""
+    print("🧪 Testing batch vs single predictions...")
+
+    ai = PersonalizedHealthcareAI()
+    ai.load_models()
+    patients = [ai.patient_data_from_profile(p) for p in PROFILES] * 3
+    batch = ai.predict_batch(patients)
+    assert len(batch) == len(patients)
+    for patient, prediction in zip(patients, batch):
+        assert prediction['treatment'] == ai.predict_treatment(patient)
+        # Single rows go through the compiled engine, equal up to float32 rounding
+        risk = ai.predict_risk(patient)
+        assert abs(prediction['risk'].pop('risk_score') - risk.pop('risk_score')) < 1e-6
+        assert prediction['risk'] == risk
+    assert ai.predict_batch([]) == []
+    print(f"✅ {len(batch)} batch predictions match")
+
+
+def test_batch_endpoint():
+    """Doctors get one prediction per profile in order; patients and bad input are rejected"""
+    print("🧪 Testing batch recommendations endpoint...")
+
+    with temp_db():
+        client = app_module.app.test_client()
+        url = '/api/personalized-recommendations/batch'
+        with client.session_transaction() as s:
+            s['user_id'] = 2
+            s['role'] = 'patient'
+        assert client.post(url, json={'profiles': PROFILES}).status_code == 401
+
+        with client.session_transaction() as s:
+            s['role'] = 'doctor'
+        response = client.post(url, json={'profiles': PROFILES})
+        assert response.status_code == 200
+        results = response.get_json()
+        assert [r['patient_id'] for r in results] == [1, 2, 3, 4]
+        ai = PersonalizedHealthcareAI()
+        ai.load_models()
+        expected = ai.predict_batch([ai.patient_data_from_profile(p) for p in PROFILES])
+        assert [{'treatment': r['treatment'], 'risk': r['risk']} for r in results] == expected
+
+        for body in [{}, {'profiles': 'all'}, {'profiles': [1, 2]}, {'profiles': [{'age': 'old'}]},
+                     {'profiles': [{}] * (services.MAX_BATCH_PROFILES + 1)}]:
+            assert client.post(url, json=body).status_code == 400, body
+        print(f"✅ Endpoint scored {len(results)} profiles")
+
+
+def test_untrained_models_503():
+    """Without a model bundle both recommendation endpoints answer 503, not a 500 error page"""
+    print("🧪 Testing recommendations with no trained models...")
+
+    original = services.healthcare_ai
+    with tempfile.TemporaryDirectory() as model_dir:
+        def load_empty():
+            ai = PersonalizedHealthcareAI()
+            ai.load_models(model_dir)
+            return ai
+        services.healthcare_ai = LazyModel('healthcare', load_empty)
+        try:
+            client = app_module.app.test_client()
+            with client.session_transaction() as s:
+                s['user_id'] = 2
+                s['role'] = 'doctor'
+            response = client.post('/api/personalized-recommendations', json={'profile': PROFILES[0]})
+            assert response.status_code == 503 and 'train_models.py' in response.get_json()['error']
+            response = client.post('/api/personalized-recommendations/batch', json={'profiles': PROFILES})
+            assert response.status_code == 503
+            print("✅ Untrained models give 503")
+        finally:
+            services.healthcare_ai = original
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_predictions()
+    test_batch_endpoint()
+    test_untrained_models_503()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled SQLite access layer
+Checks pragmas, connection reuse, transaction handling, concurrent use and
+atomic migrations
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import test_support  # before the database and app imports: keeps healthcare.db untouched
+
+import database
+from database import ConnectionPool, connect, migrate, schema_version
+
+
+def make_pool(tmp, max_size=4):
+    path = os.path.join(tmp, 'test.db')
+    conn = connect(path)
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)')
+    conn.commit()
+    conn.close()
+    return ConnectionPool(path, max_size=max_size)
+
+
+def test_connection_pragmas():
+    """Pooled connections run in WAL mode with the tuned pragmas"""
+    print("🧪 Testing connection pragmas...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        with pool.connection() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+            assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+            assert conn.execute('PRAGMA cache_size').fetchone()[0] == -16000
+        pool.close()
+    print("✅ WAL and pragmas applied")
+
+
+def test_connection_reuse_and_transactions():
+    """Connections are reused; the context manager commits or rolls back"""
+    print("🧪 Testing connection reuse and transactions...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp)
+        with pool.connection() as conn:
+            first = conn
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+        with pool.connection() as conn:
+            assert conn is first, "idle connection is handed out again"
+
+        try:
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('b')")
+                conn.execute("INSERT INTO items (name) VALUES ('a')")
+            raise AssertionError('expected IntegrityError')
+        except sqlite3.IntegrityError:
+            pass
+
+        with pool.connection() as conn:
+            names = [row[0] for row in conn.execute('SELECT name FROM items ORDER BY name')]
+        assert names == ['a'], f"failed transaction was rolled back, got {names}"
+        pool.close()
+    print("✅ Commit on success, rollback on error")
+
+
+def test_failed_migration_rolls_back():
+    """A migration that fails part way leaves neither its DDL nor its version bump"""
+    print("🧪 Testing migration atomicity...")
+
+    original = database.MIGRATIONS
+    database.MIGRATIONS = [(1, 'good', ['CREATE TABLE a (id INTEGER)']),
+                           (2, 'bad', ['CREATE TABLE b (id INTEGER)', 'CREATE INDEX idx_b ON missing (id)'])]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = connect(os.path.join(tmp, 'test.db'))
+            try:
+                migrate(conn)
+                raise AssertionError('expected OperationalError')
+            except sqlite3.OperationalError:
+                pass
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            assert tables == {'a'}, tables
+            assert schema_version(conn) == 1
+            conn.close()
+    finally:
+        database.MIGRATIONS = original
+    print("✅ Failed migration rolled back")
+
+
+def test_concurrent_writers():
+    """Threads share a bounded pool without losing writes"""
+    print("🧪 Testing concurrent pooled access...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = make_pool(tmp, max_size=2)
+
+        def writer(i):
+            for j in range(25):
+                with pool.connection() as conn:
+                    conn.execute('INSERT INTO items (name) VALUES (?)', (f"{i}-{j}",))
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with pool.connection() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 200
+        assert pool._opened <= 2, "pool never exceeds max_size"
+        pool.close()
+    print("✅ 200 writes from 8 threads over 2 connections")
+
+
+if __name__ == "__main__":
+    test_connection_pragmas()
+    test_connection_reuse_and_transactions()
+    test_failed_migration_rolls_back()
+    test_concurrent_writers()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-face emotion analysis
+Builds a group frame from the sample images and checks every face is
+classified in one batched model call, matching one-face-at-a-time results
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from emotion_ai import emotion_ai
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GROUP = ['enhanced_annotated_squat.jpg', 'enhanced_annotated_pullup.jpg', 'api_test_annotated.jpg']
+
+
+def group_frame():
+    """Three people side by side: the head-and-shoulders region of three sample frames"""
+    crops = [cv2.imread(os.path.join(HERE, name), cv2.IMREAD_GRAYSCALE)[0:260, 480:800] for name in GROUP]
+    return cv2.imencode('.jpg', np.hstack(crops))[1].tobytes()
+
+
+def test_group_frame_batched():
+    """All faces come back, classified by a single predict call"""
+    print("🧪 Testing batched multi-face inference...")
+
+    calls = []
+    runner = emotion_ai.face_runner
+    emotion_ai.face_runner = lambda batch: calls.append(batch.shape) or runner(batch)
+    try:
+        result = emotion_ai.analyze_face_image(group_frame())
+    finally:
+        emotion_ai.face_runner = runner
+
+    assert result['face_detected'] and len(result['faces']) == 3
+    assert calls == [(3, 48, 48, 1)]
+    assert result['face_coordinates'] == result['faces'][0]['face_coordinates']
+    assert result['emotion'] == result['faces'][0]['emotion']
+
+    gray = cv2.imdecode(np.frombuffer(group_frame(), np.uint8), cv2.IMREAD_GRAYSCALE)
+    for face in result['faces']:
+        single = emotion_ai.predict_emotions(gray, [face['face_coordinates']])[0]
+        assert single['emotion'] == face['emotion']
+        assert abs(single['confidence'] - face['confidence']) < 1e-5
+    print(f"✅ {len(result['faces'])} faces: {[face['emotion'] for face in result['faces']]}")
+
+
+def test_no_faces():
+    """A frame without faces keeps the neutral answer and an empty face list"""
+    print("🧪 Testing a frame without faces...")
+
+    with open(os.path.join(HERE, 'sample_pose.jpg'), 'rb') as f:
+        result = emotion_ai.analyze_face_image(f.read())
+    assert result['face_detected'] is False and result['faces'] == []
+    assert emotion_ai.predict_emotions(np.zeros((10, 10), np.uint8), []) == []
+    print("✅ No faces reported")
+
+
+if __name__ == "__main__":
+    test_group_frame_batched()
+    test_no_faces()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled face emotion runtimes
+Checks the tf.function and TFLite paths against Keras model.predict on face
+crops from the sample images, for single faces and batches
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from emotion_ai import emotion_ai
+from emotion_runtime import KerasRunner, compile_face_model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLES = ['api_test_annotated.jpg', 'enhanced_annotated_bicep_curl.jpg', 'enhanced_annotated_plank.jpg',
+           'enhanced_annotated_situp.jpg', 'enhanced_annotated_squat.jpg']
+
+
+def sample_faces():
+    """(N, 48, 48, 1) float32 face crops, preprocessed like analyze_face_image"""
+    crops = []
+    for name in SAMPLES:
+        gray = cv2.imread(os.path.join(HERE, name), cv2.IMREAD_GRAYSCALE)
+        x, y, w, h = emotion_ai.face_detector.detect(gray)[0]
+        crops.append(cv2.resize(gray[y:y+h, x:x+w], (48, 48)))
+    return (np.stack(crops).astype('float32') / 255.0).reshape(-1, 48, 48, 1)
+
+
+def check_parity(runtime, tolerance, **kwargs):
+    faces = sample_faces()
+    expected = KerasRunner(emotion_ai.face_model)(faces)
+    runner = compile_face_model(emotion_ai.face_model, runtime, **kwargs)
+    batched = runner(faces)
+    singles = np.concatenate([runner(faces[i:i + 1]) for i in range(len(faces))])
+    # Again after the single-face calls, so the TFLite input is resized back
+    assert np.abs(runner(faces) - batched).max() == 0
+    for result in (batched, singles):
+        assert result.shape == expected.shape
+        assert np.abs(result - expected).max() < tolerance, (runtime, np.abs(result - expected).max())
+    return np.abs(batched - expected).max()
+
+
+def test_function_parity():
+    """The traced tf.function matches model.predict"""
+    print("🧪 Testing tf.function runtime parity...")
+    print(f"✅ max |diff| {check_parity('function', 1e-5):.2e}")
+
+
+def test_tflite_parity():
+    """Float TFLite matches closely, quantized conversions within quantization error"""
+    print("🧪 Testing TFLite runtime parity...")
+    float_diff = check_parity('tflite', 1e-5)
+    dynamic_diff = check_parity('tflite-dynamic', 1e-2)
+    int8_diff = check_parity('tflite-int8', 5e-2, calibration_faces=sample_faces())
+    print(f"✅ max |diff| float {float_diff:.2e}, dynamic {dynamic_diff:.2e}, int8 {int8_diff:.2e}")
+
+
+def test_runtime_selection():
+    """Unknown runtimes and int8 without calibration data fall back to Keras predict"""
+    print("🧪 Testing runtime fallback...")
+
+    try:
+        compile_face_model(emotion_ai.face_model, 'onnx')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert isinstance(emotion_ai.compile_face_model('onnx'), KerasRunner)
+    assert isinstance(emotion_ai.compile_face_model('tflite-int8'), KerasRunner)
+    print("✅ Fell back to Keras predict")
+
+
+if __name__ == "__main__":
+    test_function_parity()
+    test_tflite_parity()
+    test_runtime_selection()
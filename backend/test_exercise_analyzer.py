@@ -8,7 +8,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from exercise_analyzer import ExerciseAnalyzer
+from exercise_analyzer import ExerciseAnalyzer, PoseEnginePool, ExerciseSessionStore
+from image_utils import decode_image
 import cv2
 import numpy as np
 import base64
@@ -62,5 +63,143 @@ def test_exercise_analyzer():
     
     print("\n🎯 Exercise Analyzer test completed!")
 
+def test_pose_engine_pool():
+    """Engines are reused per session and evicted least-recently-used"""
+    print("🧪 Testing PoseEnginePool...")
+    
+    pool = PoseEnginePool(max_engines=2)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    
+    pool.process('a', frame)
+    engine_a = pool._engines['a']
+    pool.process('a', frame)
+    assert pool._engines['a'] is engine_a, "session engine should stay warm"
+    
+    pool.process('b', frame)
+    pool.process('c', frame)
+    assert len(pool) == 2
+    assert 'a' not in pool._engines, "oldest session should be evicted"
+    
+    pool.release('b')
+    assert list(pool._engines) == ['c']
+    pool.close()
+    assert len(pool) == 0
+    print("✅ PoseEnginePool reuse and eviction working")
+
+def test_pose_engine_in_use():
+    """An engine handed to a frame is never closed until that frame finishes"""
+    print("🧪 Testing PoseEnginePool in-use engines...")
+    
+    pool = PoseEnginePool(max_engines=1)
+    closed = []
+    pool._close = closed.append
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    
+    engine_a = pool._acquire('a')
+    pool.process('b', frame)
+    assert closed == [] and len(pool) == 2, "busy engine must not be evicted"
+    
+    pool.release('a')
+    assert closed == [], "released while busy: closed by its last user"
+    pool._finish(engine_a)
+    assert closed == [engine_a]
+    
+    engine_b = pool._engines['b']
+    pool.process('c', frame)
+    assert closed == [engine_a, engine_b], "idle engines are still evicted"
+    
+    del pool._close
+    for engine in closed:
+        engine.pose.close()
+    pool.close()
+    print("✅ In-use engines survive eviction and release")
+
+def test_exercise_session_isolation():
+    """Rep counters are tracked per session and the store stays bounded"""
+    print("🧪 Testing per-session exercise state...")
+    
+    analyzer = ExerciseAnalyzer()
+    for label in ['pushups_up', 'pushups_down', 'pushups_up', 'pushups_down']:
+        analyzer._update_exercise_tracking(analyzer.sessions.get('alice'), label)
+    analyzer._update_exercise_tracking(analyzer.sessions.get('bob'), 'squats_up')
+    
+    assert analyzer.get_exercise_stats('alice')['counters']['pushups'] == 2
+    assert analyzer.get_exercise_stats('bob')['total_reps'] == 0
+    assert analyzer.get_exercise_stats('carol')['total_reps'] == 0
+    assert 'carol' not in analyzer.sessions._sessions, "stats must not create sessions"
+    
+    # Ending alice's stream frees her pose engine but keeps her counters
+    analyzer.pose_engines.process('alice', np.zeros((240, 320, 3), dtype=np.uint8))
+    analyzer.end_stream('alice')
+    assert len(analyzer.pose_engines) == 0
+    assert analyzer.get_exercise_stats('alice')['counters']['pushups'] == 2
+    
+    assert analyzer.reset_exercise('pushups', 'alice')
+    assert analyzer.get_exercise_stats('alice')['counters']['pushups'] == 0
+    assert not analyzer.reset_exercise('unknown', 'alice')
+    
+    store = ExerciseSessionStore(max_sessions=3)
+    for i in range(10):
+        store.get(i)
+    assert len(store) == 3 and list(store._sessions) == [7, 8, 9]
+    
+    store = ExerciseSessionStore(ttl=60)
+    stale = store.get('stale')
+    stale.exercise_counters['squats'] = 5
+    stale.last_seen -= 120
+    assert store.peek('stale') is None, "expired sessions are not returned"
+    assert store.get('stale').exercise_counters['squats'] == 0
+    print("✅ Per-session exercise state working")
+
+def test_binary_frame_upload():
+    """Raw JPEG bytes and the legacy data URL decode to the same frame"""
+    print("🧪 Testing binary frame upload...")
+    
+    image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg')
+    with open(image_path, 'rb') as f:
+        jpeg_bytes = f.read()
+    data_url = f"data:image/jpeg;base64,{base64.b64encode(jpeg_bytes).decode('utf-8')}"
+    
+    from_bytes = decode_image(jpeg_bytes)
+    assert from_bytes.shape == (720, 1280, 3)
+    assert np.array_equal(from_bytes, decode_image(data_url))
+    assert np.array_equal(from_bytes, cv2.imread(image_path))
+    assert decode_image(jpeg_bytes, cv2.IMREAD_GRAYSCALE).shape == (720, 1280)
+    
+    result = ExerciseAnalyzer().analyze_exercise(b'not an image', 'squat', 'binary')
+    assert not result['success']
+    print("✅ Binary and data URL frames match")
+
+def test_render_modes():
+    """Render modes trim the response payload"""
+    print("🧪 Testing render modes...")
+    
+    analyzer = ExerciseAnalyzer()
+    image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg')
+    image = cv2.imread(image_path)
+    results = analyzer.pose_engines.process('render', cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    landmarks = np.array([[lmk.x, lmk.y, lmk.z] for lmk in results.pose_landmarks.landmark], dtype=np.float32)
+    
+    def render(**options):
+        return analyzer._render_payload(image, results.pose_landmarks, landmarks, 'squats_down', 1, 'squats', **options)
+    
+    assert render(render='none', jpeg_quality=95, jpeg_scale=1.0) == {}
+    assert set(render(render='keypoints', jpeg_quality=95, jpeg_scale=1.0)) == {'keypoints'}
+    
+    full = render(render='jpeg', jpeg_quality=95, jpeg_scale=1.0)
+    small = render(render='jpeg', jpeg_quality=70, jpeg_scale=0.5)
+    decoded = cv2.imdecode(np.frombuffer(base64.b64decode(small['annotated_image']), np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (360, 640, 3)
+    assert len(small['annotated_image']) < len(full['annotated_image'])
+    
+    result = analyzer.analyze_frame(image, 'squat', render='png')
+    assert not result['success'] and 'render' in result['error']
+    print("✅ Render modes working")
+
 if __name__ == "__main__":
     test_exercise_analyzer()
+    test_pose_engine_pool()
+    test_pose_engine_in_use()
+    test_exercise_session_isolation()
+    test_binary_frame_upload()
+    test_render_modes()
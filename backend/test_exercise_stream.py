@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming exercise analysis
+Checks latest-frame-wins backpressure with a deliberately slow analyzer
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from exercise_stream import ExerciseStream, LatestFrameSlot
+
+
+class SlowAnalyzer:
+    """Stands in for ExerciseAnalyzer, taking 50ms per frame"""
+
+    def __init__(self):
+        self.seen = []
+        self.ended = []
+
+    def analyze_exercise(self, image_data, exercise_type, session_id=None, **render_options):
+        self.seen.append(image_data)
+        time.sleep(0.05)
+        return {'success': True, 'exercise_type': exercise_type, 'rep_count': len(self.seen)}
+
+    def end_stream(self, session_id=None):
+        self.ended.append(session_id)
+
+
+def test_latest_frame_slot():
+    """A pending frame is replaced, not queued"""
+    print("🧪 Testing LatestFrameSlot...")
+
+    slot = LatestFrameSlot()
+    slot.put('a')
+    slot.put('b')
+    slot.put('c')
+    assert slot.take() == 'c'
+    assert slot.dropped == 2
+
+    slot.close()
+    assert slot.take() is None
+    print("✅ LatestFrameSlot keeps only the newest frame")
+
+
+def test_exercise_stream_backpressure():
+    """A slow analyzer sees the newest frame and skips the backlog"""
+    print("🧪 Testing ExerciseStream backpressure...")
+
+    analyzer = SlowAnalyzer()
+    sent = []
+    done = threading.Event()
+
+    def send(message):
+        sent.append(json.loads(message))
+        if sent[-1]['frame_id'] == 30:
+            done.set()
+
+    stream = ExerciseStream(analyzer, send, session_id='client-1', exercise_type='squats').start()
+    for i in range(30):
+        stream.submit(f'frame-{i + 1}'.encode())
+        time.sleep(0.005)
+    assert done.wait(2), "last frame should always be analyzed"
+    stream.close()
+
+    assert stream.frames_received == 30
+    assert stream.frames_processed < 30
+    assert stream.frames_processed + stream.frames_dropped == 30
+    assert analyzer.seen[-1] == b'frame-30'
+    assert [m['frame_id'] for m in sent] == sorted(m['frame_id'] for m in sent)
+    assert all(m['exercise_type'] == 'squats' for m in sent)
+    assert analyzer.ended == ['client-1'], "closing the stream frees its pose engine"
+    print(f"✅ Processed {stream.frames_processed}/30 frames, dropped {stream.frames_dropped}")
+
+
+def test_exercise_stream_stops_on_send_error():
+    """The worker exits when the client disconnects"""
+    print("🧪 Testing ExerciseStream disconnect...")
+
+    def send(message):
+        raise ConnectionError('client gone')
+
+    stream = ExerciseStream(SlowAnalyzer(), send, session_id='client-2').start()
+    stream.submit(b'frame')
+    stream._worker.join(2)
+    assert not stream._worker.is_alive()
+    stream.close()
+    print("✅ Stream worker stopped after disconnect")
+
+
+if __name__ == "__main__":
+    test_latest_frame_slot()
+    test_exercise_stream_backpressure()
+    test_exercise_stream_stops_on_send_error()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the face detection stage of emotion analysis
+Checks downscaled detection against the full-resolution reference cascade on
+the sample images, the per-session ROI cache and its periodic full search,
+and the DNN fallback
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+
+from face_detection import FaceDetector, HaarBackend
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FACE_IMAGES = ['api_test_annotated.jpg', 'enhanced_annotated_bicep_curl.jpg', 'enhanced_annotated_jumping_jack.jpg',
+               'enhanced_annotated_plank.jpg', 'enhanced_annotated_pullup.jpg', 'enhanced_annotated_situp.jpg',
+               'enhanced_annotated_squat.jpg']
+NO_FACE_IMAGES = ['sample_pose.jpg', 'test_pose.jpg']
+
+
+def load_gray(name):
+    return cv2.imread(os.path.join(HERE, name), cv2.IMREAD_GRAYSCALE)
+
+
+def reference_faces(gray):
+    """The original full-resolution detectMultiScale call"""
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return [tuple(int(v) for v in face) for face in cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)]
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    return ix * iy / (aw * ah + bw * bh - ix * iy)
+
+
+def test_downscaled_matches_reference():
+    """Downscaled detection finds the reference faces, in full-resolution coordinates"""
+    print("🧪 Testing downscaled face detection parity...")
+
+    detector = FaceDetector()
+    for name in FACE_IMAGES:
+        gray = load_gray(name)
+        expected, faces = reference_faces(gray), detector.detect(gray)
+        assert expected and faces, name
+        assert iou(expected[0], faces[0]) >= 0.6, (name, expected, faces)
+    for name in NO_FACE_IMAGES:
+        assert detector.detect(load_gray(name)) == [], name
+    print(f"✅ {len(FACE_IMAGES)} faces found, {len(NO_FACE_IMAGES)} empty frames stay empty")
+
+
+def test_session_roi_cache():
+    """A session's next frame is searched around its last face, falling back to the full frame"""
+    print("🧪 Testing per-session face ROI...")
+
+    detector = FaceDetector()
+    gray = load_gray('enhanced_annotated_squat.jpg')
+    first = detector.detect(gray, 'cam-1')
+    second = detector.detect(gray, 'cam-1')
+    assert (detector.full_searches, detector.roi_hits) == (1, 1)
+    assert iou(first[0], second[0]) >= 0.6
+
+    # The face leaves the frame: the ROI misses, the full search finds nothing and the ROI is dropped
+    assert detector.detect(load_gray('sample_pose.jpg'), 'cam-1') == []
+    detector.detect(gray, 'cam-1')
+    assert (detector.full_searches, detector.roi_hits) == (3, 1)
+
+    # Sessions do not share ROIs, and the cache is bounded
+    small = FaceDetector(max_sessions=2)
+    for session_id in ['a', 'b', 'c']:
+        small.detect(gray, session_id)
+    assert small.full_searches == 3 and list(small._rois) == ['b', 'c']
+    print("✅ ROI reused within a session and dropped when the face is lost")
+
+
+def test_group_frames_keep_no_roi():
+    """Several faces in a session's frame always get a full search, so nobody is dropped"""
+    print("🧪 Testing ROI with several faces...")
+
+    crops = [load_gray(name)[0:260, 480:800] for name in FACE_IMAGES[:3]]
+    group = cv2.hconcat(crops)
+    detector = FaceDetector()
+    assert len(detector.detect(group, 'waiting-room')) == 3
+    assert len(detector.detect(group, 'waiting-room')) == 3
+    assert (detector.full_searches, detector.roi_hits) == (2, 0)
+    print("✅ Group frames searched in full")
+
+
+def test_new_face_joins_roi_session():
+    """A second person joining a one-person session is found by the periodic full search"""
+    print("🧪 Testing a face joining a session with an ROI...")
+
+    crops = [load_gray(name)[0:260, 480:800] for name in FACE_IMAGES[:2]]
+    empty = crops[0] * 0 + 128
+    alone = cv2.hconcat([crops[0], empty, empty])
+    joined = cv2.hconcat([crops[0], crops[1], empty])
+    detector = FaceDetector(full_search_every=3)
+    assert len(detector.detect(alone, 'consult')) == 1
+    counts = [len(detector.detect(joined, 'consult')) for _ in range(3)]
+    assert counts == [1, 1, 2], counts
+    assert (detector.full_searches, detector.roi_hits) == (2, 2)
+    assert 'consult' not in detector._rois, "two faces: back to full searches"
+    print("✅ Joining face found on the forced full search")
+
+
+def test_dnn_fallback():
+    """FACE_DETECTOR=dnn without usable weights falls back to the Haar cascade"""
+    print("🧪 Testing DNN detector fallback...")
+
+    import face_detection
+    original = face_detection.FACE_DETECTOR, face_detection.FACE_DNN_MODEL
+    face_detection.FACE_DETECTOR, face_detection.FACE_DNN_MODEL = 'dnn', os.path.join(HERE, 'missing.onnx')
+    try:
+        detector = FaceDetector.from_env()
+    finally:
+        face_detection.FACE_DETECTOR, face_detection.FACE_DNN_MODEL = original
+    assert isinstance(detector.backend, HaarBackend)
+    assert detector.detect(load_gray('enhanced_annotated_pullup.jpg'))
+    print("✅ Fell back to the Haar cascade")
+
+
+if __name__ == "__main__":
+    test_downscaled_matches_reference()
+    test_session_roi_cache()
+    test_group_frames_keep_no_roi()
+    test_new_face_joins_roi_session()
+    test_dnn_fallback()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the async FastAPI server in main.py
+Drives the routes it shares with app.py through services.py: login sessions,
+keyset pages, role checks, recommendations and readiness
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import temp_db  # first: keeps the tracked healthcare.db untouched
+
+try:
+    from fastapi.testclient import TestClient
+    import main
+except ImportError:
+    TestClient = None
+
+
+def with_client(fn):
+    """Run fn(client) against a fresh database swapped in for the shared pool"""
+    def wrapper():
+        if TestClient is None:
+            print("⚠️ FastAPI not installed, skipping")
+            return
+        with temp_db():
+            fn(TestClient(main.app))
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+@with_client
+def test_session_auth(client):
+    """Login sets the session cookie, role checks return the Flask statuses"""
+    print("🧪 Testing FastAPI login and sessions...")
+
+    assert client.get('/api/auth/status').status_code == 401
+    assert client.post('/api/login', json={'email': 'admin@healthcare.com', 'password': 'wrong'}).status_code == 401
+    assert client.post('/api/login', content='not json').status_code == 400
+    response = client.post('/api/login', json={'email': 'admin@healthcare.com', 'password': 'admin123'})
+    assert response.status_code == 200 and response.json()['user']['role'] == 'admin'
+    assert client.get('/api/auth/status').json()['user']['email'] == 'admin@healthcare.com'
+    assert client.get('/api/admin/stats').status_code == 200
+    assert client.get('/api/doctor/patients').status_code == 401
+
+    response = client.post('/api/register', json={'email': 'new@example.com', 'password': 'pw', 'name': 'New'})
+    assert response.status_code == 201
+    assert client.post('/api/register', json={'email': 'new@example.com', 'password': 'pw', 'name': 'New'}).status_code == 400
+
+    client.post('/api/logout')
+    assert client.get('/api/admin/stats').status_code == 401
+    print("✅ Sessions and role checks match the Flask app")
+
+
+@with_client
+def test_listing_pages(client):
+    """?limit= pages carry X-Next-Cursor and add up to the streamed listing"""
+    print("🧪 Testing FastAPI keyset pages...")
+
+    client.post('/api/login', json={'email': 'admin@healthcare.com', 'password': 'admin123'})
+    for i in range(5):
+        client.post('/api/register', json={'email': f'p{i}@example.com', 'password': 'pw', 'name': f'P{i}'})
+
+    streamed = client.get('/api/admin/users').json()
+    paged, params = [], {'limit': 2}
+    while True:
+        response = client.get('/api/admin/users', params=params)
+        assert response.status_code == 200
+        paged.extend(response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        params = {'limit': 2, 'after': cursor}
+    assert len(streamed) == 7 and paged == streamed
+    assert client.get('/api/admin/users', params={'limit': 'x'}).status_code == 400
+    print(f"✅ {len(paged)} users paged and streamed identically")
+
+
+@with_client
+def test_recommendations(client):
+    """Recommendations run on the shared model and batch is limited to clinicians"""
+    print("🧪 Testing FastAPI recommendations...")
+
+    profile = {'age': 58, 'gender': 'male', 'medicalHistory': 'Diabetes, hypertension'}
+    assert client.post('/api/personalized-recommendations', json={'profile': profile}).status_code == 401
+
+    client.post('/api/login', json={'email': 'doctor@healthcare.com', 'password': 'doctor123'})
+    single = client.post('/api/personalized-recommendations', json={'profile': profile}).json()
+    batch = client.post('/api/personalized-recommendations/batch', json={'profiles': [profile, profile]}).json()
+    assert len(batch) == 2
+    assert batch[0] == batch[1]
+    assert batch[0]['treatment']['treatment'].title() in single['treatments'][0]
+
+    response = client.get('/api/ready')
+    assert response.status_code in (200, 503) and 'models' in response.json()
+    print(f"✅ {single['treatments'][0]}")
+
+
+@with_client
+def test_voice_stream(client):
+    """The voice websocket answers a window per second of PCM once three seconds are in"""
+    print("🧪 Testing FastAPI voice stream...")
+
+    from test_voice_analysis import synthetic_speech, to_pcm16
+    pcm = to_pcm16(synthetic_speech(5))
+    client.post('/api/login', json={'email': 'doctor@healthcare.com', 'password': 'doctor123'})
+    with client.websocket_connect('/api/mental-health/voice-stream?sample_rate=16000') as ws:
+        results = []
+        for second in range(5):
+            ws.send_bytes(pcm[second * 32000:(second + 1) * 32000])
+            if second >= 3:  # the 3 s window needs a few samples of the fourth second for its last frame
+                results.append(ws.receive_json())
+        ws.send_text('{"end": true}')
+        results.append(ws.receive_json())
+    assert [r['end'] for r in results] == [3.0, 4.0, 4.98]
+    print(f"✅ {len(results)} windows streamed")
+
+
+@with_client
+def test_stream_bad_control_message(client):
+    """A malformed text message gets an error frame and the socket stays open"""
+    print("🧪 Testing malformed stream control messages...")
+
+    from test_voice_analysis import synthetic_speech, to_pcm16
+    client.post('/api/login', json={'email': 'doctor@healthcare.com', 'password': 'doctor123'})
+    with client.websocket_connect('/api/mental-health/voice-stream?sample_rate=16000') as ws:
+        for text in ('{"end": tru', '[1, 2]'):
+            ws.send_text(text)
+            assert 'error' in ws.receive_json()
+        ws.send_bytes(to_pcm16(synthetic_speech(1)))
+        ws.send_text('{"end": true}')
+        assert ws.receive_json()['end'] > 0
+    with client.websocket_connect('/api/test/exercise/stream') as ws:
+        ws.send_text('not json')
+        assert 'error' in ws.receive_json()
+    print("✅ Error frames sent, connections kept")
+
+
+if __name__ == "__main__":
+    test_session_auth()
+    test_listing_pages()
+    test_recommendations()
+    test_voice_stream()
+    test_stream_bad_control_message()
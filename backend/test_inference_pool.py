@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-process inference pool
+Checks sticky session routing, that analysis results match the inline
+analyzer, and that a crashed worker is replaced
+"""
+
+import os
+import signal
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from exercise_analyzer import ExerciseAnalyzer
+from inference_pool import InferencePool
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg')
+
+
+def test_sticky_routing():
+    """A session always maps to the same worker; anonymous calls rotate"""
+    print("🧪 Testing inference pool routing...")
+
+    pool = InferencePool(4, load_face_model=False)
+    try:
+        for session_id in ['user-1', 'user-2', 42, 'stream-abc']:
+            workers = {pool.worker_for(session_id) for _ in range(10)}
+            assert len(workers) == 1, f"{session_id} routed to {workers}"
+        assert len({pool.worker_for(f"user-{i}") for i in range(100)}) == 4, "sessions spread over all workers"
+        assert [pool.worker_for(None) for _ in range(4)] == [0, 1, 2, 3]
+    finally:
+        pool.shutdown()
+    print("✅ Sessions are sticky to one worker")
+
+
+def test_pool_matches_inline_analyzer():
+    """Results and per-session counters from the pool match in-process analysis"""
+    print("🧪 Testing inference pool results...")
+
+    with open(IMAGE_PATH, 'rb') as f:
+        image_bytes = f.read()
+
+    inline = ExerciseAnalyzer()
+    pool = InferencePool(2, load_face_model=False)
+    try:
+        pool.warm_up()
+        for session_id in ['alice', 'bob']:
+            for _ in range(2):
+                expected = inline.analyze_exercise(image_bytes, 'squat', session_id, render='none')
+                result = pool.analyze_exercise(image_bytes, 'squat', session_id, render='none')
+                assert result == expected, f"{result} != {expected}"
+            assert pool.get_exercise_stats(session_id) == inline.get_exercise_stats(session_id)
+
+        pool.reset_exercise('squats', 'alice')
+        inline.reset_exercise('squats', 'alice')
+        assert pool.get_exercise_stats('alice') == inline.get_exercise_stats('alice')
+    finally:
+        pool.shutdown()
+    print("✅ Pool results match the inline analyzer")
+
+
+def test_crashed_worker_replaced():
+    """A killed worker is restarted and the call that hit it retried"""
+    print("🧪 Testing inference worker crash recovery...")
+
+    pool = InferencePool(1, load_face_model=False)
+    try:
+        pid = pool._workers[0].submit(os.getpid).result()
+        os.kill(pid, signal.SIGKILL)
+        assert pool.get_exercise_stats('alice')['total_reps'] == 0
+        assert pool.restarts == 1
+        assert pool._workers[0].submit(os.getpid).result() != pid
+        assert pool.get_exercise_stats('alice')['total_reps'] == 0
+        assert pool.restarts == 1
+    finally:
+        pool.shutdown()
+    print("✅ Crashed worker replaced")
+
+
+if __name__ == "__main__":
+    test_sticky_routing()
+    test_pool_matches_inline_analyzer()
+    test_crashed_worker_replaced()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned healthcare model bundles
+Trains into a scratch directory and checks a fresh process-level instance can
+predict from the saved bundle alone, and that CURRENT swaps and rolls back
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ml_models import PersonalizedHealthcareAI
+from model_artifacts import ModelNotTrained, activate_version, current_version, list_versions
+
+PATIENT = {'age': 58, 'gender': 'male', 'bmi': 31, 'bp_systolic': 150, 'glucose': 140,
+           'diabetes': True, 'hypertension': True, 'smoking': True}
+
+
+def test_bundle_round_trip():
+    """A loaded bundle carries the treatment encoder and predicts like the trained models"""
+    print("🧪 Testing model bundle round trip...")
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer = PersonalizedHealthcareAI()
+        trainer.train_models(seed=7)
+        trainer.save_models(model_dir)
+
+        served = PersonalizedHealthcareAI()
+        assert served.load_models(model_dir) == trainer.version == current_version(model_dir)
+        assert served.predict_treatment(PATIENT) == trainer.predict_treatment(PATIENT)
+        assert served.predict_risk(PATIENT) == trainer.predict_risk(PATIENT)
+        print(f"✅ Bundle {served.version} predicts {served.predict_treatment(PATIENT)['treatment']}")
+
+
+def test_swap_and_roll_back():
+    """reload() picks up a newly activated version; activate_version rolls back"""
+    print("🧪 Testing atomic version swaps...")
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer = PersonalizedHealthcareAI()
+        trainer.train_models(seed=1)
+        trainer.save_models(model_dir)
+        first = trainer.version
+
+        served = PersonalizedHealthcareAI()
+        served.load_models(model_dir)
+        assert served.reload(model_dir) == (first, first)
+
+        trainer.train_models(seed=2)
+        trainer.save_models(model_dir, activate=False)
+        second = trainer.version
+        assert list_versions(model_dir) == sorted([first, second])
+        assert served.reload(model_dir) == (first, first)
+
+        activate_version(second, model_dir)
+        assert served.reload(model_dir) == (first, second)
+        activate_version(first, model_dir)
+        assert served.reload(model_dir) == (second, first)
+        assert not [name for name in os.listdir(model_dir) if '.tmp' in name]
+        print("✅ Versions swap and roll back")
+
+
+def test_untrained_never_trains():
+    """Without a bundle, loading and predicting raise instead of training in the request"""
+    print("🧪 Testing missing model bundle...")
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        ai = PersonalizedHealthcareAI()
+        for call in [lambda: ai.load_models(model_dir), lambda: ai.predict_treatment(PATIENT),
+                     lambda: ai.predict_risk(PATIENT), lambda: activate_version('20240101', model_dir)]:
+            try:
+                call()
+                assert False, "expected ModelNotTrained"
+            except ModelNotTrained:
+                pass
+        assert ai.bundle is None and os.listdir(model_dir) == []
+        print("✅ Missing bundle reported, nothing trained")
+
+
+if __name__ == "__main__":
+    test_bundle_round_trip()
+    test_swap_and_roll_back()
+    test_untrained_never_trains()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy model loading
+Checks LazyModel/ModelRegistry behaviour and that importing the app does
+not import the heavy AI stacks
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import ModelRegistry
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SlowModel:
+    def __init__(self):
+        time.sleep(0.05)
+
+    def predict(self, x):
+        return x * 2
+
+
+def test_lazy_model_builds_once():
+    """Concurrent first uses build the component exactly once"""
+    print("🧪 Testing lazy model loading...")
+
+    builds = []
+    registry = ModelRegistry()
+    model = registry.register('slow', lambda: builds.append(1) or SlowModel())
+    assert model.status()['state'] == 'not_loaded' and not registry.ready
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(model.predict(21))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [42] * 8 and builds == [1]
+    assert model.status()['state'] == 'ready' and model.load_seconds >= 0.05 and registry.ready
+    print("✅ Built once, shared by all callers")
+
+
+def test_failed_load_is_reported_and_retried():
+    """A failing factory is reported as failed and retried on the next use"""
+    print("🧪 Testing failed model loads...")
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('model file missing')
+        return SlowModel()
+
+    registry = ModelRegistry()
+    model = registry.register('flaky', flaky)
+    registry.warm_up().join()
+    assert registry.status()['flaky'] == {'state': 'failed', 'load_seconds': None, 'error': 'model file missing'}
+    assert model.predict(1) == 2 and model.ready and model.error is None
+    print("✅ Failure reported, next use retries")
+
+
+def test_app_import_is_lazy():
+    """Importing the app loads no AI stack and /api/ready reports not_loaded"""
+    print("🧪 Testing lazy app startup...")
+
+    script = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+heavy = [m for m in ('tensorflow', 'mediapipe', 'sklearn', 'xgboost', 'pandas') if m in sys.modules]
+response = app.app.test_client().get('/api/ready')
+print(json.dumps({'elapsed': elapsed, 'heavy': heavy, 'status': response.status_code, 'body': response.get_json()}))
+'''
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, HEALTHCARE_DB=os.path.join(tmp, 'test.db'))
+        env.pop('MODEL_WARMUP', None)
+        out = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    assert result['heavy'] == [], result['heavy']
+    assert result['status'] == 503 and result['body']['ready'] is False
+    assert {m['state'] for m in result['body']['models'].values()} == {'not_loaded'}
+    assert set(result['body']['models']) == {'emotion', 'healthcare', 'exercise'}
+    print(f"✅ App imported in {result['elapsed']:.2f}s without AI stacks")
+
+
+if __name__ == "__main__":
+    test_lazy_model_builds_once()
+    test_failed_load_is_reported_and_retried()
+    test_app_import_is_lazy()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for keyset pagination and streamed list responses
+Pages through the list endpoints with limit/after and checks the pages add up
+to the streamed full listing
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import with_test_db  # first: keeps the tracked healthcare.db untouched
+
+import database
+from database import PoolExhausted
+import app as app_module
+import services
+
+
+def client_as(user_id, role):
+    client = app_module.app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = user_id
+        s['role'] = role
+    return client
+
+
+def fetch_pages(client, url, limit):
+    pages = []
+    after = None
+    while True:
+        query = {'limit': limit} if after is None else {'limit': limit, 'after': after}
+        response = client.get(url, query_string=query)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        pages.append(response.get_json())
+        after = response.headers.get('X-Next-Cursor')
+        if after is None:
+            return pages
+
+
+@with_test_db
+def test_admin_users_pages_match_stream(conn):
+    """Pages of /api/admin/users join up to the streamed listing, newest first"""
+    print("🧪 Testing admin users pagination...")
+
+    # Several users share a created_at, so the id tie-break matters
+    conn.executemany("INSERT INTO users (email, password, role, name, created_at) VALUES (?, 'x', 'patient', ?, ?)",
+                     [(f"user{i}@example.com", f"User {i}", f"2024-01-01 00:00:0{i % 4}") for i in range(23)])
+    conn.commit()
+    admin_id = conn.execute("SELECT id FROM users WHERE role = 'admin'").fetchone()[0]
+    client = client_as(admin_id, 'admin')
+
+    streamed = client.get('/api/admin/users')
+    assert streamed.is_streamed
+    everything = streamed.get_json()
+    assert len(everything) == 25
+
+    pages = fetch_pages(client, '/api/admin/users', 10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [u['id'] for page in pages for u in page] == [u['id'] for u in everything]
+    keys = [(u['created_at'], u['id']) for u in everything]
+    assert keys == sorted(keys, reverse=True)
+    print(f"✅ {len(pages)} pages match the streamed listing")
+
+
+@with_test_db
+def test_record_listings_paginate(conn):
+    """Patient and doctor record listings and the doctor's patient list paginate"""
+    print("🧪 Testing record listings pagination...")
+
+    conn.execute("INSERT INTO users (email, password, role, name) VALUES ('p@example.com', 'x', 'patient', 'Pat')")
+    patient_id = conn.execute("SELECT id FROM users WHERE role = 'patient'").fetchone()[0]
+    doctor_id = conn.execute("SELECT id FROM users WHERE role = 'doctor'").fetchone()[0]
+    conn.executemany('''
+        INSERT INTO medical_records (patient_id, doctor_id, record_type, title, status)
+        VALUES (?, ?, 'lab', ?, ?)
+    ''', [(patient_id, doctor_id if i % 3 else None, f"Record {i}", 'verified' if i % 3 else 'pending')
+          for i in range(12)])
+    conn.commit()
+
+    patient_pages = fetch_pages(client_as(patient_id, 'patient'), '/api/patient/records', 5)
+    assert sum(len(page) for page in patient_pages) == 12
+    assert patient_pages[0][0]['title'] == 'Record 11'
+
+    doctor = client_as(doctor_id, 'doctor')
+    doctor_pages = fetch_pages(doctor, '/api/doctor/records', 4)
+    assert sum(len(page) for page in doctor_pages) == 12
+    assert fetch_pages(doctor, '/api/doctor/patients', 1) == [[{
+        'id': patient_id, 'name': 'Pat', 'email': 'p@example.com', 'phone': None}]]
+    print("✅ Record listings paginate")
+
+
+@with_test_db
+def test_invalid_page_params(conn):
+    """Out-of-range limits and malformed cursors are rejected with 400"""
+    print("🧪 Testing invalid pagination parameters...")
+
+    admin_id = conn.execute("SELECT id FROM users WHERE role = 'admin'").fetchone()[0]
+    client = client_as(admin_id, 'admin')
+    for query in [{'limit': 0}, {'limit': 5000}, {'limit': 'ten'}, {'after': '!!not-a-cursor'}]:
+        assert client.get('/api/admin/users', query_string=query).status_code == 400, query
+    print("✅ Invalid parameters rejected")
+
+
+@with_test_db
+def test_stream_releases_connection(conn):
+    """A partly read stream holds no connection; an exhausted pool is a 503, not a hang"""
+    print("🧪 Testing streamed listings against a one-connection pool...")
+
+    conn.executemany("INSERT INTO users (email, password, role, name) VALUES (?, 'x', 'patient', ?)",
+                     [(f"user{i}@example.com", f"User {i}") for i in range(10)])
+    conn.commit()
+    admin_id = conn.execute("SELECT id FROM users WHERE role = 'admin'").fetchone()[0]
+    client = client_as(admin_id, 'admin')
+    database.pool.max_size = 1
+    database.pool.timeout = 0.2
+    chunk_rows = services.STREAM_CHUNK_ROWS
+    services.STREAM_CHUNK_ROWS = 4
+    try:
+        streamed = client.get('/api/admin/users')
+        chunks = iter(streamed.response)
+        body = [next(chunks), next(chunks)]
+        assert client.get('/api/auth/status').status_code == 200, 'other routes get the connection mid-stream'
+        body.extend(chunks)
+        assert len(json.loads(b''.join(body))) == 12
+
+        held = database.pool.acquire()
+        try:
+            response = client.get('/api/admin/users')
+            assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+            try:
+                database.pool.acquire()
+                raise AssertionError('expected PoolExhausted')
+            except PoolExhausted:
+                pass
+        finally:
+            database.pool.release(held)
+    finally:
+        services.STREAM_CHUNK_ROWS = chunk_rows
+    print("✅ Streams read in chunks; exhausted pool gives 503")
+
+
+if __name__ == "__main__":
+    test_admin_users_pages_match_stream()
+    test_record_listings_paginate()
+    test_invalid_page_params()
+    test_stream_releases_connection()
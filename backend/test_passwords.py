@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for password hashing
+Checks the salted KDF formats, legacy SHA-256 migration on login and the
+bounded verification pool
+"""
+
+import base64
+import hashlib
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import temp_db  # first: keeps the tracked healthcare.db untouched
+
+from database import connect
+from passwords import HasherBusy, PasswordHasher, hash_password, needs_rehash, verify_password
+
+
+def test_hash_formats():
+    """Hashes are salted, self-describing and verify across schemes"""
+    print("🧪 Testing password hash formats...")
+
+    first, second = hash_password('s3cret'), hash_password('s3cret')
+    assert first != second, "each hash gets its own salt"
+    assert first.startswith('scrypt$') and not needs_rehash(first)
+    assert verify_password('s3cret', first) and not verify_password('wrong', first)
+
+    cheap = hash_password('s3cret', n=2 ** 10)
+    assert verify_password('s3cret', cheap) and needs_rehash(cheap)
+
+    digest = base64.b64encode(hashlib.pbkdf2_hmac('sha256', b's3cret', b'salt', 1000)).decode()
+    pbkdf2 = f"pbkdf2_sha256$1000${base64.b64encode(b'salt').decode()}${digest}"
+    assert verify_password('s3cret', pbkdf2) and needs_rehash(pbkdf2)
+
+    legacy = hashlib.sha256(b's3cret').hexdigest()
+    assert verify_password('s3cret', legacy) and needs_rehash(legacy)
+    assert not verify_password('s3cret', 'scrypt$garbage') and not verify_password('s3cret', None)
+    print("✅ scrypt, PBKDF2 and legacy hashes verify")
+
+
+def test_login_rehashes_legacy_password():
+    """A legacy SHA-256 user can log in and is upgraded to scrypt"""
+    print("🧪 Testing rehash on login...")
+    import app as app_module
+
+    with temp_db() as path:
+        conn = connect(path)
+        try:
+            conn.execute("INSERT INTO users (email, password, role, name) VALUES ('old@example.com', ?, 'patient', 'Old')",
+                         (hashlib.sha256(b'legacy-pw').hexdigest(),))
+            conn.commit()
+            client = app_module.app.test_client()
+
+            assert client.post('/api/login', json={'email': 'old@example.com', 'password': 'nope'}).status_code == 401
+            assert client.post('/api/login', json={'email': 'ghost@example.com', 'password': 'x'}).status_code == 401
+            response = client.post('/api/login', json={'email': 'old@example.com', 'password': 'legacy-pw'})
+            assert response.status_code == 200 and response.get_json()['user']['name'] == 'Old'
+
+            stored = conn.execute("SELECT password FROM users WHERE email = 'old@example.com'").fetchone()[0]
+            assert stored.startswith('scrypt$') and verify_password('legacy-pw', stored)
+            assert client.post('/api/login', json={'email': 'old@example.com', 'password': 'legacy-pw'}).status_code == 200
+
+            assert client.post('/api/register', json={'email': 'new@example.com', 'password': 'pw', 'name': 'New'}).status_code == 201
+            stored = conn.execute("SELECT password FROM users WHERE email = 'new@example.com'").fetchone()[0]
+            assert stored.startswith('scrypt$')
+        finally:
+            conn.close()
+    print("✅ Legacy hash upgraded on login")
+
+
+def test_hasher_rejects_when_saturated():
+    """Calls beyond max_workers + max_pending fail fast with HasherBusy"""
+    print("🧪 Testing bounded verification pool...")
+
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    def blocking_op():
+        release.wait()
+        return 'done'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher._run(blocking_op))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    # Wait until one call is running and the other holds the pending slot
+    while hasher._slots._value:
+        time.sleep(0.01)
+    try:
+        hasher.verify('pw', hash_password('pw'))
+        raise AssertionError('expected HasherBusy')
+    except HasherBusy:
+        pass
+    finally:
+        release.set()
+        for t in threads:
+            t.join()
+    assert results == ['done', 'done']
+    assert hasher.verify('pw', hash_password('pw')) == (True, None)
+    hasher.shutdown()
+    print("✅ Saturated pool rejects extra work")
+
+
+if __name__ == "__main__":
+    test_hash_formats()
+    test_login_rehashes_legacy_password()
+    test_hasher_rejects_when_saturated()
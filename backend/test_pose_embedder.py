@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized FullBodyPoseEmbedder
+Checks bit-for-bit parity with the original per-landmark implementation
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from exercise_analyzer import FullBodyPoseEmbedder
+
+
+class ReferencePoseEmbedder:
+    """Original per-landmark embedder, kept as the parity reference"""
+    
+    def __init__(self, torso_size_multiplier=2.5):
+        self._torso_size_multiplier = torso_size_multiplier
+        self._landmark_names = [
+            'nose', 'left_eye_inner', 'left_eye', 'left_eye_outer',
+            'right_eye_inner', 'right_eye', 'right_eye_outer',
+            'left_ear', 'right_ear', 'mouth_left', 'mouth_right',
+            'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+            'left_wrist', 'right_wrist', 'left_pinky_1', 'right_pinky_1',
+            'left_index_1', 'right_index_1', 'left_thumb_2', 'right_thumb_2',
+            'left_hip', 'right_hip', 'left_knee', 'right_knee',
+            'left_ankle', 'right_ankle', 'left_heel', 'right_heel',
+            'left_foot_index', 'right_foot_index',
+        ]
+
+    def __call__(self, landmarks):
+        """Normalizes pose landmarks and converts to embedding"""
+        assert landmarks.shape[0] == len(self._landmark_names)
+        
+        landmarks = np.copy(landmarks)
+        landmarks = self._normalize_pose_landmarks(landmarks)
+        
+        distance_embedding = self._get_pose_distance_embedding(landmarks)
+        angle_embedding = self._get_pose_angle_embedding(landmarks)
+        distance3D_embedding = self._get_pose_3Ddistance_embedding(landmarks)
+        
+        return landmarks, distance_embedding, distance3D_embedding, angle_embedding
+
+    def _normalize_pose_landmarks(self, landmarks):
+        """Normalizes landmarks translation and scale."""
+        landmarks = np.copy(landmarks)
+        
+        # Normalize translation
+        pose_center = self._get_pose_center(landmarks)
+        landmarks -= pose_center
+        
+        # Normalize scale
+        pose_size = self._get_pose_size(landmarks, self._torso_size_multiplier)
+        landmarks /= pose_size
+        landmarks *= 100
+        
+        return landmarks
+
+    def _get_pose_center(self, landmarks):
+        """Calculates pose center as point between hips."""
+        left_hip = landmarks[self._landmark_names.index('left_hip')]
+        right_hip = landmarks[self._landmark_names.index('right_hip')]
+        center = (left_hip + right_hip) * 0.5
+        return center
+
+    def _get_pose_size(self, landmarks, torso_size_multiplier):
+        """Calculates pose size."""
+        landmarks = landmarks[:, :2]
+        hip_center = self._get_pose_center(landmarks)
+        
+        max_dist = 0
+        for landmark in landmarks:
+            dist = np.linalg.norm(landmark - hip_center)
+            if dist > max_dist:
+                max_dist = dist
+        
+        torso_size = max_dist * torso_size_multiplier
+        return max(torso_size, max_dist)
+
+    def _get_pose_distance_embedding(self, landmarks):
+        """Gets pose distance embedding."""
+        embedding = np.array([
+            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_wrist')[1],
+            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_hip', 'left_ankle')[1],
+            self._get_distance_by_names(landmarks, 'right_hip', 'right_ankle')[1],
+            self._get_distance_by_names(landmarks, 'left_hip', 'left_wrist')[1],
+            self._get_distance_by_names(landmarks, 'right_hip', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_ankle')[1],
+            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_ankle')[1],
+            self._get_distance_by_names(landmarks, 'left_hip', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'right_hip', 'left_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_elbow', 'right_elbow')[1],
+            self._get_distance_by_names(landmarks, 'left_knee', 'right_knee')[1],
+            self._get_distance_by_names(landmarks, 'left_wrist', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_ankle', 'right_ankle')[1],
+        ])
+        return embedding
+
+    def _get_pose_angle_embedding(self, landmarks):
+        """Gets pose angle embedding."""
+        angle_embedding = np.array([
+            self._get_angle_by_names(landmarks, 'right_elbow', 'right_shoulder', 'right_hip'),
+            self._get_angle_by_names(landmarks, 'left_elbow', 'left_shoulder', 'left_hip'),
+            self._get_angle_by_names(landmarks, 'right_knee', 'mid_hip', 'left_knee'),
+            self._get_angle_by_names(landmarks, 'right_hip', 'right_knee', 'right_ankle'),
+            self._get_angle_by_names(landmarks, 'left_hip', 'left_knee', 'left_ankle'),
+            self._get_angle_by_names(landmarks, 'right_wrist', 'right_elbow', 'right_shoulder'),
+            self._get_angle_by_names(landmarks, 'left_wrist', 'left_elbow', 'left_shoulder')
+        ])
+        return angle_embedding
+
+    def _get_pose_3Ddistance_embedding(self, landmarks):
+        """Gets 3D pose distance embedding."""
+        embedding_3d = np.array([
+            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_wrist')[1],
+            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_hip', 'left_ankle')[1],
+            self._get_distance_by_names(landmarks, 'right_hip', 'right_ankle')[1],
+            self._get_distance_by_names(landmarks, 'left_hip', 'left_wrist')[1],
+            self._get_distance_by_names(landmarks, 'right_hip', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_shoulder', 'left_ankle')[1],
+            self._get_distance_by_names(landmarks, 'right_shoulder', 'right_ankle')[1],
+            self._get_distance_by_names(landmarks, 'left_hip', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'right_hip', 'left_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_elbow', 'right_elbow')[1],
+            self._get_distance_by_names(landmarks, 'left_knee', 'right_knee')[1],
+            self._get_distance_by_names(landmarks, 'left_wrist', 'right_wrist')[1],
+            self._get_distance_by_names(landmarks, 'left_ankle', 'right_ankle')[1],
+        ])
+        return embedding_3d
+
+    def _get_distance_by_names(self, landmarks, name_from, name_to):
+        """Gets distance between two landmarks by name."""
+        try:
+            lmk_from = landmarks[self._landmark_names.index(name_from)]
+            lmk_to = landmarks[self._landmark_names.index(name_to)]
+            return self._get_distance(lmk_from, lmk_to)[0], self._get_distance(lmk_from, lmk_to)[1]
+        except ValueError:
+            return np.array([0, 0]), np.array([0, 0])
+
+    def _get_distance(self, lmk_from, lmk_to):
+        """Gets distance between two landmarks (the original recursed into itself)."""
+        squared_dist = np.sum((lmk_from - lmk_to) ** 2, axis=0)
+        dist_3D = np.sqrt(squared_dist)
+        return lmk_to - lmk_from, dist_3D
+
+    def _get_angle_by_names(self, landmarks, name_from, name_mid, name_to):
+        """Gets angle between three landmarks by name."""
+        try:
+            lmk_from = landmarks[self._landmark_names.index(name_from)]
+            lmk_mid = landmarks[self._landmark_names.index(name_mid)]
+            lmk_to = landmarks[self._landmark_names.index(name_to)]
+            return self._get_angle(lmk_from, lmk_mid, lmk_to)
+        except ValueError:
+            return 0.0
+
+    def _get_angle(self, lmk_from, lmk_mid, lmk_to):
+        """Gets angle between three landmarks."""
+        v1 = lmk_from - lmk_mid
+        v2 = lmk_to - lmk_mid
+        
+        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        return np.degrees(angle)
+
+
+def random_poses(n, seed=0):
+    """MediaPipe-like normalized landmarks: x, y in [0, 1], small z"""
+    rng = np.random.default_rng(seed)
+    poses = rng.uniform(0.0, 1.0, size=(n, 33, 3)).astype(np.float32)
+    poses[:, :, 2] = rng.normal(0.0, 0.3, size=(n, 33)).astype(np.float32)
+    return poses
+
+
+def test_embedder_matches_reference():
+    """Single-pose embeddings are bit-for-bit identical to the reference"""
+    print("🧪 Testing embedder parity...")
+    
+    embedder = FullBodyPoseEmbedder()
+    reference = ReferencePoseEmbedder()
+    for pose in random_poses(200):
+        for new, old in zip(embedder(pose), reference(pose)):
+            assert new.dtype == old.dtype and new.shape == old.shape
+            assert np.array_equal(new, old), "embedding differs from reference"
+    print("✅ Vectorized embedder matches reference bit-for-bit")
+
+
+def test_embedder_batch():
+    """A (N, 33, 3) batch gives the same rows as embedding poses one by one"""
+    print("🧪 Testing batched embedding...")
+    
+    embedder = FullBodyPoseEmbedder()
+    poses = random_poses(64, seed=1)
+    batch = embedder(poses)
+    assert batch[0].shape == (64, 33, 3)
+    assert batch[2].shape == (64, 14) and batch[3].shape == (64, 7)
+    for i, pose in enumerate(poses):
+        for batched, single in zip(batch, embedder(pose)):
+            assert np.array_equal(batched[i], single)
+    
+    features = embedder.features(poses)
+    assert features.shape == (64, 21)
+    assert np.array_equal(features[5], embedder.features(poses[5]))
+    assert np.all(features[:, 14 + 2] == 0.0), "mid_hip angle stays 0 like the reference"
+    print("✅ Batched embedding matches per-pose results")
+
+
+if __name__ == "__main__":
+    test_embedder_matches_reference()
+    test_embedder_batch()
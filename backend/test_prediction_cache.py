@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the recommendation prediction cache
+Covers LRU eviction and TTL expiry, memoized healthcare predictions keyed by
+model version, and the cache metrics on /api/admin/models
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import temp_db  # first: keeps the tracked healthcare.db untouched
+
+import app as app_module
+from lru_cache import LRUCache
+from ml_models import PersonalizedHealthcareAI
+
+PATIENT = {'age': 62, 'gender': 'female', 'bmi': 25, 'bp_systolic': 140, 'glucose': 100, 'hypertension': True}
+
+
+def test_lru_eviction_and_ttl():
+    """Least recently used keys are evicted first and entries expire after the TTL"""
+    print("🧪 Testing LRU eviction and TTL...")
+
+    calls = []
+    compute = lambda key: (lambda: calls.append(key) or key * 10)
+    cache = LRUCache(max_size=2, ttl=0.05)
+    assert cache.get(1, compute(1)) == 10
+    assert cache.get(2, compute(2)) == 20
+    assert cache.get(1, compute(1)) == 10  # 1 is now most recently used
+    cache.get(3, compute(3))  # evicts 2
+    assert calls == [1, 2, 3]
+    cache.get(1, compute(1))
+    cache.get(2, compute(2))
+    assert calls == [1, 2, 3, 2]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 4, 2, 2)
+
+    time.sleep(0.06)
+    cache.get(2, compute(2))
+    assert calls[-1] == 2 and cache.stats()['expirations'] == 1
+
+    disabled = LRUCache(max_size=0)
+    disabled.get('k', compute(5))
+    disabled.get('k', compute(5))
+    assert calls[-2:] == [5, 5] and len(disabled) == 0
+    print("✅ Eviction, expiry and disabled cache behave")
+
+
+def test_predictions_memoized_per_version():
+    """Repeated profiles hit the cache; a new model version never serves old entries"""
+    print("🧪 Testing memoized predictions...")
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer = PersonalizedHealthcareAI()
+        trainer.train_models(seed=5)
+        trainer.save_models(model_dir)
+
+        ai = PersonalizedHealthcareAI()
+        ai.load_models(model_dir)
+        first = ai.predict_treatment(PATIENT)
+        # Same feature row (ints vs floats, missing defaults) is a hit
+        assert ai.predict_treatment(dict(PATIENT, age=62.0, diabetes=False)) == first
+        ai.predict_risk(PATIENT)
+        ai.predict_batch([PATIENT])
+        assert (ai.prediction_cache.hits, ai.prediction_cache.misses) == (3, 1)
+
+        trainer.train_models(seed=6)
+        trainer.save_models(model_dir)
+        ai.reload(model_dir)
+        assert len(ai.prediction_cache) == 0
+        uncached = PersonalizedHealthcareAI(cache_size=0)
+        uncached.load_models(model_dir)
+        assert ai.predict_treatment(PATIENT) == uncached.predict_treatment(PATIENT)
+        assert ai.prediction_cache.misses == 2
+        print("✅ Predictions memoized and invalidated on reload")
+
+
+def test_admin_models_metrics():
+    """/api/admin/models reports the prediction cache counters to admins only"""
+    print("🧪 Testing prediction cache metrics endpoint...")
+
+    with temp_db():
+        client = app_module.app.test_client()
+        with client.session_transaction() as s:
+            s['user_id'] = 2
+            s['role'] = 'patient'
+        assert client.get('/api/admin/models').status_code == 401
+        profile = {'profile': {'age': 50, 'gender': 'male', 'medicalHistory': 'Hypertension'}}
+        for _ in range(3):
+            assert client.post('/api/personalized-recommendations', json=profile).status_code == 200
+
+        with client.session_transaction() as s:
+            s['user_id'] = 1
+            s['role'] = 'admin'
+        body = client.get('/api/admin/models').get_json()
+        cache = body['healthcare']['prediction_cache']
+        assert body['models']['healthcare']['state'] == 'ready'
+        assert cache['hits'] >= 2 and cache['misses'] >= 1 and cache['size'] >= 1
+        print(f"✅ Metrics reported: {cache}")
+
+
+if __name__ == "__main__":
+    test_lru_eviction_and_ttl()
+    test_predictions_memoized_per_version()
+    test_admin_models_metrics()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for schema migrations and query plans
+Checks that migrations are versioned and that the hot route queries are
+answered from indexes (EXPLAIN QUERY PLAN) without full scans or sorts
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import test_support  # before the database and app imports: keeps healthcare.db untouched
+
+from database import (MIGRATIONS, KEYSET_START, PATIENT_RECORDS_SQL, DOCTOR_RECORDS_SQL, DOCTOR_PATIENTS_SQL,
+                      ADMIN_USERS_SQL, PATIENT_APPOINTMENTS_SQL, connect, init_db, migrate, schema_version)
+
+FIRST_PAGE = {'user_id': 1, 'after_created': KEYSET_START[0], 'after_id': KEYSET_START[1], 'limit': 50}
+
+
+def query_plan(conn, sql, params):
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def test_migrations_are_versioned():
+    """init_db brings a database to the latest version and re-running is a no-op"""
+    print("🧪 Testing schema migrations...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.db')
+        init_db(path)
+        conn = connect(path)
+        latest = MIGRATIONS[-1][0]
+        assert schema_version(conn) == latest
+        assert migrate(conn) == latest
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_records_patient_created' in indexes and 'idx_appointments_patient_date' in indexes
+        conn.close()
+    print(f"✅ Database at schema v{latest}")
+
+
+def test_hot_queries_use_indexes():
+    """Record, patient, user and appointment listings search indexes and need no sort"""
+    print("🧪 Testing query plans...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.db')
+        init_db(path)
+        conn = connect(path)
+        for name, sql, params in [('patient_records', PATIENT_RECORDS_SQL, FIRST_PAGE),
+                                  ('doctor_records', DOCTOR_RECORDS_SQL, FIRST_PAGE),
+                                  ('doctor_patients', DOCTOR_PATIENTS_SQL, FIRST_PAGE),
+                                  ('admin_users', ADMIN_USERS_SQL, FIRST_PAGE),
+                                  ('patient_appointments', PATIENT_APPOINTMENTS_SQL, (1,))]:
+            plan = query_plan(conn, sql, params)
+            assert any('USING INDEX' in step for step in plan), f"{name}: {plan}"
+            assert not any(step.startswith('SCAN') for step in plan), f"{name} scans a table: {plan}"
+            assert not any('TEMP B-TREE' in step for step in plan), f"{name} sorts: {plan}"
+            print(f"   {name}: {' | '.join(plan)}")
+        conn.close()
+    print("✅ Hot queries are index-only lookups")
+
+
+def test_doctor_records_rewrite_matches_or_query():
+    """The UNION ALL form returns the same rows as the original OR query"""
+    print("🧪 Testing doctor records rewrite...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.db')
+        init_db(path)
+        conn = connect(path)
+        conn.execute("INSERT INTO users (email, password, role, name) VALUES ('p@example.com', 'x', 'patient', 'P')")
+        conn.execute("INSERT INTO users (email, password, role, name) VALUES ('d2@example.com', 'x', 'doctor', 'D2')")
+        patient, doctor, other = 3, 2, 4
+        rows = [(patient, None, 'pending'), (patient, doctor, 'verified'), (patient, doctor, 'pending'),
+                (patient, other, 'verified'), (patient, other, 'pending'), (patient, doctor, None)]
+        conn.executemany('''
+            INSERT INTO medical_records (patient_id, doctor_id, record_type, title, status, created_at)
+            VALUES (?, ?, 'lab', 't', ?, datetime('now', ?))
+        ''', [(p, d, s, f"-{i} minutes") for i, (p, d, s) in enumerate(rows)])
+        conn.commit()
+
+        original = conn.execute('''
+            SELECT r.*, u.name as patient_name
+            FROM medical_records r
+            JOIN users u ON r.patient_id = u.id
+            WHERE r.status = 'pending' OR r.doctor_id = ?
+            ORDER BY r.created_at DESC
+        ''', (doctor,)).fetchall()
+        rewritten = conn.execute(DOCTOR_RECORDS_SQL, dict(FIRST_PAGE, user_id=doctor)).fetchall()
+        assert rewritten == original, f"{rewritten} != {original}"
+        assert len(rewritten) == 5
+        conn.close()
+    print("✅ Rewritten query matches the OR query")
+
+
+if __name__ == "__main__":
+    test_migrations_are_versioned()
+    test_hot_queries_use_indexes()
+    test_doctor_records_rewrite_matches_or_query()
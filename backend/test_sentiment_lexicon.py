@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the sentiment lexicon
+Checks whole-word and phrase matching, negation, custom lexicon loading and
+the /api/mental-health/analyze-text/batch endpoint
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import test_support  # before the database and app imports: keeps healthcare.db untouched
+
+from sentiment_lexicon import BASIC_LEXICON, SentimentLexicon
+import app as app_module
+from emotion_ai import emotion_ai
+
+
+def test_matching():
+    """Whole words and phrases only; a phrase wins over its first word"""
+    print("🧪 Testing lexicon matching...")
+
+    lexicon = SentimentLexicon.load()
+    assert len(lexicon) > 200
+    assert lexicon.score("The crusade was gladiatorial")['sad'] == 0
+    assert lexicon.score("I'm so stressed, and anxious too")['stressed'] == 1.0
+    scores = lexicon.score("Burned\nout again")
+    assert scores['stressed'] == 1.5 and scores['happy'] == 0
+    assert lexicon.score("Panicked, then smiled")['anxious'] == 1.5
+    assert lexicon.analyze("I am stressed and anxious") == {'sentiment': 'stressed', 'confidence': 0.9,
+                                                           'mood_score': 70}
+    assert lexicon.analyze("A calm, peaceful day")['sentiment'] == 'happy'
+    assert lexicon.analyze("The weather is cloudy") == {'sentiment': 'neutral', 'confidence': 0.6, 'mood_score': 50}
+    assert lexicon.analyze("   ") == {'sentiment': 'neutral', 'confidence': 0.5, 'mood_score': 50}
+    print("✅ Matching works")
+
+
+def test_negation():
+    """Negated terms count half towards the opposite side, up to punctuation"""
+    print("🧪 Testing negation...")
+
+    lexicon = SentimentLexicon.load()
+    assert lexicon.score("I'm not stressed at all")['happy'] == 0.5
+    assert lexicon.score("I don’t feel very good")['sad'] == 0.5
+    assert lexicon.analyze("not happy")['sentiment'] == 'sad'
+    assert lexicon.score("No. Sad.")['sad'] == 1.0
+    assert lexicon.score("never in my whole life sad")['sad'] == 1.0
+    # Out of scope once, out of scope for the rest of the text
+    assert lexicon.score("not that it matters, sad. Happy")['happy'] == 1.0
+    # "can't sleep" is a term of its own, not a negated "sleep"
+    assert lexicon.score("can't sleep")['stressed'] == 1.2
+    print("✅ Negation works")
+
+
+def test_custom_lexicon():
+    """A lexicon file replaces the default; bad files fall back to the basic keywords"""
+    print("🧪 Testing custom lexicon loading...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lexicon.json')
+        with open(path, 'w') as f:
+            json.dump({'angry': {'grr*': 2.0}, 'happy': {'yay': 1.0}}, f)
+        lexicon = SentimentLexicon.load(path)
+        assert lexicon.analyze("grrrr")['sentiment'] == 'angry'
+        assert lexicon.analyze("stressed")['sentiment'] == 'neutral'
+
+        with open(path, 'w') as f:
+            json.dump({'bored': {'meh': 1.0}}, f)
+        try:
+            SentimentLexicon.load(path)
+            assert False, 'unknown mood accepted'
+        except ValueError:
+            pass
+
+    basic = SentimentLexicon(BASIC_LEXICON)
+    assert basic.analyze("sad and depressed") == {'sentiment': 'sad', 'confidence': 0.9, 'mood_score': 70}
+    print("✅ Custom lexicons load")
+
+
+def test_batch_endpoint():
+    """The batch endpoint matches single-text analysis and rejects bad input"""
+    print("🧪 Testing text batch endpoint...")
+
+    texts = ["Feeling great today", "So tired and overwhelmed", "", "I'm not angry, just frustrated"]
+    client = app_module.app.test_client()
+    url = '/api/mental-health/analyze-text/batch'
+    assert client.post(url, json={'texts': texts}).status_code == 401
+
+    with client.session_transaction() as s:
+        s['user_id'] = 2
+        s['role'] = 'patient'
+    response = client.post(url, json={'texts': texts})
+    assert response.status_code == 200
+    assert response.get_json() == [emotion_ai.analyze_text_sentiment(text) for text in texts]
+
+    for body in [{}, {'texts': 'journal'}, {'texts': [1, 2]},
+                 {'texts': [''] * (app_module.services.MAX_BATCH_TEXTS + 1)}]:
+        assert client.post(url, json=body).status_code == 400, body
+    print(f"✅ Endpoint scored {len(texts)} texts")
+
+
+if __name__ == "__main__":
+    test_matching()
+    test_negation()
+    test_custom_lexicon()
+    test_batch_endpoint()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the incrementally maintained admin statistics
+Checks the trigger-maintained counters against COUNT(*) scans and the TTL cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import test_support  # before the database and app imports: keeps healthcare.db untouched
+
+from database import MIGRATIONS, connect, init_db, migrate
+from stats import TTLCache, read_admin_stats
+
+
+def scanned_stats(conn):
+    return {
+        'patients': conn.execute("SELECT COUNT(*) FROM users WHERE role = 'patient'").fetchone()[0],
+        'doctors': conn.execute("SELECT COUNT(*) FROM users WHERE role = 'doctor'").fetchone()[0],
+        'records': conn.execute('SELECT COUNT(*) FROM medical_records').fetchone()[0],
+        'appointments': conn.execute('SELECT COUNT(*) FROM appointments').fetchone()[0],
+        'pending_review': conn.execute("SELECT COUNT(*) FROM medical_records WHERE status = 'pending'").fetchone()[0],
+    }
+
+
+def assert_counters_match(conn):
+    stats = read_admin_stats(conn, days=3)
+    expected = scanned_stats(conn)
+    assert {k: stats[k] for k in expected} == expected, f"{stats} != {expected}"
+    today = conn.execute("SELECT COUNT(*) FROM medical_records WHERE date(created_at) = date('now')").fetchone()[0]
+    assert stats['records_per_day'][-1]['records'] == today
+    return stats
+
+
+def test_counters_follow_writes():
+    """Inserts, status changes, role changes and deletes keep counters exact"""
+    print("🧪 Testing incremental statistics counters...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.db')
+        init_db(path)
+        conn = connect(path)
+        assert_counters_match(conn)
+
+        conn.executemany("INSERT INTO users (email, password, role, name) VALUES (?, 'x', 'patient', 'P')",
+                         [(f"p{i}@example.com",) for i in range(5)])
+        conn.executemany("INSERT INTO medical_records (patient_id, record_type, title) VALUES (3, 'lab', ?)",
+                         [(f"r{i}",) for i in range(7)])
+        conn.execute("INSERT INTO appointments (patient_id, doctor_id, appointment_date) VALUES (3, 2, '2030-01-01')")
+        conn.commit()
+        stats = assert_counters_match(conn)
+        assert stats['patients'] == 5 and stats['pending_review'] == 7
+
+        conn.execute("UPDATE medical_records SET status = 'verified', doctor_id = 2 WHERE id <= 3")
+        conn.execute("UPDATE users SET role = 'doctor' WHERE email = 'p0@example.com'")
+        conn.execute("DELETE FROM medical_records WHERE id = 7")
+        conn.execute("DELETE FROM users WHERE email = 'p1@example.com'")
+        conn.commit()
+        stats = assert_counters_match(conn)
+        assert stats['pending_review'] == 3 and stats['doctors'] == 2 and stats['patients'] == 3
+
+        conn.execute("INSERT INTO medical_records (patient_id, record_type, title) VALUES (3, 'lab', 'rolled back')")
+        conn.rollback()
+        assert_counters_match(conn)
+        conn.close()
+    print("✅ Counters match COUNT(*) after every write")
+
+
+def test_migration_seeds_existing_data():
+    """Upgrading a populated database seeds the counters and per-day buckets"""
+    print("🧪 Testing statistics migration on existing data...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.db')
+        init_db(path)
+        conn = connect(path)
+        stats_version = next(version for version, description, _ in MIGRATIONS if 'statistics' in description)
+        for trigger in [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]:
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.execute('DROP TABLE stats_counters')
+        conn.execute('DROP TABLE stats_daily_records')
+        conn.execute(f"PRAGMA user_version = {stats_version - 1}")
+        conn.executemany("INSERT INTO medical_records (patient_id, record_type, title, created_at) VALUES (3, 'lab', 't', ?)",
+                         [('2024-03-01 10:00:00',), ('2024-03-01 18:00:00',), ('2024-03-02 09:00:00',)])
+        conn.commit()
+
+        migrate(conn)
+        assert_counters_match(conn)
+        per_day = dict(conn.execute('SELECT day, records FROM stats_daily_records'))
+        assert per_day == {'2024-03-01': 2, '2024-03-02': 1}, per_day
+        conn.close()
+    print("✅ Migration seeds counters from existing rows")
+
+
+def test_ttl_cache():
+    """Values are reused until the TTL expires or the cache is invalidated"""
+    print("🧪 Testing TTL cache...")
+
+    calls = []
+    cache = TTLCache(lambda: calls.append(1) or len(calls), ttl=0.05)
+    assert cache.get() == 1 and cache.get() == 1
+    cache.invalidate()
+    assert cache.get() == 2
+    time.sleep(0.06)
+    assert cache.get() == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+    print("✅ TTL cache expires and invalidates")
+
+
+if __name__ == "__main__":
+    test_counters_follow_writes()
+    test_migration_seeds_existing_data()
+    test_ttl_cache()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Shared setup for the test scripts that touch the database
+Import this before database, services, app or main: it points HEALTHCARE_DB
+at a scratch file, so importing the app (which runs init_db and its
+migrations) never modifies the tracked healthcare.db. temp_db and
+with_test_db swap a fresh database in for the shared connection pool.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+if 'HEALTHCARE_DB' not in os.environ:
+    _scratch = tempfile.mkdtemp(prefix='healthcare-test-')
+    atexit.register(shutil.rmtree, _scratch, True)
+    os.environ['HEALTHCARE_DB'] = os.path.join(_scratch, 'healthcare.db')
+
+import database
+from database import ConnectionPool, connect, init_db
+
+
+@contextmanager
+def temp_db():
+    """A fresh database swapped in for the shared pool; yields its path"""
+    original = database.pool
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'test.db')
+        init_db(path)
+        database.pool = ConnectionPool(path)
+        try:
+            yield path
+        finally:
+            database.pool.close()
+            database.pool = original
+
+
+def with_test_db(fn):
+    """Run fn(conn) against a fresh database swapped in for the app's pool"""
+    def wrapper():
+        with temp_db() as path:
+            conn = connect(path)
+            try:
+                fn(conn)
+            finally:
+                conn.close()
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
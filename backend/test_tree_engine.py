@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled tree inference engine
+Checks single-row treatment and risk predictions from the flattened trees
+against sklearn's and XGBoost's own predict_proba, including missing values
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from ml_models import PersonalizedHealthcareAI
+from tree_engine import CompiledHealthcareModels
+
+
+def random_features(n, seed):
+    rng = np.random.default_rng(seed)
+    binary = [rng.integers(0, 2, n) for _ in range(5)]
+    return np.column_stack([rng.integers(18, 90, n), rng.integers(0, 2, n), rng.normal(26, 6, n),
+                            rng.normal(125, 25, n), rng.normal(105, 35, n)] + binary).astype(float)
+
+
+def check_parity(bundle, X):
+    engine = CompiledHealthcareModels(bundle)
+    scaled = bundle['scaler'].transform(X)
+    treatment_proba = bundle['treatment_model'].predict_proba(scaled)
+    risk_proba = bundle['risk_model'].predict_proba(scaled)[:, 1]
+    for row, expected_treatment, expected_risk in zip(X, treatment_proba, risk_proba):
+        encoded, confidence, risk = engine.predict(row)
+        assert encoded == bundle['treatment_model'].classes_[np.argmax(expected_treatment)]
+        assert confidence == expected_treatment.max()
+        assert abs(risk - expected_risk) < 1e-6, (risk, expected_risk)
+
+
+def test_parity_with_committed_bundle():
+    """The engine reproduces the committed models' class, confidence and risk"""
+    print("🧪 Testing engine parity on the committed bundle...")
+
+    ai = PersonalizedHealthcareAI()
+    ai.load_models()
+    X = random_features(2000, seed=0)
+    check_parity(ai.bundle, X)
+    print(f"✅ {len(X)} rows match sklearn/xgboost")
+
+
+def test_parity_with_fresh_models():
+    """Parity holds for newly trained models and rows with missing values"""
+    print("🧪 Testing engine parity on freshly trained models...")
+
+    ai = PersonalizedHealthcareAI()
+    for seed in [3, 11]:
+        bundle = ai.train_models(seed=seed)
+        X = random_features(500, seed=seed)
+        X[::7, 2] = np.nan
+        X[::11, 4] = np.nan
+        check_parity(bundle, X)
+    print("✅ Fresh models and missing values match")
+
+
+def test_healthcare_ai_uses_engine():
+    """Single-patient predictions go through the engine and agree with the batch path"""
+    print("🧪 Testing PersonalizedHealthcareAI fast path...")
+
+    ai = PersonalizedHealthcareAI()
+    ai.load_models()
+    assert ai._active[1] is not None
+    patients = [{'age': 70, 'gender': 'male', 'diabetes': True, 'glucose': 150},
+                {'age': 40, 'gender': 'female', 'hypertension': True, 'bp_systolic': 150, 'smoking': True}]
+    batch = ai.predict_batch(patients)
+    for patient, prediction in zip(patients, batch):
+        assert ai.predict_treatment(patient) == prediction['treatment']
+        risk = ai.predict_risk(patient)
+        assert risk['risk_level'] == prediction['risk']['risk_level']
+        assert abs(risk['risk_score'] - prediction['risk']['risk_score']) < 1e-6
+    print("✅ Fast path agrees with the batch path")
+
+
+if __name__ == "__main__":
+    test_parity_with_committed_bundle()
+    test_parity_with_fresh_models()
+    test_healthcare_ai_uses_engine()
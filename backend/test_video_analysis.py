@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for offline video analysis
+Builds a short video from the sample pose image and runs the pipeline on it
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cv2
+import numpy as np
+
+from exercise_analyzer import ExerciseAnalyzer
+from video_analysis import VideoAnalysis
+
+N_FRAMES = 24
+
+
+def make_test_video(path, n_frames=N_FRAMES):
+    """Write n_frames of the sample pose (shifted a little each frame) as MJPG"""
+    image = cv2.imread(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enhanced_test_pose.jpg'))
+    image = cv2.resize(image, (640, 360))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 12.0, (640, 360))
+    for i in range(n_frames):
+        writer.write(np.roll(image, i, axis=1))
+    writer.release()
+
+
+def test_video_analysis_timeline():
+    """Every stride-th frame gets a timeline entry and the summary is filled in"""
+    print("🧪 Testing video analysis pipeline...")
+
+    analyzer = ExerciseAnalyzer()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'workout.avi')
+        make_test_video(path)
+
+        analysis = VideoAnalysis(analyzer, path, exercise_type='squat', stride=3, queue_size=2)
+        timeline = list(analysis)
+
+    assert [entry['frame'] for entry in timeline] == list(range(0, N_FRAMES, 3))
+    assert timeline[1]['time'] == 0.25
+    assert any(entry['pose_detected'] for entry in timeline)
+    assert analysis.summary['frames_decoded'] == N_FRAMES
+    assert analysis.summary['frames_analyzed'] == len(timeline)
+    assert analysis.summary['fps'] > 0
+    assert 'counters' in analysis.summary
+    assert len(analyzer.sessions) == 0 and len(analyzer.pose_engines) == 0, "video session is cleaned up"
+    print(f"✅ {len(timeline)} frames analyzed at {analysis.summary['fps']} fps")
+
+
+def test_video_analysis_rejects_bad_input():
+    """Unreadable files and invalid strides raise ValueError"""
+    print("🧪 Testing video analysis errors...")
+
+    analyzer = ExerciseAnalyzer()
+    try:
+        list(VideoAnalysis(analyzer, '/nonexistent/video.mp4'))
+        raise AssertionError('expected ValueError')
+    except ValueError:
+        pass
+    try:
+        VideoAnalysis(analyzer, 'video.mp4', stride=0)
+        raise AssertionError('expected ValueError')
+    except ValueError:
+        pass
+    print("✅ Bad video input rejected")
+
+
+if __name__ == "__main__":
+    test_video_analysis_timeline()
+    test_video_analysis_rejects_bad_input()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming voice emotion pipeline
+Covers chunking-independent MFCC/pitch extraction, the sliding window
+schedule, WAV / raw PCM recordings and the analyze-voice upload route
+"""
+
+import io
+import os
+import sys
+import wave
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_support import temp_db  # first: keeps the tracked healthcare.db untouched
+
+import numpy as np
+
+from voice_analysis import MFCCExtractor, StreamingMFCC, VoiceStream
+from emotion_ai import emotion_ai
+
+
+def synthetic_speech(seconds, sample_rate=16000, seed=0):
+    """Speech-like audio: 200 ms harmonic syllables with gliding pitch, 100 ms pauses"""
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(seconds * sample_rate), dtype=np.float32)
+    syllable, period = int(0.2 * sample_rate), int(0.3 * sample_rate)
+    t = np.arange(syllable) / sample_rate
+    for start in range(0, len(audio) - syllable, period):
+        f0 = rng.uniform(110, 220) + 40 * t / t[-1]
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        voice = sum(np.sin(k * phase) / k for k in range(1, 8)) * np.hanning(syllable) * rng.uniform(0.2, 0.4)
+        audio[start:start + syllable] = voice
+    return audio + rng.normal(0, 0.002, len(audio)).astype(np.float32)
+
+
+def to_pcm16(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes()
+
+
+def to_wav(samples, sample_rate=16000, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(to_pcm16(np.repeat(samples, channels)))
+    return buffer.getvalue()
+
+
+def test_streaming_matches_offline():
+    """Features and window results do not depend on how the audio is chunked"""
+    print("🧪 Testing chunked MFCC extraction...")
+
+    audio = synthetic_speech(6)
+    whole = StreamingMFCC(MFCCExtractor()).push(audio)
+    streaming = StreamingMFCC(MFCCExtractor())
+    parts = [streaming.push(chunk) for chunk in np.split(audio, [1, 399, 1600, 17777, 50000])]
+    for i in range(3):
+        assert np.array_equal(whole[i], np.concatenate([part[i] for part in parts]))
+    assert whole[0].shape == ((len(audio) - 400) // 160 + 1, 40)
+
+    pcm = to_pcm16(audio)
+    one = emotion_ai.open_voice_stream()
+    expected = one.push_pcm(pcm) + one.flush()
+    chunked = emotion_ai.open_voice_stream()
+    results = [r for i in range(0, len(pcm), 3331) for r in chunked.push_pcm(pcm[i:i + 3331])] + chunked.flush()
+    assert results == expected
+    print(f"✅ {whole[0].shape[0]} frames, {len(results)} windows identical across chunkings")
+
+
+def test_pitch_and_levels():
+    """Pitch, volume and speed readings follow the signal"""
+    print("🧪 Testing pitch, volume and speed...")
+
+    t = np.arange(16000) / 16000
+    tone = (sum(np.sin(2 * np.pi * 200 * k * t) / k for k in range(1, 6)) * 0.3).astype(np.float32)
+    stream = VoiceStream(lambda m: np.full((len(m), 5), 0.2), emotion_ai.voice_emotions)
+    loud = stream.push(tone) + stream.flush()
+    assert abs(loud[0]['voice_features']['pitch'] - 200) <= 2
+
+    quiet = VoiceStream(lambda m: np.full((len(m), 5), 0.2), emotion_ai.voice_emotions)
+    quiet_result = (quiet.push(tone * 0.05) + quiet.flush())[0]['voice_features']
+    assert quiet_result['volume'] < loud[0]['voice_features']['volume']
+
+    silence = VoiceStream(lambda m: np.full((len(m), 5), 0.2), emotion_ai.voice_emotions)
+    silent = (silence.push(np.zeros(16000, np.float32)) + silence.flush())[0]['voice_features']
+    assert silent['pitch'] == 0 and silent['volume'] == 0 and silent['speed'] == 0
+
+    speech = emotion_ai.analyze_voice_features(to_wav(synthetic_speech(10)))
+    # 3.3 syllables per second is about 130 words per minute
+    assert 100 <= speech['voice_features']['speed'] <= 170, speech['voice_features']
+    assert 110 <= speech['voice_features']['pitch'] <= 260
+    print(f"✅ Tone at 200 Hz read as {loud[0]['voice_features']['pitch']} Hz, speech {speech['voice_features']}")
+
+
+def test_window_schedule():
+    """A window every second once three seconds are in, plus the uncovered tail"""
+    print("🧪 Testing sliding windows...")
+
+    result = emotion_ai.analyze_voice_features(to_wav(synthetic_speech(10)))
+    ends = [w['end'] for w in result['windows']]
+    assert ends == [3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 9.98]
+    assert all(round(w['end'] - w['start'], 2) == 3.0 for w in result['windows'])
+    assert result['duration'] == 9.98 and result['tone'] in [e.lower() for e in emotion_ai.voice_emotions]
+    probabilities = result['windows'][0]['probabilities']
+    assert abs(sum(probabilities.values()) - 1) < 1e-3 and 0 <= result['stress_level'] <= 100
+
+    short = emotion_ai.analyze_voice_features(to_wav(synthetic_speech(1)))
+    assert len(short['windows']) == 1 and short['windows'][0]['start'] == 0.0
+    assert 'error' in emotion_ai.analyze_voice_features(to_wav(synthetic_speech(0.3)))
+    print(f"✅ Windows end at {ends}")
+
+
+def test_recording_formats():
+    """WAV (any rate, stereo) and raw PCM recordings; unknown formats report an error"""
+    print("🧪 Testing recording formats...")
+
+    audio = synthetic_speech(5)
+    from_wav = emotion_ai.analyze_voice_features(io.BytesIO(to_wav(audio)))
+    from_pcm = emotion_ai.analyze_voice_features(io.BytesIO(to_pcm16(audio)), 'pcm', 16000, 1)
+    assert from_wav == from_pcm and len(from_wav['windows']) == 3
+
+    stereo = emotion_ai.analyze_voice_features(to_wav(synthetic_speech(5, 8000), 8000, channels=2))
+    assert len(stereo['windows']) == 3 and stereo['voice_features']['pitch'] > 0
+    bad = emotion_ai.analyze_voice_features(b'not audio at all')
+    assert 'error' in bad and bad['windows'] == []
+    print("✅ WAV, stereo WAV and raw PCM analyzed")
+
+
+def test_voice_upload_route():
+    """POST /api/mental-health/analyze-voice takes a file upload or a raw PCM body"""
+    print("🧪 Testing voice upload route...")
+
+    import app as app_module
+    with temp_db():
+        client = app_module.app.test_client()
+        assert client.post('/api/mental-health/analyze-voice').status_code == 401
+        with client.session_transaction() as s:
+            s['user_id'] = 2
+            s['role'] = 'patient'
+
+        audio = synthetic_speech(4)
+        upload = client.post('/api/mental-health/analyze-voice',
+                             data={'audio': (io.BytesIO(to_wav(audio)), 'note.wav')}).get_json()
+        raw = client.post('/api/mental-health/analyze-voice?sample_rate=16000', data=to_pcm16(audio),
+                          content_type='audio/L16').get_json()
+        assert len(upload['windows']) == 2 and upload == raw
+        bad_rate = client.post('/api/mental-health/analyze-voice?sample_rate=fast', data=to_pcm16(audio),
+                               content_type='audio/L16')
+        assert bad_rate.status_code == 400
+        mock = client.post('/api/mental-health/analyze-voice').get_json()
+        assert 'windows' not in mock and set(mock['voice_features']) == {'pitch', 'speed', 'volume'}
+        print(f"✅ Upload analyzed as {upload['tone']} ({upload['stress_level']} stress)")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_offline()
+    test_pitch_and_levels()
+    test_window_schedule()
+    test_recording_formats()
+    test_voice_upload_route()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Train the personalized healthcare models offline
+Writes a new versioned model bundle (models, scaler, encoders and feature
+schema) and points CURRENT at it; a running server picks it up on
+POST /api/admin/models/reload or its next restart.
+
+    python train_models.py [--seed N] [--model-dir DIR] [--no-activate]
+    python train_models.py --list
+    python train_models.py --activate VERSION
+"""
+
+import argparse
+import time
+
+from model_artifacts import MODEL_DIR, activate_version, current_version, list_versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--seed', type=int, default=None, help='seed for the synthetic training data')
+    parser.add_argument('--no-activate', action='store_true', help='save the bundle without making it current')
+    parser.add_argument('--list', action='store_true', help='list saved versions')
+    parser.add_argument('--activate', metavar='VERSION', help='make a saved version current (e.g. to roll back)')
+    args = parser.parse_args()
+
+    if args.list:
+        current = current_version(args.model_dir)
+        for version in list_versions(args.model_dir):
+            print(f"{'*' if version == current else ' '} {version}")
+        return
+    if args.activate:
+        activate_version(args.activate, args.model_dir)
+        print(f"✅ Model bundle {args.activate} is now current")
+        return
+
+    from ml_models import PersonalizedHealthcareAI
+    ai = PersonalizedHealthcareAI()
+    start = time.perf_counter()
+    bundle = ai.train_models(seed=args.seed)
+    print(f"🧠 Trained healthcare models on {bundle['samples']} samples in {time.perf_counter() - start:.1f}s")
+    path = ai.save_models(args.model_dir, activate=not args.no_activate)
+    print(f"💾 Saved model bundle {bundle['version']} to {path}" + ('' if args.no_activate else ' (current)'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import json
+
+import numpy as np
+
+
+class FlatTrees:
+    """A tree ensemble flattened into NumPy arrays for single-row inference.
+
+    The nodes of every tree live in one set of arrays (split feature,
+    threshold, left/right child, missing-value direction, leaf value) and
+    leaves point back at themselves, so walking all trees one level per step
+    takes max_depth vectorized steps instead of a Python loop over trees.
+    Splits go left on x <= threshold (sklearn) or x < threshold (XGBoost).
+    """
+
+    def __init__(self, trees, strict, dtype):
+        offsets = np.cumsum([0] + [len(t['feature']) for t in trees])
+        self.roots = offsets[:-1]
+        self.feature = np.concatenate([t['feature'] for t in trees]).astype(np.intp)
+        self.threshold = np.concatenate([t['threshold'] for t in trees]).astype(dtype)
+        self.missing_left = np.concatenate([t['missing_left'] for t in trees]).astype(bool)
+        self.value = np.concatenate([t['value'] for t in trees])
+        self.left = np.concatenate([t['left'] + offset for t, offset in zip(trees, offsets)])
+        self.right = np.concatenate([t['right'] + offset for t, offset in zip(trees, offsets)])
+        leaves = np.concatenate([t['left'] < 0 for t in trees])
+        nodes = np.arange(len(self.feature))
+        self.left[leaves] = self.right[leaves] = nodes[leaves]
+        self.feature[leaves] = 0
+        self.threshold[leaves] = np.inf
+        self.missing_left[leaves] = True
+        self.depth = max(t['depth'] for t in trees)
+        self.strict = strict
+        self.dtype = dtype
+
+    def leaf_values(self, x):
+        """Leaf value of every tree for one feature row"""
+        x = np.asarray(x, dtype=self.dtype)
+        missing = bool(np.isnan(x).any())
+        nodes = self.roots
+        for _ in range(self.depth):
+            v = x[self.feature[nodes]]
+            t = self.threshold[nodes]
+            go_left = v < t if self.strict else v <= t
+            if missing:
+                go_left = np.where(np.isnan(v), self.missing_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes]
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=int)
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def compile_random_forest(model):
+    """FlatTrees for a fitted RandomForestClassifier; leaf values are class probabilities"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :]
+        value = value / value.sum(axis=1, keepdims=True)
+        left = tree.children_left.astype(np.intp)
+        right = tree.children_right.astype(np.intp)
+        trees.append({
+            'feature': tree.feature, 'threshold': tree.threshold, 'left': left, 'right': right,
+            'missing_left': getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)),
+            'value': value, 'depth': max(tree.max_depth, 1)
+        })
+    # sklearn casts features to float32 and compares them against float64 thresholds
+    return FlatTrees(trees, strict=False, dtype=np.float64)
+
+
+def compile_xgboost(model):
+    """(FlatTrees, base margin) for a fitted binary:logistic XGBClassifier"""
+    learner = json.loads(model.get_booster().save_raw(raw_format='json'))['learner']
+    if learner['objective']['name'] != 'binary:logistic' or learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost model {learner['objective']['name']}/{learner['gradient_booster']['name']}")
+    trees = []
+    for tree in learner['gradient_booster']['model']['trees']:
+        if any(tree['split_type']):
+            raise ValueError("Categorical XGBoost splits are not supported")
+        left = np.array(tree['left_children'], dtype=np.intp)
+        right = np.array(tree['right_children'], dtype=np.intp)
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        trees.append({
+            'feature': np.array(tree['split_indices']), 'threshold': conditions, 'left': left, 'right': right,
+            'missing_left': np.array(tree['default_left']),
+            # A leaf's value is stored in its split_conditions slot
+            'value': conditions, 'depth': max(_tree_depth(left, right), 1)
+        })
+    base_score = np.float32(learner['learner_model_param']['base_score'].strip('[]'))
+    return FlatTrees(trees, strict=True, dtype=np.float32), np.log(base_score / (np.float32(1) - base_score))
+
+
+class CompiledHealthcareModels:
+    """Single-row treatment and risk inference from a healthcare model bundle.
+
+    Scaling, the RandomForest class probabilities (class and confidence from
+    the same pass) and the XGBoost risk probability are computed straight
+    from flattened arrays, skipping the per-call input validation and thread
+    dispatch of the sklearn/xgboost predict methods.
+    """
+
+    def __init__(self, bundle):
+        scaler = bundle['scaler']
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.forest = compile_random_forest(bundle['treatment_model'])
+        self.treatment_classes = bundle['treatment_model'].classes_
+        self.risk_trees, self.risk_base_margin = compile_xgboost(bundle['risk_model'])
+
+    def scale_row(self, features):
+        return (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+
+    def treatment_proba(self, x):
+        # float32 round trip, as sklearn's tree predict does
+        x = np.asarray(x, dtype=np.float32)
+        return self.forest.leaf_values(x).mean(axis=0)
+
+    def risk_proba(self, x):
+        # XGBoost adds the trees to the base margin one by one in float32;
+        # cumsum keeps that order so the margin matches bit for bit
+        leaves = self.risk_trees.leaf_values(x)
+        margin = np.cumsum(np.concatenate(([self.risk_base_margin], leaves)))[-1]
+        return 1.0 / (1.0 + np.exp(-float(margin)))
+
+    def _treatment(self, x):
+        probabilities = self.treatment_proba(x)
+        best = int(np.argmax(probabilities))
+        return self.treatment_classes[best], float(probabilities[best])
+
+    def predict_treatment(self, features):
+        """(encoded treatment, confidence) for one raw feature row"""
+        return self._treatment(self.scale_row(features))
+
+    def predict_risk(self, features):
+        """Risk probability for one raw feature row"""
+        return float(self.risk_proba(self.scale_row(features)))
+
+    def predict(self, features):
+        """(encoded treatment, confidence, risk probability) for one raw feature row"""
+        x = self.scale_row(features)
+        return self._treatment(x) + (float(self.risk_proba(x)),)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Offline exercise analysis for recorded workout videos
+Decodes frames on a background thread and analyzes them through a bounded
+producer/consumer queue, so memory stays flat regardless of video length
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import uuid
+
+import cv2
+
+_END = object()
+
+
+class VideoAnalysis:
+    """Streams a per-frame timeline for one video file.
+
+    Iterating yields one timeline entry per analyzed frame. Only every
+    stride-th frame is decoded (the rest are skipped with grab()), and at most
+    queue_size decoded frames are buffered between the decoder thread and the
+    analyzer. After iteration, self.summary holds the final rep counts and
+    throughput.
+    """
+
+    def __init__(self, analyzer, path, exercise_type='pushup', stride=1, queue_size=8):
+        if stride < 1:
+            raise ValueError('stride must be at least 1')
+        self.analyzer = analyzer
+        self.path = path
+        self.exercise_type = exercise_type
+        self.stride = stride
+        self.queue_size = queue_size
+        self.session_id = f"video:{uuid.uuid4().hex}"
+        self.frames_decoded = 0
+        self.frames_analyzed = 0
+        self.summary = None
+        self._error = None
+
+    def __iter__(self):
+        capture = cv2.VideoCapture(self.path)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video: {self.path}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+
+        frames = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        decoder = threading.Thread(target=self._decode, args=(capture, frames, stop), daemon=True)
+        start = time.perf_counter()
+        decoder.start()
+        try:
+            while True:
+                item = frames.get()
+                if item is _END:
+                    break
+                index, frame = item
+                result = self.analyzer.analyze_frame(frame, self.exercise_type, self.session_id, render='none')
+                self.frames_analyzed += 1
+                yield {
+                    'frame': index,
+                    'time': round(index / fps, 3),
+                    'pose_detected': result['success'],
+                    'exercise_type': result.get('exercise_type'),
+                    'current_state': result.get('current_state'),
+                    'rep_count': result.get('rep_count', 0)
+                }
+            if self._error is not None:
+                raise self._error
+
+            elapsed = time.perf_counter() - start
+            self.summary = {
+                'frames_decoded': self.frames_decoded,
+                'frames_analyzed': self.frames_analyzed,
+                'duration': round(self.frames_decoded / fps, 3),
+                'elapsed': round(elapsed, 3),
+                'fps': round(self.frames_analyzed / elapsed, 1) if elapsed > 0 else 0.0,
+                **self.analyzer.get_exercise_stats(self.session_id)
+            }
+        finally:
+            stop.set()
+            decoder.join()
+            capture.release()
+            self.analyzer.pose_engines.release(self.session_id)
+            self.analyzer.sessions.discard(self.session_id)
+
+    def _decode(self, capture, frames, stop):
+        """Producer: read every stride-th frame into the bounded queue"""
+        try:
+            index = 0
+            while not stop.is_set():
+                if index % self.stride == 0:
+                    ok, frame = capture.read()
+                    if ok and not self._put(frames, (index, frame), stop):
+                        return
+                else:
+                    ok = capture.grab()
+                if not ok:
+                    break
+                index += 1
+            self.frames_decoded = index
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(frames, _END, stop)
+
+    @staticmethod
+    def _put(frames, item, stop):
+        # Block while the analyzer is behind, but give up if it stopped consuming
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze a recorded workout video')
+    parser.add_argument('video', help='path to the video file')
+    parser.add_argument('--exercise', default='pushup', help='exercise type for fallback analysis')
+    parser.add_argument('--stride', type=int, default=1, help='analyze every Nth frame')
+    parser.add_argument('--queue-size', type=int, default=8, help='max decoded frames buffered')
+    parser.add_argument('--timeline', help='write the per-frame timeline as JSON lines to this file')
+    args = parser.parse_args()
+
+    from exercise_analyzer import ExerciseAnalyzer
+
+    analysis = VideoAnalysis(ExerciseAnalyzer(), args.video, args.exercise, args.stride, args.queue_size)
+    timeline = open(args.timeline, 'w') if args.timeline else None
+    try:
+        for entry in analysis:
+            if timeline:
+                timeline.write(json.dumps(entry) + '\n')
+    finally:
+        if timeline:
+            timeline.close()
+
+    summary = analysis.summary
+    print(f"🎬 {summary['frames_analyzed']}/{summary['frames_decoded']} frames analyzed "
+          f"in {summary['elapsed']}s ({summary['fps']} fps)")
+    print(f"🔢 Reps: {json.dumps(summary['counters'])} (total {summary['total_reps']})")
+    json.dump(summary, sys.stdout)
+    print()
+
+
+if __name__ == "__main__":
+    main()
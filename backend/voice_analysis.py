@@ -0,0 +1,265 @@
+import io
+import os
+import wave
+from collections import deque
+
+import numpy as np
+from scipy.fft import dct
+
+try:
+    import librosa
+    LIBROSA_AVAILABLE = True
+except ImportError:
+    LIBROSA_AVAILABLE = False
+
+VOICE_SAMPLE_RATE = 16000
+# Mean stress level (0-100) the voice analysis associates with each emotion
+EMOTION_STRESS = {'Angry': 82, 'Sad': 55, 'Happy': 20, 'Neutral': 45, 'Surprise': 45}
+PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def pcm_to_float(data, sample_width=2, channels=1):
+    """Interleaved little-endian integer PCM bytes -> mono float32 samples in [-1, 1]"""
+    dtype = PCM_DTYPES[sample_width]
+    samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+    if dtype is np.uint8:
+        samples = (samples - 128.0) / 128.0
+    else:
+        samples /= float(np.iinfo(dtype).max) + 1
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+class MFCCExtractor:
+    """Per-frame MFCCs, RMS level and pitch from one shared power spectrum.
+
+    Frames are frame_seconds long (Hann windowed), every hop_seconds. The
+    spectrum is zero-padded to at least twice the frame, so its inverse FFT
+    is the frame's linear autocorrelation, which gives the pitch: the first
+    peak (60-400 Hz) within 90% of the best peak of the window-normalized
+    autocorrelation, refined by parabolic interpolation, when the best peak
+    clears voicing_threshold.
+    """
+
+    def __init__(self, sample_rate=VOICE_SAMPLE_RATE, n_mfcc=40, n_mels=40, frame_seconds=0.025,
+                 hop_seconds=0.010, fmin_pitch=60, fmax_pitch=400, voicing_threshold=0.45, silence_rms=0.01):
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.win_length = int(round(sample_rate * frame_seconds))
+        self.hop_length = int(round(sample_rate * hop_seconds))
+        self.n_fft = 1 << (2 * self.win_length - 1).bit_length()
+        self.window = np.hanning(self.win_length + 1)[:-1].astype(np.float32)
+        self.mel_basis = self._mel_filterbank(n_mels)
+        self.dct_basis = dct(np.eye(n_mels), type=2, norm='ortho', axis=0)[:n_mfcc].astype(np.float32)
+        self.min_lag = max(int(sample_rate / fmax_pitch), 1)
+        self.max_lag = min(int(sample_rate / fmin_pitch), self.win_length - 1)
+        window_ac = np.fft.irfft(np.abs(np.fft.rfft(self.window, self.n_fft)) ** 2, self.n_fft)[:self.win_length]
+        self.window_ac = (window_ac / window_ac[0]).astype(np.float32)
+        self.voicing_threshold = voicing_threshold
+        self.silence_rms = silence_rms
+
+    def _mel_filterbank(self, n_mels):
+        """Triangular filters evenly spaced on the HTK mel scale, area-normalized"""
+        hz_to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+        mel_to_hz = lambda mel: 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+        edges = mel_to_hz(np.linspace(0.0, hz_to_mel(self.sample_rate / 2), n_mels + 2))
+        bins = np.fft.rfftfreq(self.n_fft, 1.0 / self.sample_rate)
+        lower = (bins[None, :] - edges[:-2, None]) / (edges[1:-1] - edges[:-2])[:, None]
+        upper = (edges[2:, None] - bins[None, :]) / (edges[2:] - edges[1:-1])[:, None]
+        filters = np.maximum(0.0, np.minimum(lower, upper)) * (2.0 / (edges[2:] - edges[:-2]))[:, None]
+        return filters.astype(np.float32)
+
+    def transform(self, frames):
+        """(n, win_length) raw frames -> mfcc (n, n_mfcc), rms (n,), pitch in Hz (n,; 0 if unvoiced)"""
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        power = np.abs(np.fft.rfft(frames * self.window, self.n_fft, axis=1)) ** 2
+        log_mel = 10.0 * np.log10(np.maximum(power @ self.mel_basis.T, 1e-10))
+        mfcc = log_mel @ self.dct_basis.T
+
+        ac = np.fft.irfft(power, self.n_fft, axis=1)[:, :self.max_lag + 1]
+        ac = ac / np.maximum(ac[:, :1], 1e-12) / self.window_ac[:self.max_lag + 1]
+        # Local maxima over lags min_lag..max_lag - 1; taking the first strong one avoids octave errors
+        middle = ac[:, self.min_lag:self.max_lag]
+        left, right = ac[:, self.min_lag - 1:self.max_lag - 1], ac[:, self.min_lag + 1:self.max_lag + 1]
+        peaks = np.where((middle >= left) & (middle >= right), middle, -np.inf)
+        best = peaks.max(axis=1, initial=-np.inf)
+        index = np.argmax(peaks >= 0.9 * best[:, None], axis=1)
+        rows = np.arange(len(frames))
+        a, b, c = left[rows, index], middle[rows, index], right[rows, index]
+        curvature = a - 2 * b + c
+        offset = np.where(curvature < 0, 0.5 * (a - c) / np.where(curvature < 0, curvature, -1.0), 0.0)
+        lag = self.min_lag + index + offset
+        voiced = (best >= self.voicing_threshold) & (rms >= self.silence_rms)
+        pitch = np.where(voiced, self.sample_rate / np.maximum(lag, 1.0), 0.0)
+        return mfcc.astype(np.float32), rms.astype(np.float32), pitch.astype(np.float32)
+
+
+class StreamingMFCC:
+    """Feeds arbitrary-sized sample chunks through an MFCCExtractor.
+
+    Every sample is framed exactly once: push() returns the features of the
+    frames the new samples complete and keeps only the overlap needed for
+    the next frame, so output is identical however the audio is chunked.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def push(self, samples):
+        samples = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        win, hop = self.extractor.win_length, self.extractor.hop_length
+        n_frames = 0 if len(samples) < win else (len(samples) - win) // hop + 1
+        self._pending = samples[n_frames * hop:]
+        if n_frames == 0:
+            return self.extractor.transform(np.zeros((0, win), dtype=np.float32))
+        frames = np.lib.stride_tricks.sliding_window_view(samples, win)[::hop][:n_frames]
+        return self.extractor.transform(frames)
+
+
+class VoiceStream:
+    """Sliding-window voice emotion analysis over streamed audio.
+
+    Audio goes in as PCM bytes (push_pcm) or float samples (push); once
+    window_seconds of frames have arrived, and then every step_seconds, the
+    window's mean MFCC vector goes to classify (a callable mapping an
+    (n, n_mfcc) array to (n, len(labels)) probabilities) and one result is
+    returned per window. flush() analyzes whatever frames the last window
+    has not covered, or the whole clip when it is shorter than a window.
+    """
+
+    def __init__(self, classify, labels, sample_rate=VOICE_SAMPLE_RATE, channels=1, sample_width=2,
+                 window_seconds=3.0, step_seconds=1.0, min_seconds=0.5):
+        self.classify = classify
+        self.labels = labels
+        self.channels = channels
+        self.sample_width = sample_width
+        self.extractor = MFCCExtractor(sample_rate)
+        self.mfcc = StreamingMFCC(self.extractor)
+        hop_seconds = self.extractor.hop_length / sample_rate
+        self.hop_seconds = hop_seconds
+        self.window_frames = int(round(window_seconds / hop_seconds))
+        self.step_frames = int(round(step_seconds / hop_seconds))
+        self.min_frames = int(round(min_seconds / hop_seconds))
+        self._frames = deque(maxlen=self.window_frames)
+        self.frames_seen = 0
+        self._uncovered = 0
+        self._byte_tail = b''
+
+    def push_pcm(self, data):
+        data = self._byte_tail + bytes(data)
+        usable = len(data) - len(data) % (self.sample_width * self.channels)
+        self._byte_tail = data[usable:]
+        return self.push(pcm_to_float(data[:usable], self.sample_width, self.channels))
+
+    def push(self, samples):
+        results = []
+        for row in zip(*self.mfcc.push(samples)):
+            self._frames.append(row)
+            self.frames_seen += 1
+            self._uncovered += 1
+            if self.frames_seen >= self.window_frames and self._uncovered >= self.step_frames:
+                results.append(self._analyze_window())
+        return results
+
+    def flush(self):
+        if self._uncovered == 0 or len(self._frames) < self.min_frames:
+            return []
+        return [self._analyze_window()]
+
+    def _analyze_window(self):
+        self._uncovered = 0
+        mfcc, rms, pitch = (np.array(column) for column in zip(*self._frames))
+        probabilities = np.asarray(self.classify(mfcc.mean(axis=0, keepdims=True)))[0]
+        result = window_result(self.labels, probabilities, rms, pitch, self.hop_seconds)
+        result['start'] = round((self.frames_seen - len(self._frames)) * self.hop_seconds, 2)
+        result['end'] = round(self.frames_seen * self.hop_seconds, 2)
+        return result
+
+
+def window_result(labels, probabilities, rms, pitch, hop_seconds):
+    """Tone, stress and the pitch / speed / volume readings for one window of frames"""
+    voiced = pitch > 0
+    # Voiced runs approximate syllables; at ~1.5 syllables a word that gives words per minute
+    syllables = int(voiced[0]) + int(np.count_nonzero(voiced[1:] & ~voiced[:-1]))
+    minutes = len(pitch) * hop_seconds / 60.0
+    level_db = 20.0 * np.log10(max(float(np.sqrt(np.mean(rms ** 2))), 1e-6))
+    best = int(np.argmax(probabilities))
+    return {
+        'tone': labels[best].lower(),
+        'confidence': float(probabilities[best]),
+        'stress_level': int(round(sum(p * EMOTION_STRESS.get(label, 45) for label, p in zip(labels, probabilities)))),
+        'voice_features': {
+            'pitch': int(round(float(np.median(pitch[voiced])))) if voiced.any() else 0,
+            'speed': int(round(syllables / 1.5 / minutes)) if minutes else 0,
+            'volume': int(round(min(max((level_db + 60.0) / 60.0 * 100.0, 0.0), 100.0)))
+        },
+        'probabilities': {label: round(float(p), 4) for label, p in zip(labels, probabilities)}
+    }
+
+
+def audio_chunks(audio, audio_format=None, sample_rate=None, channels=1, chunk_seconds=1.0):
+    """Yield (samples, sample_rate) float32 chunks from an uploaded recording.
+
+    audio is a binary stream, bytes or a file path. WAV is read a chunk at
+    a time with the wave module, raw 16-bit PCM ('pcm') likewise at the
+    given sample_rate/channels; other containers (webm, mp3, ...) need
+    librosa, which decodes the whole file first.
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        audio = io.BytesIO(audio)
+    if audio_format == 'pcm':
+        sample_rate = int(sample_rate or VOICE_SAMPLE_RATE)
+        chunk_bytes = int(sample_rate * chunk_seconds) * 2 * channels
+        tail = b''
+        while True:
+            data = audio.read(chunk_bytes)
+            if not data:
+                return
+            data = tail + data
+            usable = len(data) - len(data) % (2 * channels)
+            tail = data[usable:]
+            yield pcm_to_float(data[:usable], 2, channels), sample_rate
+
+    try:
+        with wave.open(audio, 'rb') as wav:
+            if wav.getcomptype() != 'NONE' or wav.getsampwidth() not in PCM_DTYPES:
+                raise ValueError('Only uncompressed 8/16/32-bit WAV is supported')
+            rate, width, n_channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+            chunk_frames = int(rate * chunk_seconds)
+            while True:
+                data = wav.readframes(chunk_frames)
+                if not data:
+                    return
+                yield pcm_to_float(data, width, n_channels), rate
+    except (wave.Error, EOFError):
+        pass
+
+    if not LIBROSA_AVAILABLE:
+        raise ValueError('Unsupported audio format: send WAV or raw 16-bit PCM (librosa is needed for others)')
+    if hasattr(audio, 'seek'):
+        audio.seek(0)
+    samples, rate = librosa.load(audio if isinstance(audio, (str, os.PathLike)) else io.BytesIO(audio.read()),
+                                 sr=sample_rate, mono=True)
+    step = int(rate * chunk_seconds)
+    for start in range(0, len(samples), step):
+        yield samples[start:start + step].astype(np.float32), rate
+
+
+def summarize_windows(labels, windows):
+    """Whole-recording answer: mean window probabilities, stress and readings"""
+    probabilities = np.mean([[w['probabilities'][label] for label in labels] for w in windows], axis=0)
+    best = int(np.argmax(probabilities))
+    features = lambda key: [w['voice_features'][key] for w in windows]
+    pitches = [p for p in features('pitch') if p]
+    return {
+        'tone': labels[best].lower(),
+        'confidence': float(probabilities[best]),
+        'stress_level': int(round(np.mean([w['stress_level'] for w in windows]))),
+        'voice_features': {
+            'pitch': int(np.median(pitches)) if pitches else 0,
+            'speed': int(round(np.mean(features('speed')))),
+            'volume': int(round(np.mean(features('volume'))))
+        }
+    }
@@ -332,22 +332,20 @@ export default function AIGymTrainer() {
       const ctx = canvas.getContext('2d')
       ctx.drawImage(video, 0, 0)
       
-      // Convert to base64
-      const imageData = canvas.toDataURL('image/jpeg', 0.8)
+      // Encode as a JPEG blob (sent as the raw body, no base64 inflation)
+      const imageBlob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8))
       
       const exerciseType = currentExercise.type || currentExercise.name.toLowerCase().replace(/[^a-z]/g, '_')
       
       console.log('🎯 Analyzing frame for exercise:', exerciseType)
-      console.log('🎯 Image data length:', imageData.length)
+      console.log('🎯 Image data length:', imageBlob.size)
       
       // Send to backend for ML-based analysis
-      const response = await fetch('http://localhost:8000/api/test/exercise/analyze', {
+      const params = new URLSearchParams({ exercise_type: exerciseType })
+      const response = await fetch(`http://localhost:8000/api/test/exercise/analyze?${params}`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ 
-          image: imageData, 
-          exercise_type: exerciseType
-        })
+        headers: { 'Content-Type': 'image/jpeg' },
+        body: imageBlob
       })
       
       if (!response.ok) {